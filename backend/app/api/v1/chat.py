@@ -1,67 +1,120 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import aclosing
 from typing import Optional
-import json
+import uuid
 
-from app.core.database import get_mysql_session
 from app.core.security import get_current_user_id, verify_token_from_query
+from app.core.sse import format_sse, format_heartbeat, coalesce_content
+from app.models.types import UUID_PATTERN
+from app.services.admission import AdmissionRejected, Ticket, admission_controller
 from app.services.chat_service import ChatService
+from app.services.stream_manager import StreamNotFound, stream_manager
 from app.schemas.chat import ChatRequest
 
 router = APIRouter()
 
 
+def admit(user_id: str) -> Ticket:
+    """Take a generation slot or a place in the queue; 429/503 with Retry-After when full."""
+    try:
+        return admission_controller.enter(user_id)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+async def generate_events(user_id: str, conversation_id: Optional[str], message: str, ticket: Ticket):
+    """Run one chat turn and yield its events; executed detached by the stream manager."""
+    # No request-scoped DB session: ChatService opens short units of work
+    # so the stream does not hold a pooled connection while the LLM runs
+    chat_service = ChatService()
+
+    try:
+        # Wait for a generation slot, telling the client where it is in line
+        async for position in ticket.positions():
+            yield {
+                "type": "queued",
+                "position": position,
+                "estimatedWaitSeconds": round(ticket.estimated_wait),
+            }
+
+        # Resolve the conversation and load its context
+        conv_id, context = await chat_service.start_turn(user_id, conversation_id, message)
+
+        # Stream AI response, batching content deltas into fewer frames
+        chunks = coalesce_content(chat_service.stream_response(conv_id, message, context))
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                yield chunk
+
+        # Send completion event
+        yield {"type": "done", "conversationId": conv_id}
+
+    except Exception as e:
+        yield {"type": "error", "error": str(e)}
+
+    finally:
+        ticket.release()
+        await chat_service.close()
+
+
 @router.get("/stream")
 async def stream_chat(
     message: str = Query(..., min_length=1),
-    conversation_id: Optional[str] = Query(None),
+    conversation_id: Optional[str] = Query(None, pattern=UUID_PATTERN),
+    stream_id: Optional[str] = Query(None, max_length=64),
     token: str = Query(...),
-    db: AsyncSession = Depends(get_mysql_session)
+    last_event_id: Optional[str] = Header(None),
 ):
     """
     Stream AI response using Server-Sent Events (SSE).
 
+    The answer is generated by a detached task into a replay buffer. Every
+    frame carries an id; when the connection drops, EventSource reconnects
+    with the same URL and a Last-Event-ID header and the stream resumes
+    from the buffer instead of generating the answer again.
+
     Query Parameters:
         - message: User message
         - conversation_id: Optional conversation ID (creates new if not provided)
+        - stream_id: Client-generated stream ID (generated if not provided)
         - token: JWT access token (required for SSE as headers are not supported)
 
     SSE Events:
         - {"type": "content", "content": "..."} - Text chunk
+        - {"type": "queued", "position": n, "estimatedWaitSeconds": s} - Waiting for a
+          generation slot; sent again whenever the position changes
         - {"type": "chart", "chartData": {...}} - Chart data
+        - {"type": "snapshot", "content": "...", "chartData": {...}} - Answer so far,
+          sent on resume when the missed events were evicted from the buffer
         - {"type": "done", "conversationId": "..."} - Stream complete
         - {"type": "error", "error": "..."} - Error occurred
     """
     # Verify token from query parameter (SSE limitation)
     user_id = verify_token_from_query(token)
 
-    chat_service = ChatService(db)
+    stream_id = stream_id or str(uuid.uuid4())
+    resume_after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
+    if not resume_after:
+        ticket = admit(user_id)
+        # A repeated first request for the same stream id attaches to the running generation
+        events = generate_events(user_id, conversation_id, message, ticket)
+        if not await stream_manager.start(stream_id, user_id, events):
+            ticket.release()
 
     async def event_generator():
         try:
-            # Get or create conversation
-            conv_id = await chat_service.get_or_create_conversation(
-                user_id,
-                conversation_id
-            )
-
-            # Save user message
-            await chat_service.save_message(conv_id, "user", message)
-
-            # Stream AI response
-            async for chunk in chat_service.stream_response(conv_id, message):
-                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
-
-            # Send completion event
-            yield f"data: {json.dumps({'type': 'done', 'conversationId': conv_id})}\n\n"
-
-        except Exception as e:
-            error_msg = {"type": "error", "error": str(e)}
-            yield f"data: {json.dumps(error_msg)}\n\n"
-
-        finally:
-            await chat_service.close()
+            async for item in stream_manager.subscribe(stream_id, user_id, resume_after):
+                yield format_heartbeat() if item is None else format_sse(item[1], item[0])
+        except StreamNotFound:
+            yield format_sse({"type": "error", "error": "Stream expired"})
+        except PermissionError:
+            yield format_sse({"type": "error", "error": "Access denied"})
 
     return StreamingResponse(
         event_generator(),
@@ -74,11 +127,19 @@ async def stream_chat(
     )
 
 
+@router.delete("/stream/{stream_id}")
+async def cancel_stream(
+    stream_id: str,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Stop a running generation; the user message is still saved."""
+    return {"cancelled": await stream_manager.cancel(stream_id, user_id)}
+
+
 @router.post("/send")
 async def send_message(
     request: ChatRequest,
-    user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_mysql_session)
+    user_id: str = Depends(get_current_user_id)
 ):
     """
     Send a message and get full response (non-streaming fallback).
@@ -87,30 +148,36 @@ async def send_message(
         - message: User message (required)
         - conversation_id: Optional conversation ID (creates new if not provided)
     """
-    chat_service = ChatService(db)
+    ticket = admit(user_id)
+    chat_service = ChatService()
 
     try:
-        # Get or create conversation
-        conv_id = await chat_service.get_or_create_conversation(user_id, request.conversation_id)
+        # Wait for a generation slot
+        try:
+            async for _ in ticket.positions():
+                pass
+        except AdmissionRejected as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
-        # Save user message
-        await chat_service.save_message(conv_id, "user", request.message)
+        # Resolve the conversation and load its context
+        conv_id, context = await chat_service.start_turn(user_id, request.conversation_id, request.message)
 
         # Collect full response
-        full_response = ""
+        response_parts = []
         chart_data = None
 
-        async for chunk in chat_service.stream_response(conv_id, request.message):
+        async for chunk in chat_service.stream_response(conv_id, request.message, context):
             if chunk["type"] == "content":
-                full_response += chunk["content"]
+                response_parts.append(chunk["content"])
             elif chunk["type"] == "chart":
                 chart_data = chunk["chartData"]
 
         return {
             "conversationId": conv_id,
-            "response": full_response,
+            "response": "".join(response_parts),
             "chartData": chart_data
         }
 
     finally:
+        ticket.release()
         await chat_service.close()
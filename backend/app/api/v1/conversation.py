@@ -1,19 +1,26 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Annotated, List, Optional
 
 from app.core.database import get_mysql_session
 from app.core.security import get_current_user_id
+from app.models.types import UUID_PATTERN
 from app.services.conversation_service import ConversationService
 from app.schemas.conversation import (
     ConversationResponse,
     ConversationListItem,
     ConversationWithMessages,
     ConversationTitleUpdate,
+    ConversationSearchResponse,
 )
+from app.schemas.chat import MessageChartResponse
 
 router = APIRouter()
 
+# Malformed ids are rejected with 422 instead of reaching the BINARY(16) columns
+ConversationId = Annotated[str, Path(pattern=UUID_PATTERN)]
+MessageId = Annotated[str, Path(pattern=UUID_PATTERN)]
+
 
 @router.get("/", response_model=List[ConversationListItem])
 async def get_conversations(
@@ -25,15 +32,49 @@ async def get_conversations(
     return await service.get_user_conversations(user_id)
 
 
+@router.get("/search", response_model=ConversationSearchResponse)
+async def search_conversations(
+    q: str = Query(..., min_length=2, max_length=200, description="Search terms"),
+    limit: Optional[int] = Query(default=None, ge=1, le=50),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_mysql_session)
+):
+    """Search the current user's messages by relevance."""
+    service = ConversationService(db)
+    return await service.search(user_id, q.strip(), limit=limit, cursor=cursor)
+
+
 @router.get("/{conversation_id}", response_model=ConversationWithMessages)
 async def get_conversation(
-    conversation_id: str,
+    conversation_id: ConversationId,
+    limit: Optional[int] = Query(default=None, ge=1, le=200),
+    before: Optional[str] = Query(
+        default=None,
+        pattern=UUID_PATTERN,
+        description="Load messages older than this message id"
+    ),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_mysql_session)
+):
+    """Get a specific conversation with its newest page of messages."""
+    service = ConversationService(db)
+    return await service.get_conversation(user_id, conversation_id, limit=limit, before=before)
+
+
+@router.get(
+    "/{conversation_id}/messages/{message_id}/chart",
+    response_model=MessageChartResponse
+)
+async def get_message_chart(
+    conversation_id: ConversationId,
+    message_id: MessageId,
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_mysql_session)
 ):
-    """Get a specific conversation with messages."""
+    """Get the chart of a message, loaded on demand."""
     service = ConversationService(db)
-    return await service.get_conversation(user_id, conversation_id)
+    return await service.get_message_chart(user_id, conversation_id, message_id)
 
 
 @router.post("/", response_model=ConversationResponse)
@@ -48,7 +89,7 @@ async def create_conversation(
 
 @router.patch("/{conversation_id}/title", response_model=ConversationResponse)
 async def update_conversation_title(
-    conversation_id: str,
+    conversation_id: ConversationId,
     request: ConversationTitleUpdate,
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_mysql_session)
@@ -60,7 +101,7 @@ async def update_conversation_title(
 
 @router.delete("/{conversation_id}")
 async def delete_conversation(
-    conversation_id: str,
+    conversation_id: ConversationId,
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_mysql_session)
 ):
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+import hashlib
+import time
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class TokenCache:
+    """
+    In-process LRU cache of verified JWT claims.
+
+    Keyed by the SHA-256 of the token, so raw tokens are not kept in
+    memory; an entry is served only until the token's `exp`. Repeated
+    requests with the same token, including SSE reconnects that pass it in
+    the query string, skip signature verification. Bounded by entries.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.AUTH_TOKEN_CACHE_MAX_ENTRIES
+        # token hash -> (claims, exp as epoch seconds)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        # user id -> token hashes, for invalidating a user's tokens
+        self._by_user: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self.key(token)
+        entry = self._entries.get(key)
+        if entry is None or time.time() >= entry[1]:
+            if entry is not None:
+                self._remove(key)
+            metrics.increment("token_cache.misses")
+            return None
+
+        self._entries.move_to_end(key)
+        metrics.increment("token_cache.hits")
+        return dict(entry[0])
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+
+        key = self.key(token)
+        self._remove(key)
+        self._entries[key] = (dict(claims), float(exp))
+        if claims.get("sub"):
+            self._by_user.setdefault(claims["sub"], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            metrics.increment("token_cache.evictions")
+        metrics.set_gauge("token_cache.entries", len(self._entries))
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop every cached token of the user, e.g. when the account is deactivated."""
+        for key in list(self._by_user.get(user_id, ())):
+            self._remove(key)
+        metrics.set_gauge("token_cache.entries", len(self._entries))
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[0].get("sub")
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+
+class UserCache:
+    """
+    Short-TTL in-process cache of user rows by id.
+
+    Stores column values rather than ORM instances, so nothing stays bound
+    to a closed session. Entries live for AUTH_USER_CACHE_TTL_SECONDS and
+    are invalidated when the user is updated, deactivated or deleted
+    through UserRepository; other workers see the change after the TTL.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries or settings.AUTH_USER_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.AUTH_USER_CACHE_TTL_SECONDS
+        # user id -> (column values, stored at)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(user_id)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            if entry is not None:
+                self.invalidate(user_id)
+            metrics.increment("user_cache.misses")
+            return None
+
+        self._entries.move_to_end(user_id)
+        metrics.increment("user_cache.hits")
+        return dict(entry[0])
+
+    def put(self, user_id: str, values: Dict[str, Any]) -> None:
+        self._entries.pop(user_id, None)
+        self._entries[user_id] = (dict(values), time.monotonic())
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            metrics.increment("user_cache.evictions")
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+
+
+# Singleton instances
+token_cache = TokenCache()
+user_cache = UserCache()
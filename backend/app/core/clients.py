@@ -1,35 +1,37 @@
 import httpx
 from typing import Optional
 
+from app.core.llm_pool import LLMPool
+
 
 class SharedClients:
     """Shared HTTP clients managed by lifespan."""
 
-    llm_client: Optional[httpx.AsyncClient] = None
+    llm_pool: Optional[LLMPool] = None
     mcp_client: Optional[httpx.AsyncClient] = None
 
     @classmethod
     async def startup(cls) -> None:
         """Initialize shared clients."""
-        cls.llm_client = httpx.AsyncClient(timeout=120.0)
+        cls.llm_pool = LLMPool.from_settings()
         cls.mcp_client = httpx.AsyncClient(timeout=60.0)
 
     @classmethod
     async def shutdown(cls) -> None:
         """Close shared clients."""
-        if cls.llm_client:
-            await cls.llm_client.aclose()
-            cls.llm_client = None
+        if cls.llm_pool:
+            await cls.llm_pool.close()
+            cls.llm_pool = None
         if cls.mcp_client:
             await cls.mcp_client.aclose()
             cls.mcp_client = None
 
     @classmethod
-    def get_llm_client(cls) -> httpx.AsyncClient:
-        """Get LLM HTTP client."""
-        if cls.llm_client is None:
-            raise RuntimeError("LLM client not initialized")
-        return cls.llm_client
+    def get_llm_pool(cls) -> LLMPool:
+        """Get the LLM endpoint pool."""
+        if cls.llm_pool is None:
+            raise RuntimeError("LLM pool not initialized")
+        return cls.llm_pool
 
     @classmethod
     def get_mcp_client(cls) -> httpx.AsyncClient:
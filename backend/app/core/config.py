@@ -1,3 +1,4 @@
+from typing import Any, Dict, List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -31,9 +32,97 @@ class Settings(BaseSettings):
     LLM_API_BASE_URL: str = "https://api.openai.com/v1"
     LLM_API_KEY: str = ""
     LLM_MODEL: str = "gpt-4o"
+    LLM_TOOL_RESULT_TOKEN_BUDGET: int = 2000  # Max tokens of a tool result sent back to the LLM
+    # Endpoint pool: JSON list of {"base_url", "api_key", "model", "name", "http2", "timeout",
+    # "max_connections", "max_keepalive_connections", "keepalive_expiry"}; empty uses LLM_API_BASE_URL.
+    # Omitted keys fall back to the settings below.
+    LLM_ENDPOINTS: List[Dict[str, Any]] = []
+    LLM_HTTP2: bool = True
+    LLM_TIMEOUT_SECONDS: float = 120.0
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    LLM_TTFT_EWMA_ALPHA: float = 0.2  # Weight of the newest time-to-first-token sample in routing
+    LLM_ENDPOINT_MAX_FAILURES: int = 3  # Consecutive failures before an endpoint leaves rotation
+    LLM_ENDPOINT_COOLDOWN_SECONDS: float = 30.0
+    LLM_HEDGE_ENABLED: bool = False  # Send a second request when the first token is late
+    LLM_HEDGE_PERCENTILE: float = 0.95  # "Late" means slower than this TTFT percentile of the endpoint
+    LLM_HEDGE_MIN_DELAY_MS: int = 500
 
     # MCP Server
     MCP_SERVER_URL: str = "http://localhost:8001"
+    MCP_TOOL_CATALOG_TTL_SECONDS: int = 300
+    MCP_TOOL_CATALOG_CACHE_PATH: str = ".cache/mcp_tools.json"
+
+    # Identical concurrent LLM and MCP requests share one upstream call
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # Speculative tool prefetch
+    SPECULATIVE_PREFETCH_ENABLED: bool = True
+    SPECULATIVE_PREFETCH_TTL_SECONDS: float = 30.0
+
+    # Conversation context
+    CHAT_HISTORY_MESSAGES: int = 20  # Max history messages sent per turn; older ones are summarized
+    CONTEXT_TOKEN_BUDGET: int = 6000  # Prompt tokens: system prompt, tools, summary, history, message
+    CONTEXT_SUMMARY_MAX_TOKENS: int = 500
+    CONTEXT_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    CONTEXT_CACHE_TTL_SECONDS: float = 600.0
+
+    # Exact-match LLM response cache; entries are checked against sensor data versions on hit
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 300.0
+    RESPONSE_CACHE_REPLAY_CHUNK_CHARS: int = 16  # Size of replayed content deltas
+
+    # Chat turn persistence; write-behind trades up to MAX_DELAY_MS of durability for fewer transactions
+    # Queued turns are visible to reads in the same process only; other workers see them after the flush
+    MESSAGE_WRITE_BEHIND_ENABLED: bool = False
+    MESSAGE_WRITE_BEHIND_MAX_DELAY_MS: int = 200
+    MESSAGE_WRITE_BEHIND_BATCH_SIZE: int = 100
+    MESSAGE_WRITE_BEHIND_QUEUE_SIZE: int = 1000
+    MESSAGE_WRITE_BEHIND_ENQUEUE_TIMEOUT_MS: int = 2000  # Wait for room in a full queue
+    MESSAGE_WRITE_BEHIND_RETRIES: int = 3  # Batch retries before turns are written one by one
+    MESSAGE_WRITE_BEHIND_RETRY_BACKOFF_MS: int = 200  # Doubles after each retry
+
+    # SSE streaming; content deltas are batched for up to the interval (0 disables)
+    SSE_COALESCE_INTERVAL_MS: int = 40
+    SSE_COALESCE_MAX_CHARS: int = 512
+    SSE_STREAM_STORE: str = "memory"  # "memory" (per process) or "shared" (Redis-compatible client)
+    SSE_REPLAY_BUFFER_EVENTS: int = 2000  # Events kept per stream for Last-Event-ID resumes
+    SSE_STREAM_TTL_SECONDS: int = 120  # How long a finished stream stays replayable
+    SSE_STREAM_MAX_SECONDS: int = 600  # Generations running longer are stopped
+    SSE_STREAM_POLL_MS: int = 50  # Shared store polling interval
+    SSE_SHUTDOWN_GRACE_SECONDS: float = 10.0  # Wait for cancelled generations to save their answer
+    SSE_HEARTBEAT_SECONDS: float = 15.0  # Comment frame sent when a stream is idle (e.g. long tool calls)
+    SSE_SLOW_CONSUMER_POLICY: str = "coalesce"  # "coalesce", "pause" or "abort"
+    SSE_SLOW_CONSUMER_MAX_LAG: int = 200  # Events a client may fall behind before the policy applies
+    SSE_SLOW_CONSUMER_PAUSE_SECONDS: float = 30.0  # "pause" gives up and stops the stream after this
+
+    # Admission control for chat generations (per process)
+    ADMISSION_MAX_ACTIVE: int = 32  # Generations running at once
+    ADMISSION_MAX_QUEUE: int = 200  # Waiting requests before new ones get 503
+    ADMISSION_MAX_QUEUED_PER_USER: int = 3  # Waiting requests per user before 429
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 120.0
+    ADMISSION_INITIAL_ESTIMATE_SECONDS: float = 15.0  # Generation time assumed until one is measured
+
+    # Password hashing runs on a worker pool so bcrypt does not block the event loop
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 4  # Hashes running at once
+    PASSWORD_HASH_MAX_QUEUE: int = 100  # Waiting hashes before sign-ins get 503
+
+    # Verified JWT claims (kept until exp) and user rows, cached per process
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30.0
+
+    # API responses
+    CONVERSATION_PAGE_SIZE: int = 30  # Messages returned per conversation page
+    CONVERSATION_SEARCH_PAGE_SIZE: int = 20  # Hits returned per search page
+    CONVERSATION_SEARCH_SNIPPET_CHARS: int = 160
+    GZIP_MINIMUM_SIZE: int = 1024  # Bytes; smaller responses are sent uncompressed
+
+    # /metrics requires "Authorization: Bearer <METRICS_TOKEN>"; empty disables the endpoint
+    METRICS_TOKEN: str = ""
 
     @property
     def MYSQL_URL(self) -> str:
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 
 from app.core.config import settings
 
@@ -57,6 +58,21 @@ async def get_mysql_session() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+# Short-lived unit of work for long-running requests (e.g. SSE streams)
+# that must not hold a pooled connection while waiting on the LLM
+@asynccontextmanager
+async def mysql_unit_of_work(
+    session_factory: async_sessionmaker = MySQLSessionLocal
+) -> AsyncIterator[AsyncSession]:
+    async with session_factory() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
 # Dependency for PostgreSQL session
 async def get_postgres_session() -> AsyncGenerator[AsyncSession, None]:
     async with PostgresSessionLocal() as session:
@@ -0,0 +1,278 @@
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import time
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics
+
+
+# Recent time-to-first-token samples kept per endpoint for the hedge percentile
+TTFT_SAMPLES = 200
+
+# Samples needed before the percentile is trusted over LLM_HEDGE_MIN_DELAY_MS
+MIN_HEDGE_SAMPLES = 20
+
+
+class LLMRequestError(Exception):
+    """An LLM request failed; `retryable` if another endpoint may succeed."""
+
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class LLMEndpoint:
+    """
+    One OpenAI-compatible endpoint with its own connection pool and health.
+
+    Tracks an EWMA of time to first token for routing, recent samples for
+    the hedge threshold, and consecutive failures; after
+    LLM_ENDPOINT_MAX_FAILURES it leaves rotation for the cooldown, then
+    gets traffic again as soon as any request succeeds.
+    """
+
+    def __init__(self, config: Dict[str, Any], transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = config["base_url"].rstrip("/")
+        self.name = config.get("name") or self.base_url
+        self.api_key = config.get("api_key", settings.LLM_API_KEY)
+        self.model = config.get("model") or settings.LLM_MODEL
+        self.client = httpx.AsyncClient(
+            http2=config.get("http2", settings.LLM_HTTP2),
+            timeout=config.get("timeout", settings.LLM_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=config.get("max_connections", settings.LLM_MAX_CONNECTIONS),
+                max_keepalive_connections=config.get(
+                    "max_keepalive_connections", settings.LLM_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                keepalive_expiry=config.get("keepalive_expiry", settings.LLM_KEEPALIVE_EXPIRY_SECONDS),
+            ),
+            transport=transport,
+        )
+        self.ttft_ewma: Optional[float] = None
+        self.ttft_samples: Deque[float] = deque(maxlen=TTFT_SAMPLES)
+        self.failures = 0
+        self.unhealthy_until = 0.0
+        self.in_flight = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+    def record_ttft(self, seconds: float) -> None:
+        alpha = settings.LLM_TTFT_EWMA_ALPHA
+        self.ttft_ewma = seconds if self.ttft_ewma is None else alpha * seconds + (1 - alpha) * self.ttft_ewma
+        self.ttft_samples.append(seconds)
+        self.failures = 0
+        metrics.observe(f"llm_pool.{self.name}.ttft_seconds", seconds)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        metrics.increment(f"llm_pool.{self.name}.failures")
+        if self.failures >= settings.LLM_ENDPOINT_MAX_FAILURES:
+            self.unhealthy_until = time.monotonic() + settings.LLM_ENDPOINT_COOLDOWN_SECONDS
+            logger.warning(f"LLM endpoint {self.name} marked unhealthy after {self.failures} failures")
+
+    def ttft_percentile(self, percentile: float) -> Optional[float]:
+        if len(self.ttft_samples) < MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(self.ttft_samples)
+        return ordered[min(int(percentile * len(ordered)), len(ordered) - 1)]
+
+
+class LLMPool:
+    """
+    Routes LLM requests across OpenAI-compatible endpoints.
+
+    Requests go to the healthy endpoint with the lowest EWMA time to first
+    token (endpoints without samples first, so each gets measured). A
+    request that fails before its first token moves on to the next
+    endpoint. With hedging enabled, a second request is sent to the next
+    endpoint once the first token is later than the primary's TTFT
+    percentile; the first to produce a token wins and the other is
+    cancelled.
+    """
+
+    def __init__(self, endpoints: List[LLMEndpoint]):
+        if not endpoints:
+            raise ValueError("LLM pool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.hedge_enabled = settings.LLM_HEDGE_ENABLED
+        self.hedge_percentile = settings.LLM_HEDGE_PERCENTILE
+        self.hedge_min_delay = settings.LLM_HEDGE_MIN_DELAY_MS / 1000
+
+    @classmethod
+    def from_settings(cls) -> "LLMPool":
+        configs = settings.LLM_ENDPOINTS or [{"base_url": settings.LLM_API_BASE_URL}]
+        return cls([LLMEndpoint(config) for config in configs])
+
+    async def close(self) -> None:
+        for endpoint in self.endpoints:
+            await endpoint.client.aclose()
+
+    def ranked(self) -> List[LLMEndpoint]:
+        """Healthy endpoints fastest first; every endpoint if none is healthy."""
+        candidates = [e for e in self.endpoints if e.healthy] or list(self.endpoints)
+        return sorted(candidates, key=lambda e: (e.ttft_ewma is not None, e.ttft_ewma or 0.0, e.in_flight))
+
+    def _hedge_delay(self, endpoint: LLMEndpoint) -> float:
+        threshold = endpoint.ttft_percentile(self.hedge_percentile)
+        return max(threshold or 0.0, self.hedge_min_delay)
+
+    async def stream(self, path: str, body: Dict[str, Any]) -> AsyncIterator[str]:
+        """Yield the response lines of a streaming POST from the endpoint that answers first."""
+        endpoint, response, lines = await self._open_first(path, body)
+        endpoint.in_flight += 1
+        try:
+            async for line in lines:
+                yield line
+        except httpx.HTTPError as e:
+            endpoint.record_failure()
+            raise LLMRequestError(f"LLM stream from {endpoint.name} failed: {e}", retryable=False) from e
+        finally:
+            endpoint.in_flight -= 1
+            await response.aclose()
+
+    async def post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Non-streaming POST, failing over to the next endpoint on retryable errors."""
+        error: Optional[Exception] = None
+        for endpoint in self.ranked():
+            started = time.monotonic()
+            try:
+                response = await endpoint.client.post(
+                    f"{endpoint.base_url}{path}", headers=endpoint.headers(), json=self._body_for(endpoint, body)
+                )
+            except httpx.HTTPError as e:
+                endpoint.record_failure()
+                error = LLMRequestError(f"LLM request to {endpoint.name} failed: {e}", retryable=True)
+                continue
+            if response.status_code == 200:
+                endpoint.record_ttft(time.monotonic() - started)
+                return response.json()
+            error = self._status_error(endpoint, response.status_code, response.text)
+            if not error.retryable:
+                raise error
+            metrics.increment("llm_pool.failovers")
+        raise error
+
+    async def _open_first(
+        self,
+        path: str,
+        body: Dict[str, Any]
+    ) -> Tuple[LLMEndpoint, httpx.Response, AsyncIterator[str]]:
+        """Start the request, hedging and failing over, until one endpoint produces its first line."""
+        candidates = self.ranked()
+        attempts: Dict[asyncio.Task, LLMEndpoint] = {}
+        pending: Set[asyncio.Task] = set()
+        hedged = False
+        error: Optional[Exception] = None
+
+        def launch() -> None:
+            endpoint = candidates[len(attempts)]
+            task = asyncio.create_task(self._open(endpoint, path, body))
+            attempts[task] = endpoint
+            pending.add(task)
+
+        launch()
+        try:
+            while pending:
+                can_hedge = self.hedge_enabled and not hedged and len(attempts) < len(candidates)
+                timeout = self._hedge_delay(candidates[0]) if can_hedge else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    metrics.increment("llm_pool.hedges")
+                    launch()
+                    continue
+
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is None:
+                        if hedged:
+                            winner = "hedge" if attempts[task] is not candidates[0] else "primary"
+                            metrics.increment(f"llm_pool.hedge_wins.{winner}")
+                        # An attempt that finished in the same round is closed with the losers
+                        pending.update(other for other in done if other is not task)
+                        return task.result()
+                    error = task.exception()
+                    if not getattr(error, "retryable", False):
+                        raise error
+
+                # Every request so far failed; fail over to the next endpoint
+                if not pending and len(attempts) < len(candidates):
+                    metrics.increment("llm_pool.failovers")
+                    launch()
+            raise error
+        finally:
+            await self._discard(pending)
+
+    async def _open(
+        self,
+        endpoint: LLMEndpoint,
+        path: str,
+        body: Dict[str, Any]
+    ) -> Tuple[LLMEndpoint, httpx.Response, AsyncIterator[str]]:
+        """Send the request and wait for the first line of the body."""
+        started = time.monotonic()
+        request = endpoint.client.build_request(
+            "POST", f"{endpoint.base_url}{path}", headers=endpoint.headers(), json=self._body_for(endpoint, body)
+        )
+        try:
+            response = await endpoint.client.send(request, stream=True)
+        except httpx.HTTPError as e:
+            endpoint.record_failure()
+            raise LLMRequestError(f"LLM request to {endpoint.name} failed: {e}", retryable=True) from e
+
+        try:
+            if response.status_code != 200:
+                raise self._status_error(endpoint, response.status_code, (await response.aread()).decode())
+
+            lines = response.aiter_lines()
+            first = ""
+            while not first:
+                first = await lines.__anext__()
+            endpoint.record_ttft(time.monotonic() - started)
+            return endpoint, response, self._chain(first, lines)
+        except StopAsyncIteration:
+            await response.aclose()
+            endpoint.record_failure()
+            raise LLMRequestError(f"LLM endpoint {endpoint.name} returned an empty stream", retryable=True)
+        except httpx.HTTPError as e:
+            await response.aclose()
+            endpoint.record_failure()
+            raise LLMRequestError(f"LLM request to {endpoint.name} failed: {e}", retryable=True) from e
+        except BaseException:
+            await response.aclose()
+            raise
+
+    @staticmethod
+    async def _chain(first: str, rest: AsyncIterator[str]) -> AsyncIterator[str]:
+        yield first
+        async for line in rest:
+            yield line
+
+    @staticmethod
+    def _body_for(endpoint: LLMEndpoint, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {**body, "model": endpoint.model}
+
+    @staticmethod
+    def _status_error(endpoint: LLMEndpoint, status: int, text: str) -> LLMRequestError:
+        # Server errors and rate limits are the endpoint's problem; other statuses are the request's
+        retryable = status >= 500 or status == 429
+        if retryable:
+            endpoint.record_failure()
+        return LLMRequestError(f"LLM API error: {status} - {text}", retryable=retryable)
+
+    @staticmethod
+    async def _discard(tasks: Set[asyncio.Task]) -> None:
+        """Cancel losing attempts and close any response that still got through."""
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, tuple):
+                await result[1].aclose()
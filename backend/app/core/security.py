@@ -1,17 +1,24 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Any
+from typing import Any, Callable, Optional, TypeVar
+import asyncio
+import hmac
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from app.core.auth_cache import token_cache
 from app.core.config import settings
+from app.core.metrics import metrics
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # HTTP Bearer scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -24,6 +31,83 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop on a bounded worker pool.
+
+    A bcrypt call takes 100-300 ms; run inline it stalls every stream on
+    the worker. At most PASSWORD_HASH_WORKERS calls run at once, the rest
+    wait here, and once PASSWORD_HASH_MAX_QUEUE are waiting new requests
+    get 503 instead of piling up behind a login burst. The "process"
+    executor sidesteps the GIL if the bcrypt build does not release it.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        executor: Optional[str] = None
+    ):
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_queue = settings.PASSWORD_HASH_MAX_QUEUE if max_queue is None else max_queue
+        self.executor_kind = executor or settings.PASSWORD_HASH_EXECUTOR
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(self.workers)
+        self._executor: Optional[Executor] = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.waiting >= self.max_queue:
+            metrics.increment("password_hash.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent sign-ins, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        queued_at = time.monotonic()
+        self.waiting += 1
+        metrics.set_gauge("password_hash.queue_length", self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+            metrics.set_gauge("password_hash.queue_length", self.waiting)
+
+        started = time.monotonic()
+        metrics.observe("password_hash.wait_seconds", started - queued_at)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._slots.release()
+            metrics.observe("password_hash.run_seconds", time.monotonic() - started)
+
+
+# Singleton instance
+password_hasher = PasswordHasher()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a new access token."""
     to_encode = data.copy()
@@ -56,13 +140,18 @@ def create_refresh_token(data: dict) -> str:
 
 
 def decode_token(token: str) -> dict[str, Any]:
-    """Decode and validate a JWT token."""
+    """Decode and validate a JWT token; verified claims are cached until `exp`."""
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(
             token,
             settings.JWT_SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM]
         )
+        token_cache.put(token, payload)
         return payload
     except JWTError:
         raise HTTPException(
@@ -101,3 +190,21 @@ def verify_token_from_query(token: str) -> str:
         )
 
     return user_id
+
+
+def verify_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> None:
+    """Allow internal endpoints only with the configured METRICS_TOKEN."""
+    if not settings.METRICS_TOKEN:
+        # Not configured: behave as if the endpoint did not exist
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -0,0 +1,113 @@
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+
+from app.core.metrics import metrics
+
+
+class _Flight:
+    """One shared upstream call: the chunks produced so far and who is waiting on them."""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.refs = 0
+        self.task: Optional[asyncio.Task] = None
+        # Replaced on every change; waiters hold the one they saw
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight calls into one upstream call.
+
+    Callers with the same key attach to the running call; a streaming
+    caller that joins late first receives the chunks produced so far.
+    The upstream call runs in its own task and is reference counted: a
+    caller leaving does not affect the others, and the call is cancelled
+    only when the last caller has left. Chunks are shared between callers
+    and must not be mutated.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def stream(self, key: str, factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Yield every chunk of the shared call for `key`, starting it if none is running."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.create_task(self._run(key, flight, factory))
+            metrics.increment(f"single_flight.{self.name}.calls")
+        else:
+            metrics.increment(f"single_flight.{self.name}.shared")
+        flight.refs += 1
+
+        try:
+            position = 0
+            while True:
+                changed = flight.changed
+                while position < len(flight.chunks):
+                    yield flight.chunks[position]
+                    position += 1
+                if flight.done:
+                    if flight.error is not None:
+                        if isinstance(flight.error, asyncio.CancelledError):
+                            raise Exception("Shared upstream call was cancelled")
+                        raise flight.error
+                    return
+                await changed.wait()
+        finally:
+            flight.refs -= 1
+            if flight.refs == 0 and not flight.done:
+                # Nobody is left to receive the result
+                metrics.increment(f"single_flight.{self.name}.cancelled")
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    async def call(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the shared result for `key`, starting the call if none is running."""
+        async def once() -> AsyncIterator[Any]:
+            yield await factory()
+
+        async with aclosing(self.stream(key, once)) as results:
+            async for result in results:
+                return result
+
+    async def _run(self, key: str, flight: _Flight, factory: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            async with aclosing(factory()) as chunks:
+                async for chunk in chunks:
+                    flight.chunks.append(chunk)
+                    flight.notify()
+        except BaseException as e:
+            flight.error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            flight.done = True
+            self._forget(key, flight)
+            flight.notify()
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        # Later callers start a fresh call instead of joining a finished or abandoned one
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+# Singleton instances
+llm_single_flight = SingleFlight("llm")
+mcp_single_flight = SingleFlight("mcp")
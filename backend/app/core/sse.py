@@ -0,0 +1,109 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+import time
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+def format_sse(event: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Serialize one event as an SSE frame; the id lets EventSource resume with Last-Event-ID."""
+    frame = "data: " + json.dumps(event, ensure_ascii=False) + "\n\n"
+    return frame if event_id is None else f"id: {event_id}\n" + frame
+
+
+def format_heartbeat() -> str:
+    """SSE comment frame; EventSource ignores it but proxies see traffic."""
+    return ": heartbeat\n\n"
+
+
+async def coalesce_content(
+    source: AsyncIterator[Dict[str, Any]],
+    interval_ms: Optional[int] = None,
+    max_chars: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Batch consecutive content deltas into fewer events.
+
+    Buffered text is flushed once `interval_ms` has passed since the first
+    buffered delta, once it reaches `max_chars`, or before any other event.
+    The first delta goes out immediately so time to first token is not
+    delayed. Other events (chart, done, error) are never held back.
+    """
+    interval = (settings.SSE_COALESCE_INTERVAL_MS if interval_ms is None else interval_ms) / 1000
+    max_chars = max_chars or settings.SSE_COALESCE_MAX_CHARS
+
+    iterator = source.__aiter__()
+    buffer: List[str] = []
+    buffered_chars = 0
+    deadline = 0.0
+    first_content = True
+    pending: Optional[asyncio.Future] = None
+    frames = deltas = 0
+    started_at = time.monotonic()
+
+    def flush() -> Dict[str, Any]:
+        nonlocal buffer, buffered_chars, frames
+        event = {"type": "content", "content": "".join(buffer)}
+        buffer, buffered_chars = [], 0
+        frames += 1
+        return event
+
+    try:
+        while True:
+            if pending is None:
+                # Kept across timeouts so waiting never cancels the source
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = max(deadline - time.monotonic(), 0) if buffer else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                yield flush()
+                continue
+
+            future, pending = pending, None
+            try:
+                chunk = future.result()
+            except StopAsyncIteration:
+                break
+            except Exception:
+                # Deliver what was already generated before the error surfaces
+                if buffer:
+                    yield flush()
+                raise
+
+            if chunk.get("type") != "content":
+                if buffer:
+                    yield flush()
+                frames += 1
+                yield chunk
+                continue
+
+            deltas += 1
+            if first_content or interval <= 0:
+                first_content = False
+                frames += 1
+                yield chunk
+                continue
+
+            if not buffer:
+                deadline = time.monotonic() + interval
+            buffer.append(chunk["content"])
+            buffered_chars += len(chunk["content"])
+            if buffered_chars >= max_chars:
+                yield flush()
+
+        if buffer:
+            yield flush()
+    finally:
+        if pending is not None:
+            pending.cancel()
+            # Let the source unwind (and save what it produced) before returning
+            await asyncio.wait({pending})
+        elif hasattr(iterator, "aclose"):
+            await iterator.aclose()
+        elapsed = time.monotonic() - started_at
+        metrics.increment("sse.frames", frames)
+        metrics.increment("sse.content_deltas", deltas)
+        if elapsed > 0:
+            metrics.observe("sse.frames_per_second", frames / elapsed)
@@ -0,0 +1,18 @@
+import json
+from typing import Any
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a string without a model-specific tokenizer.
+
+    ASCII text averages about four characters per token, while Korean and
+    other non-ASCII characters are close to one token each.
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def estimate_json_tokens(value: Any) -> int:
+    """Estimate the token count of a value once serialized as JSON."""
+    return estimate_tokens(json.dumps(value, ensure_ascii=False, default=str))
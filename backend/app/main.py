@@ -1,10 +1,17 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import metrics
 from app.core.clients import SharedClients
+from app.core.security import password_hasher, verify_metrics_token
+from app.services.tool_catalog import tool_catalog
+from app.services.turn_writer import turn_writer
+from app.services.context_builder import rolling_summarizer
+from app.services.stream_manager import stream_manager
 from app.api.v1.router import api_router
 
 
@@ -14,11 +21,18 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.APP_NAME}...")
     await SharedClients.startup()
     logger.info("Shared HTTP clients initialized")
+    await tool_catalog.startup()
+    await turn_writer.startup()
     yield
     # Shutdown
     logger.info(f"Shutting down {settings.APP_NAME}...")
+    await stream_manager.shutdown()
+    await rolling_summarizer.shutdown()
+    await turn_writer.shutdown()
+    await tool_catalog.shutdown()
     await SharedClients.shutdown()
     logger.info("Shared HTTP clients closed")
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -47,6 +61,9 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Compress JSON responses; text/event-stream is never compressed so SSE is not buffered
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -60,6 +77,12 @@ async def root():
     }
 
 
+@app.get("/metrics", dependencies=[Depends(verify_metrics_token)], include_in_schema=False)
+async def get_metrics():
+    """Process-local performance counters, for internal monitoring only."""
+    return metrics.snapshot()
+
+
 @app.get("/health")
 async def health_check():
     """
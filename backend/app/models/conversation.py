@@ -1,19 +1,22 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
 
 from app.core.database import Base
+from app.models.types import BinaryUUID, PreciseDateTime, uuid7
 
 
 class Conversation(Base):
     __tablename__ = "conversations"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(BinaryUUID, primary_key=True, default=uuid7)
+    user_id = Column(BinaryUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String(255), default="새 대화")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), index=True)
+    # Rolling summary of every message created up to summary_until
+    summary = Column(Text, nullable=True)
+    summary_until = Column(PreciseDateTime, nullable=True)
 
     # Relationships
     user = relationship("User", back_populates="conversations")
@@ -1,10 +1,10 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Text, ForeignKey, Enum, Index, JSON
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
-import uuid
 import enum
 
 from app.core.database import Base
+from app.models.types import BinaryUUID, PreciseDateTime, uuid7
 
 
 class MessageRole(str, enum.Enum):
@@ -15,13 +15,20 @@ class MessageRole(str, enum.Enum):
 
 class Message(Base):
     __tablename__ = "messages"
-
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    conversation_id = Column(String(36), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False, index=True)
+    __table_args__ = (
+        # History and page queries filter by conversation and order by time
+        Index("idx_conversation_created", "conversation_id", "created_at"),
+        # Conversation search; ngram tokenizes Korean, which has no word delimiters
+        Index("ft_content", "content", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
+
+    id = Column(BinaryUUID, primary_key=True, default=uuid7)
+    conversation_id = Column(BinaryUUID, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
     role = Column(Enum(MessageRole, values_callable=lambda x: [e.value for e in x]), nullable=False)
     content = Column(Text, nullable=False)
-    chart_data = Column(JSON, nullable=True)  # ECharts 옵션 저장
-    created_at = Column(DateTime, server_default=func.now(), index=True)
+    # ECharts 옵션 저장; large, so only loaded on demand
+    chart_data = deferred(Column(JSON(none_as_null=True), nullable=True))
+    created_at = Column(PreciseDateTime, server_default=func.now(6), index=True)
 
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
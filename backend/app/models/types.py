@@ -0,0 +1,81 @@
+from typing import Any, Optional
+import os
+import threading
+import time
+import uuid
+
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import BINARY, DateTime, TypeDecorator
+
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> str:
+    """
+    Generate a time-ordered UUIDv7 (RFC 9562) in canonical string form.
+
+    The top 48 bits are the Unix time in milliseconds, so new rows land at
+    the end of the clustered index instead of at random pages. Within one
+    millisecond the 12-bit rand_a field is a counter seeded randomly, which
+    keeps ids generated by this process strictly increasing.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _uuid7_last_ms:
+            _uuid7_last_ms = ms
+            _uuid7_counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            # Same millisecond (or the clock went back): count up, borrowing the next ms on overflow
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+            ms = _uuid7_last_ms
+        counter = _uuid7_counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b
+    return str(uuid.UUID(int=value))
+
+
+# Canonical UUID text, for validating ids at the API boundary before they reach a query
+UUID_PATTERN = r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+
+
+# Microsecond timestamps for values compared against Python-generated times
+# (message order, summary boundaries); whole seconds would round and tie
+PreciseDateTime = DateTime().with_variant(mysql.TIMESTAMP(fsp=6), "mysql")
+
+
+class BinaryUUID(TypeDecorator):
+    """
+    UUID stored as BINARY(16) and exposed to Python as its canonical string.
+
+    Half the size of VARCHAR(36) in the primary key and in every secondary
+    index that carries it. Binding a value that is not a UUID raises
+    ValueError; the API rejects malformed ids with UUID_PATTERN first.
+    """
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value.bytes
+        if isinstance(value, bytes) and len(value) == 16:
+            return value
+        try:
+            return uuid.UUID(str(value)).bytes
+        except ValueError:
+            raise ValueError(f"Not a UUID: {value!r}") from None
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=bytes(value)))
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, update, desc, func
+from sqlalchemy.engine import Row
+from datetime import datetime
 from typing import Optional, List
 
 from app.models.conversation import Conversation
@@ -17,22 +18,48 @@ class ConversationRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_by_id_with_messages(self, conversation_id: str) -> Optional[Conversation]:
+    async def get_user_conversations(self, user_id: str, limit: int = 50) -> List[Conversation]:
         result = await self.db.execute(
             select(Conversation)
-            .options(selectinload(Conversation.messages))
-            .where(Conversation.id == conversation_id)
+            .where(Conversation.user_id == user_id)
+            .order_by(desc(Conversation.updated_at))
+            .limit(limit)
         )
-        return result.scalar_one_or_none()
+        return list(result.scalars().all())
 
-    async def get_user_conversations(self, user_id: str, limit: int = 50) -> List[Conversation]:
+    async def get_user_conversations_with_preview(
+        self,
+        user_id: str,
+        limit: int = 50,
+        preview_length: int = 100
+    ) -> List[Row]:
+        """
+        List conversations with a preview of their latest message in one query.
+
+        The preview is a correlated LIMIT 1 subquery that reads only a
+        truncated content column, never chart_data.
+        """
+        last_message = (
+            select(func.substr(Message.content, 1, preview_length))
+            .where(Message.conversation_id == Conversation.id)
+            # A turn's messages share a second; ids are time-ordered and break the tie
+            .order_by(desc(Message.created_at), desc(Message.id))
+            .limit(1)
+            .correlate(Conversation)
+            .scalar_subquery()
+        )
         result = await self.db.execute(
-            select(Conversation)
+            select(
+                Conversation.id,
+                Conversation.title,
+                Conversation.updated_at,
+                last_message.label("last_message"),
+            )
             .where(Conversation.user_id == user_id)
             .order_by(desc(Conversation.updated_at))
             .limit(limit)
         )
-        return list(result.scalars().all())
+        return list(result.all())
 
     async def create(self, user_id: str, title: str = "새 대화") -> Conversation:
         conversation = Conversation(
@@ -50,12 +77,31 @@ class ConversationRepository:
         await self.db.refresh(conversation)
         return conversation
 
-    async def touch(self, conversation: Conversation) -> None:
-        """Update the updated_at timestamp."""
+    async def insert_many(self, rows: List[dict]) -> None:
+        """Insert conversations whose ids were generated client-side, without a refresh."""
+        await self.db.execute(insert(Conversation.__table__), rows)
+
+    async def touch(self, conversation_id: str, title: Optional[str] = None) -> None:
+        """Bump updated_at, and set the title if given, in a single UPDATE."""
+        values = {"updated_at": func.now()}
+        if title is not None:
+            values["title"] = title
         await self.db.execute(
-            Conversation.__table__.update()
-            .where(Conversation.id == conversation.id)
-            .values(updated_at=None)  # triggers onupdate
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(**values)
+        )
+
+    async def update_summary(self, conversation_id: str, summary: str, summary_until: datetime) -> None:
+        """Store the rolling summary without reordering the conversation list."""
+        await self.db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(
+                summary=summary,
+                summary_until=summary_until,
+                updated_at=Conversation.updated_at,
+            )
         )
 
     async def delete(self, conversation: Conversation) -> None:
@@ -1,7 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from typing import Optional, List
+from sqlalchemy import select, insert, desc, and_, or_
+from sqlalchemy.dialects import mysql
+from sqlalchemy.engine import Row
+from datetime import datetime
+from typing import Optional, List, Tuple
 
+from app.models.conversation import Conversation
 from app.models.message import Message, MessageRole
 
 
@@ -24,27 +28,119 @@ class MessageRepository:
         result = await self.db.execute(
             select(Message)
             .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at)
+            .order_by(Message.created_at, Message.id)
             .limit(limit)
             .offset(offset)
         )
         return list(result.scalars().all())
 
-    async def get_recent_messages(
+    async def get_page(
         self,
         conversation_id: str,
-        limit: int = 20
-    ) -> List[Message]:
-        """Get the most recent messages for context."""
-        result = await self.db.execute(
-            select(Message)
+        limit: int = 50,
+        before: Optional[str] = None
+    ) -> Tuple[List[Tuple[Message, bool]], bool]:
+        """
+        Keyset page of the newest messages older than the `before` message id.
+
+        Returns (message, has_chart) pairs in chronological order and whether
+        older messages remain. chart_data itself is not read.
+        """
+        query = (
+            select(Message, Message.chart_data.is_not(None).label("has_chart"))
             .where(Message.conversation_id == conversation_id)
-            .order_by(desc(Message.created_at))
-            .limit(limit)
         )
+        if before:
+            cursor = (
+                select(Message.created_at)
+                .where(Message.id == before, Message.conversation_id == conversation_id)
+                .scalar_subquery()
+            )
+            # id breaks ties between messages created within the same second
+            query = query.where(or_(
+                Message.created_at < cursor,
+                and_(Message.created_at == cursor, Message.id < before),
+            ))
+
+        result = await self.db.execute(
+            query
+            .order_by(desc(Message.created_at), desc(Message.id))
+            .limit(limit + 1)
+        )
+        rows = [(row.Message, bool(row.has_chart)) for row in result.all()]
+        has_more = len(rows) > limit
+        return list(reversed(rows[:limit])), has_more
+
+    async def get_chart_data(self, conversation_id: str, message_id: str) -> Optional[dict]:
+        """Load only the deferred chart_data column of one message."""
+        result = await self.db.execute(
+            select(Message.chart_data)
+            .where(Message.id == message_id, Message.conversation_id == conversation_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_recent_messages(
+        self,
+        conversation_id: str,
+        limit: Optional[int] = 20,
+        after: Optional[datetime] = None
+    ) -> List[Message]:
+        """Get the most recent messages for context, optionally only those created after `after`; no limit if None."""
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        if after is not None:
+            query = query.where(Message.created_at > after)
+        # Ids are time-ordered, so they keep a turn's user and assistant messages in order within a second
+        query = query.order_by(desc(Message.created_at), desc(Message.id))
+        if limit is not None:
+            query = query.limit(limit)
+        result = await self.db.execute(query)
         messages = list(result.scalars().all())
         return list(reversed(messages))  # Return in chronological order
 
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 20,
+        after: Optional[Tuple[float, str]] = None
+    ) -> Tuple[List[Row], bool]:
+        """
+        Rank the user's messages by FULLTEXT relevance to `query`.
+
+        Uses the ngram index on messages.content in natural language mode.
+        Keyset pagination continues after the (score, message id) of the
+        previous page's last hit. Returns rows with the conversation title
+        and whether more hits remain.
+        """
+        score = mysql.match(Message.content, against=query).in_natural_language_mode()
+        stmt = (
+            select(
+                Message.id,
+                Message.conversation_id,
+                Message.role,
+                Message.content,
+                Message.created_at,
+                Conversation.title,
+                score.label("score"),
+            )
+            .join(Conversation, Conversation.id == Message.conversation_id)
+            .where(Conversation.user_id == user_id, score > 0)
+        )
+        if after is not None:
+            after_score, after_id = after
+            stmt = stmt.where(or_(
+                score < after_score,
+                and_(score == after_score, Message.id < after_id),
+            ))
+
+        result = await self.db.execute(
+            stmt
+            .order_by(desc("score"), desc(Message.id))
+            .limit(limit + 1)
+        )
+        rows = list(result.all())
+        return rows[:limit], len(rows) > limit
+
     async def create(
         self,
         conversation_id: str,
@@ -62,9 +158,14 @@ class MessageRepository:
         )
         self.db.add(message)
         await self.db.flush()
-        await self.db.refresh(message)
+        # Only created_at is server-generated; a full refresh would expire the deferred chart_data
+        await self.db.refresh(message, attribute_names=["created_at"])
         return message
 
+    async def insert_many(self, rows: List[dict]) -> None:
+        """Insert messages with client-generated ids in one executemany, without a refresh."""
+        await self.db.execute(insert(Message.__table__), rows)
+
     async def delete(self, message: Message) -> None:
         await self.db.delete(message)
         await self.db.flush()
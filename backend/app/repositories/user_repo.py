@@ -2,6 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Optional
 
+from app.core.auth_cache import token_cache, user_cache
 from app.models.user import User
 
 
@@ -15,6 +16,22 @@ class UserRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_by_id_cached(self, user_id: str) -> Optional[User]:
+        """
+        Like get_by_id, but served from a short-TTL cache.
+
+        Returns a detached snapshot for reads; use get_by_id for a user
+        that will be modified.
+        """
+        values = user_cache.get(user_id)
+        if values is None:
+            user = await self.get_by_id(user_id)
+            if user is None:
+                return None
+            values = {c.key: getattr(user, c.key) for c in User.__table__.columns}
+            user_cache.put(user_id, values)
+        return User(**values)
+
     async def get_by_email(self, email: str) -> Optional[User]:
         result = await self.db.execute(
             select(User).where(User.email == email)
@@ -35,8 +52,18 @@ class UserRepository:
     async def update(self, user: User) -> User:
         await self.db.flush()
         await self.db.refresh(user)
+        user_cache.invalidate(user.id)
+        return user
+
+    async def deactivate(self, user: User) -> User:
+        """Disable the account and drop its cached row and verified tokens."""
+        user.is_active = False
+        user = await self.update(user)
+        token_cache.invalidate_user(user.id)
         return user
 
     async def delete(self, user: User) -> None:
         await self.db.delete(user)
         await self.db.flush()
+        user_cache.invalidate(user.id)
+        token_cache.invalidate_user(user.id)
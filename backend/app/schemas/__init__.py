@@ -9,6 +9,7 @@ from app.schemas.chat import (
     ChatRequest,
     ChatResponse,
     MessageResponse,
+    MessageChartResponse,
     StreamChunk,
 )
 from app.schemas.conversation import (
@@ -27,6 +28,7 @@ __all__ = [
     "ChatRequest",
     "ChatResponse",
     "MessageResponse",
+    "MessageChartResponse",
     "StreamChunk",
     "ConversationCreate",
     "ConversationResponse",
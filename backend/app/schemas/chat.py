@@ -1,10 +1,12 @@
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from datetime import datetime
 from typing import Optional, Literal
 
+from app.models.types import UUID_PATTERN
+
 
 class ChatRequest(BaseModel):
-    conversation_id: Optional[str] = None
+    conversation_id: Optional[str] = Field(default=None, pattern=UUID_PATTERN)
     message: str = Field(..., min_length=1)
 
 
@@ -16,8 +18,20 @@ class MessageResponse(BaseModel):
     role: str
     content: str
     chart_data: Optional[dict] = None
+    has_chart: bool = False
     created_at: datetime
 
+    @model_validator(mode="after")
+    def _set_has_chart(self) -> "MessageResponse":
+        if self.chart_data is not None:
+            self.has_chart = True
+        return self
+
+
+class MessageChartResponse(BaseModel):
+    message_id: str
+    chart_data: Optional[dict] = None
+
 
 class ChatResponse(BaseModel):
     conversation_id: str
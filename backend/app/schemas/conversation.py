@@ -37,6 +37,24 @@ class ConversationWithMessages(BaseModel):
     created_at: datetime
     updated_at: datetime
     messages: List[MessageResponse]
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # Pass as `before` to load older messages
+
+
+class ConversationSearchHit(BaseModel):
+    conversation_id: str
+    conversation_title: str
+    message_id: str
+    role: str
+    snippet: str
+    highlights: List[List[int]] = []  # [start, end) offsets of matched terms in snippet
+    score: float
+    created_at: datetime
+
+
+class ConversationSearchResponse(BaseModel):
+    results: List[ConversationSearchHit]
+    next_cursor: Optional[str] = None  # Pass as `cursor` to load the next page
 
 
 class ConversationTitleUpdate(BaseModel):
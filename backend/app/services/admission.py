@@ -0,0 +1,196 @@
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Optional
+import asyncio
+import math
+import time
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class AdmissionRejected(Exception):
+    """
+    The request cannot wait for a slot; retry after `retry_after` seconds.
+
+    `status_code` is 429 when the user's own queue is full and 503 when the
+    server is.
+    """
+
+    def __init__(self, retry_after: int, status_code: int = 503):
+        super().__init__(f"Too many concurrent chat requests, retry after {retry_after}s")
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class Ticket:
+    """A request's place in the admission queue, and its slot once admitted."""
+
+    def __init__(self, controller: "AdmissionController", user_id: str):
+        self.controller = controller
+        self.user_id = user_id
+        self.admitted = False
+        self.released = False
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: Optional[float] = None
+
+    @property
+    def position(self) -> int:
+        """1-based position in the admission order; 0 once admitted."""
+        return 0 if self.admitted else self.controller.position(self)
+
+    @property
+    def estimated_wait(self) -> float:
+        return self.controller.estimate_wait(self.position)
+
+    async def positions(self, timeout: Optional[float] = None) -> AsyncIterator[int]:
+        """
+        Yield the queue position each time it changes, until admitted.
+
+        Raises AdmissionRejected if still queued after `timeout` seconds.
+        """
+        timeout = settings.ADMISSION_QUEUE_TIMEOUT_SECONDS if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        last = None
+        while not self.admitted:
+            if self.position != last:
+                last = self.position
+                yield last
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                metrics.increment("admission.timeouts")
+                raise AdmissionRejected(math.ceil(self.estimated_wait))
+            try:
+                await asyncio.wait_for(self.controller.changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self) -> None:
+        """Give up the slot, or the place in the queue; safe to call more than once."""
+        if not self.released:
+            self.released = True
+            self.controller.release(self)
+
+
+class AdmissionController:
+    """
+    Limits concurrent chat generations with a per-user fair-share queue.
+
+    At most `max_active` generations run at once. Waiting requests are
+    kept in one FIFO per user and admitted round-robin across users, so a
+    user sending many requests cannot starve the others. When the queue
+    is full, new requests are rejected with a Retry-After estimate based
+    on the average generation time. Limits apply per process.
+    """
+
+    def __init__(
+        self,
+        max_active: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_queued_per_user: Optional[int] = None
+    ):
+        self.max_active = max_active or settings.ADMISSION_MAX_ACTIVE
+        self.max_queue = settings.ADMISSION_MAX_QUEUE if max_queue is None else max_queue
+        self.max_queued_per_user = max_queued_per_user or settings.ADMISSION_MAX_QUEUED_PER_USER
+        self.active = 0
+        # user id -> waiting tickets; insertion order is the round-robin order
+        self._queues: "OrderedDict[str, Deque[Ticket]]" = OrderedDict()
+        self._queued = 0
+        # Average generation time, seeded so the first estimates are not zero
+        self._avg_seconds = settings.ADMISSION_INITIAL_ESTIMATE_SECONDS
+        self._changed = asyncio.Event()
+
+    @property
+    def changed(self) -> asyncio.Event:
+        return self._changed
+
+    def enter(self, user_id: str) -> Ticket:
+        """Admit a request or queue it; raises AdmissionRejected when it cannot wait."""
+        ticket = Ticket(self, user_id)
+        if self.active < self.max_active and not self._queued:
+            self._admit(ticket)
+            return ticket
+
+        user_queue = self._queues.get(user_id)
+        retry_after = math.ceil(self.estimate_wait(self._queued + 1))
+        if user_queue and len(user_queue) >= self.max_queued_per_user:
+            metrics.increment("admission.rejected")
+            raise AdmissionRejected(retry_after, status_code=429)
+        if self._queued >= self.max_queue:
+            metrics.increment("admission.rejected")
+            raise AdmissionRejected(retry_after)
+
+        self._queues.setdefault(user_id, deque()).append(ticket)
+        self._queued += 1
+        metrics.increment("admission.queued")
+        self._publish()
+        return ticket
+
+    def position(self, ticket: Ticket) -> int:
+        """Where the ticket is in the round-robin admission order."""
+        user_queue = self._queues.get(ticket.user_id)
+        if not user_queue or ticket not in user_queue:
+            return 0
+        rank = user_queue.index(ticket)
+        ahead = rank
+        for user_id, other in self._queues.items():
+            if user_id == ticket.user_id:
+                continue
+            # Users before this one in the rotation also get a turn in the ticket's own round
+            ahead += min(len(other), rank + 1 if self._before(user_id, ticket.user_id) else rank)
+        return ahead + 1
+
+    def estimate_wait(self, position: int) -> float:
+        return position * self._avg_seconds / self.max_active
+
+    def release(self, ticket: Ticket) -> None:
+        if ticket.admitted:
+            self.active -= 1
+            elapsed = time.monotonic() - ticket.admitted_at
+            self._avg_seconds = 0.2 * elapsed + 0.8 * self._avg_seconds
+            metrics.observe("admission.generation_seconds", elapsed)
+        else:
+            user_queue = self._queues.get(ticket.user_id)
+            if user_queue and ticket in user_queue:
+                user_queue.remove(ticket)
+                self._queued -= 1
+                if not user_queue:
+                    del self._queues[ticket.user_id]
+                metrics.increment("admission.abandoned")
+        self._drain()
+
+    def _before(self, user_id: str, other_id: str) -> bool:
+        for queued_user in self._queues:
+            if queued_user == user_id:
+                return True
+            if queued_user == other_id:
+                return False
+        return False
+
+    def _admit(self, ticket: Ticket) -> None:
+        ticket.admitted = True
+        ticket.admitted_at = time.monotonic()
+        self.active += 1
+        metrics.observe("admission.wait_seconds", ticket.admitted_at - ticket.enqueued_at)
+
+    def _drain(self) -> None:
+        """Admit waiting tickets round-robin while slots are free."""
+        while self.active < self.max_active and self._queues:
+            user_id, user_queue = next(iter(self._queues.items()))
+            self._admit(user_queue.popleft())
+            self._queued -= 1
+            # The user goes to the back of the rotation
+            del self._queues[user_id]
+            if user_queue:
+                self._queues[user_id] = user_queue
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge("admission.active", self.active)
+        metrics.set_gauge("admission.queue_length", self._queued)
+        # Wake every waiter; each checks whether it was admitted or moved up
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+# Singleton instance
+admission_controller = AdmissionController()
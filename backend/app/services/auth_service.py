@@ -4,8 +4,7 @@ from fastapi import HTTPException, status
 from app.repositories.user_repo import UserRepository
 from app.schemas.auth import UserCreate, UserResponse, LoginRequest, TokenResponse
 from app.core.security import (
-    get_password_hash,
-    verify_password,
+    password_hasher,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -27,7 +26,7 @@ class AuthService:
             )
 
         # Create user
-        password_hash = get_password_hash(request.password)
+        password_hash = await password_hasher.hash(request.password)
         user = await self.user_repo.create(
             email=request.email,
             password_hash=password_hash,
@@ -54,7 +53,7 @@ class AuthService:
             )
 
         # Verify password
-        if not verify_password(request.password, user.password_hash):
+        if not await password_hasher.verify(request.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
@@ -96,7 +95,7 @@ class AuthService:
             )
 
         # Find user
-        user = await self.user_repo.get_by_id(user_id)
+        user = await self.user_repo.get_by_id_cached(user_id)
         if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -114,7 +113,7 @@ class AuthService:
         )
 
     async def get_current_user(self, user_id: str) -> UserResponse:
-        user = await self.user_repo.get_by_id(user_id)
+        user = await self.user_repo.get_by_id_cached(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
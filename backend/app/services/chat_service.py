@@ -1,12 +1,23 @@
-from typing import AsyncGenerator, Dict, Any, Optional, List
-from sqlalchemy.ext.asyncio import AsyncSession
-import json
+from typing import AsyncGenerator, Awaitable, Dict, Any, Optional, List, Tuple
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from datetime import datetime, timezone
+import asyncio
 
 from app.repositories.conversation_repo import ConversationRepository
 from app.repositories.message_repo import MessageRepository
 from app.services.llm_client import LLMClient
 from app.services.mcp_client import MCPClient
-from app.schemas.chat import MessageResponse
+from app.services.tool_result_compactor import ToolResultCompactor
+from app.services.prefetch import PrefetchCache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.database import MySQLSessionLocal, mysql_unit_of_work
+from app.models.message import MessageRole
+from app.models.types import uuid7
+from app.services.turn_writer import TurnWriter, turn_writer
+from app.services.context_cache import ContextCache, context_cache
+from app.services.context_builder import ContextBuilder, RollingSummarizer, rolling_summarizer
+from app.services.response_cache import CachedResponse, ResponseCache, response_cache
 
 
 SYSTEM_PROMPT = """당신은 반도체 공정 인프라를 관리하는 AI 어시스턴트입니다.
@@ -28,6 +39,7 @@ SYSTEM_PROMPT = """당신은 반도체 공정 인프라를 관리하는 AI 어
 - 질문하지 말고 바로 도구를 호출하세요. 기본값으로 temperature 센서와 최근 24시간 데이터를 사용하세요
 - 사용자가 센서 데이터나 통계를 요청하면 get_sensor_data 또는 get_sensor_statistics 도구를 사용하세요
 - 장비 목록이 필요하면 list_equipment 도구를 사용하세요
+- 한 번의 답변에는 차트를 하나만 생성할 수 있습니다. generate_sensor_chart는 한 번만 호출하세요
 
 ## 응답 형식
 - 한국어로 답변하세요
@@ -37,124 +49,359 @@ SYSTEM_PROMPT = """당신은 반도체 공정 인프라를 관리하는 AI 어
 """
 
 
+# A message stores and renders one chart, so each answer runs at most one chart call
+CHART_TOOL = "generate_sensor_chart"
+
+
+async def skip_extra_chart() -> Dict[str, Any]:
+    """Tool result for chart calls after the first one of an answer."""
+    return {"skipped": "한 번의 답변에는 차트를 하나만 생성할 수 있습니다. 다른 차트는 다음 질문으로 요청하도록 안내하세요."}
+
+
+def utcnow() -> datetime:
+    """Naive UTC timestamp, matching MySQL CURRENT_TIMESTAMP in a UTC session."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class ChatService:
-    def __init__(self, db: AsyncSession):
-        self.db = db
-        self.conversation_repo = ConversationRepository(db)
-        self.message_repo = MessageRepository(db)
+    """
+    Chat orchestration.
+
+    A turn reads its context from the in-process context cache, or in one
+    short unit of work on a miss, and writes the conversation, both messages
+    and the title in one transaction at the end, so no pooled MySQL
+    connection is held while the LLM and tools run.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = MySQLSessionLocal,
+        writer: Optional[TurnWriter] = None,
+        cache: Optional[ContextCache] = None,
+        summarizer: Optional[RollingSummarizer] = None,
+        responses: Optional[ResponseCache] = None
+    ):
+        self.session_factory = session_factory
+        self.turn_writer = writer or turn_writer
+        self.context_cache = cache or context_cache
+        self.summarizer = summarizer or rolling_summarizer
+        self.context_builder = ContextBuilder()
+        # Opt-in: answers replayed from cache are not regenerated by the model
+        self.response_cache = responses or (response_cache if settings.RESPONSE_CACHE_ENABLED else None)
         self.llm_client = LLMClient()
         self.mcp_client = MCPClient()
+        self.tool_result_compactor = ToolResultCompactor()
+        self.turn: Dict[str, Any] = {}
 
-    async def get_or_create_conversation(
+    async def start_turn(
         self,
         user_id: str,
-        conversation_id: Optional[str] = None
-    ) -> str:
-        """Get existing conversation or create a new one."""
-        if conversation_id:
-            conversation = await self.conversation_repo.get_by_id(conversation_id)
-            if conversation and conversation.user_id == user_id:
-                return conversation_id
-
-        # Create new conversation
-        conversation = await self.conversation_repo.create(user_id)
-        return conversation.id
-
-    async def save_message(
+        conversation_id: Optional[str],
+        user_message: str
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Resolve the conversation and load its context. Nothing is written yet.
+
+        Returns the conversation id and its context: the rolling summary and
+        the messages created after it. A new conversation gets a client-side
+        id and is inserted by `finish_turn`.
+        """
+        conv_id, context = None, {"summary": None, "summary_until": None, "messages": []}
+
+        cached = self.context_cache.get(conversation_id) if conversation_id else None
+        if cached is not None and cached[0] == user_id:
+            # Served from this process's last write; no queries needed
+            conv_id, context = conversation_id, cached[1]
+        elif conversation_id:
+            loaded = await self._load_context(user_id, conversation_id)
+            if loaded is not None:
+                conv_id, context = conversation_id, loaded
+                self.context_cache.put(conv_id, user_id, context)
+
+        self.turn = {
+            "conversation_id": conv_id or uuid7(),
+            "user_id": user_id,
+            "is_new": conv_id is None,
+            "started_at": utcnow(),
+        }
+        return self.turn["conversation_id"], context
+
+    async def finish_turn(
         self,
         conversation_id: str,
-        role: str,
-        content: str,
-        chart_data: Optional[Dict] = None
-    ) -> MessageResponse:
-        """Save a message to the database."""
-        message = await self.message_repo.create(
-            conversation_id=conversation_id,
-            role=role,
-            content=content,
-            chart_data=chart_data
-        )
-        return MessageResponse.model_validate(message)
+        user_message: str,
+        content: Optional[str],
+        chart_data: Optional[Dict] = None,
+        is_first_turn: bool = False
+    ) -> None:
+        """
+        Save the turn: the conversation if new, both messages and the title.
+
+        `content` is None when no answer was produced; the user message is kept.
+        """
+        messages = [{
+            "id": uuid7(),
+            "conversation_id": conversation_id,
+            "role": MessageRole.USER,
+            "content": user_message,
+            "chart_data": None,
+            "created_at": self.turn.get("started_at") or utcnow(),
+        }]
+        if content is not None:
+            messages.append({
+                "id": uuid7(),
+                "conversation_id": conversation_id,
+                "role": MessageRole.ASSISTANT,
+                "content": content,
+                "chart_data": chart_data,
+                "created_at": utcnow(),
+            })
+
+        # Generate title from first user message
+        title = None
+        if is_first_turn:
+            title = user_message[:50] + "..." if len(user_message) > 50 else user_message
+
+        conversation = None
+        if self.turn.get("is_new") and self.turn.get("conversation_id") == conversation_id:
+            conversation = {
+                "id": conversation_id,
+                "user_id": self.turn["user_id"],
+                "title": title or "새 대화",
+            }
+
+        await self.turn_writer.write({
+            "conversation_id": conversation_id,
+            "conversation": conversation,
+            "messages": messages,
+            "title": title,
+        })
+
+        # Write-through so the next turn skips the history query
+        saved = [
+            {"role": m["role"].value, "content": m["content"], "created_at": m["created_at"]}
+            for m in messages
+        ]
+        if conversation is not None:
+            self.context_cache.put(
+                conversation_id,
+                self.turn["user_id"],
+                {"summary": None, "summary_until": None, "messages": saved}
+            )
+        else:
+            self.context_cache.append(conversation_id, saved)
+
+    async def _load_context(
+        self,
+        user_id: str,
+        conversation_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Check ownership and load the context from MySQL plus the write-behind queue.
+
+        Every message newer than the rolling summary is loaded; those beyond
+        the history window become overflow for the summarizer.
+        """
+        pending = self.turn_writer.pending(conversation_id)
+        summary, summary_until = None, None
+
+        async with mysql_unit_of_work(self.session_factory) as db:
+            conversation = await ConversationRepository(db).get_by_id(conversation_id)
+            owner = conversation.user_id if conversation else self.turn_writer.pending_owner(conversation_id)
+            if owner != user_id:
+                return None
+            if conversation:
+                summary, summary_until = conversation.summary, conversation.summary_until
+            recent = await MessageRepository(db).get_recent_messages(
+                conversation_id, limit=None, after=summary_until
+            )
+
+        # Turns still in the write-behind queue are part of the history
+        messages = [
+            {"role": msg.role.value, "content": msg.content, "created_at": msg.created_at}
+            for msg in recent
+        ]
+        messages += [
+            {"role": m["role"].value, "content": m["content"], "created_at": m["created_at"]}
+            for turn in pending for m in turn["messages"]
+        ]
+        return {
+            "summary": summary,
+            "summary_until": summary_until,
+            "messages": messages,
+        }
 
     async def stream_response(
         self,
         conversation_id: str,
-        user_message: str
+        user_message: str,
+        context: Dict[str, Any]
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """
         Stream AI response with MCP tool support.
 
+        `context` comes from `start_turn` and excludes the current message.
+
         Yields:
             - {"type": "content", "content": "..."} for text chunks
             - {"type": "chart", "chartData": {...}} for chart data
         """
-        # Load conversation history for context
-        history = await self.message_repo.get_recent_messages(conversation_id, limit=20)
+        # Get available tools from the cached MCP catalog
+        catalog = await self.mcp_client.get_tool_catalog()
 
-        # Format messages for LLM
-        messages = [
-            {"role": msg.role.value, "content": msg.content}
-            for msg in history
-        ]
-        messages.append({"role": "user", "content": user_message})
+        # Fit summary and history into the prompt budget; older turns overflow into the summary
+        messages, overflow = self.context_builder.build(
+            SYSTEM_PROMPT, catalog.openai_tools, context, user_message
+        )
+        is_first_turn = not context["messages"] and not context["summary"]
+
+        # An identical prompt answered over unchanged data is replayed instead of generated
+        cache_key = cached = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.key(SYSTEM_PROMPT, messages, catalog.version, self.llm_client.model)
+            cached = await self._get_cached_response(cache_key)
 
-        # Get available tools from MCP
-        tools = await self.mcp_client.get_available_tools()
+        # Warm the tool result the model is likely to ask for, concurrently with the first LLM call
+        if cached is None and settings.SPECULATIVE_PREFETCH_ENABLED:
+            self.mcp_client.prefetch_cache = PrefetchCache()
+            self.mcp_client.prefetch_cache.start(user_message, self.mcp_client.execute_remote)
 
         # Track full response for saving
-        full_response = ""
+        response_parts: List[str] = []
         chart_data = None
 
-        # Stream LLM response
-        async for chunk in self.llm_client.stream_chat(
-            messages=messages,
-            tools=tools,
-            system_prompt=SYSTEM_PROMPT
-        ):
-            if chunk["type"] == "content":
-                full_response += chunk["content"]
-                yield {"type": "content", "content": chunk["content"]}
-
-            elif chunk["type"] == "tool_call":
-                tool_name = chunk["tool_name"]
-                tool_args = chunk["tool_args"]
-
-                # Execute tool on MCP server
-                tool_result = await self.mcp_client.execute_tool(tool_name, tool_args)
-
-                # If it's a chart tool, yield chart data
-                if tool_name == "generate_sensor_chart" and "options" in tool_result:
-                    chart_data = tool_result
-                    yield {"type": "chart", "chartData": chart_data}
-
-                # Continue conversation with tool result
-                messages_with_tool = messages.copy()
-                async for response_chunk in self.llm_client.chat_with_tool_result(
-                    messages=messages_with_tool,
-                    tool_name=tool_name,
-                    tool_result=tool_result,
+        # Tool executions started while the LLM is still streaming, keyed by call id
+        pending_tools: Dict[str, asyncio.Task] = {}
+        chart_calls: List[str] = []
+
+        # What a cache entry needs: the events sent and the versions of the data the tools read
+        events: List[Dict[str, Any]] = []
+        data_versions: Optional[asyncio.Task] = None
+        tools_failed = False
+
+        try:
+            if cached is not None:
+                # Cached content and chart events, in their original order
+                source = self.response_cache.replay(cached)
+            else:
+                source = self.llm_client.stream_chat(
+                    messages=messages,
+                    tools=catalog.openai_tools,
                     system_prompt=SYSTEM_PROMPT
-                ):
-                    if response_chunk["type"] == "content":
-                        full_response += response_chunk["content"]
-                        yield {"type": "content", "content": response_chunk["content"]}
+                )
+
+            # Stream LLM response
+            async for chunk in source:
+                if chunk["type"] == "content":
+                    response_parts.append(chunk["content"])
+                    events.append({"type": "content", "content": chunk["content"]})
+                    yield events[-1]
+
+                elif chunk["type"] == "chart":
+                    chart_data = chunk["chartData"]
+                    events.append(chunk)
+                    yield chunk
+
+                elif chunk["type"] == "tool_call_ready":
+                    # Overlap tool I/O with the rest of the LLM stream
+                    tc = chunk["tool_call"]
+                    pending_tools[tc["id"]] = asyncio.create_task(self._run_tool(tc, chart_calls))
+
+                elif chunk["type"] == "tool_calls":
+                    tool_calls = chunk["tool_calls"]
+
+                    # Versions are read before the tools run, so a change in between invalidates the entry
+                    sources = self.response_cache.data_sources(tool_calls) if cache_key else []
+                    if sources:
+                        data_versions = asyncio.create_task(self.mcp_client.get_data_versions(sources))
 
-        # Save assistant message
-        await self.save_message(
+                    # Reuse early dispatches and run the rest concurrently
+                    for tc in tool_calls:
+                        if tc["id"] not in pending_tools:
+                            pending_tools[tc["id"]] = asyncio.create_task(self._run_tool(tc, chart_calls))
+                    tool_results = await asyncio.gather(*(pending_tools[tc["id"]] for tc in tool_calls))
+                    tools_failed = any(isinstance(r, dict) and "error" in r for r in tool_results)
+
+                    # Chart results go to the frontend in full
+                    for tool_result in tool_results:
+                        if isinstance(tool_result, dict) and "options" in tool_result:
+                            chart_data = tool_result
+                            events.append({"type": "chart", "chartData": chart_data})
+                            yield events[-1]
+
+                    # Continue conversation with all tool results in one completion
+                    async for response_chunk in self.llm_client.chat_with_tool_results(
+                        messages=messages,
+                        tool_calls=tool_calls,
+                        # Full results went to the frontend; the LLM gets budgeted summaries
+                        tool_results=[
+                            self.tool_result_compactor.compact(tc["name"], result)
+                            for tc, result in zip(tool_calls, tool_results)
+                        ],
+                        system_prompt=SYSTEM_PROMPT,
+                        content="".join(response_parts)
+                    ):
+                        if response_chunk["type"] == "content":
+                            response_parts.append(response_chunk["content"])
+                            events.append({"type": "content", "content": response_chunk["content"]})
+                            yield events[-1]
+        except (Exception, asyncio.CancelledError, GeneratorExit):
+            if data_versions is not None:
+                data_versions.cancel()
+            # Keep the question and whatever part of the answer was already streamed
+            await asyncio.shield(self.finish_turn(
+                conversation_id=conversation_id,
+                user_message=user_message,
+                content="".join(response_parts) or None,
+                chart_data=chart_data,
+                is_first_turn=is_first_turn
+            ))
+            raise
+        finally:
+            # Drop speculative work if the stream failed or the client left
+            for task in pending_tools.values():
+                if not task.done():
+                    task.cancel()
+            if self.mcp_client.prefetch_cache is not None:
+                self.mcp_client.prefetch_cache.discard()
+                self.mcp_client.prefetch_cache = None
+
+        # Persist the whole turn in one transaction
+        await self.finish_turn(
             conversation_id=conversation_id,
-            role="assistant",
-            content=full_response,
-            chart_data=chart_data
+            user_message=user_message,
+            content="".join(response_parts),
+            chart_data=chart_data,
+            is_first_turn=is_first_turn
         )
+        self.summarizer.schedule(conversation_id, context["summary"], overflow)
 
-        # Update conversation title if it's the first exchange
-        history_count = len(history)
-        if history_count <= 1:
-            # Generate title from first user message
-            title = user_message[:50] + "..." if len(user_message) > 50 else user_message
-            conversation = await self.conversation_repo.get_by_id(conversation_id)
-            if conversation:
-                await self.conversation_repo.update_title(conversation, title)
+        if cache_key and cached is None and not tools_failed and "".join(response_parts).strip():
+            versions = await data_versions if data_versions is not None else {}
+            # Without versions the entry could not be checked for freshness
+            if versions is not None:
+                self.response_cache.put(cache_key, events, versions)
+
+    def _run_tool(self, tc: Dict[str, Any], chart_calls: List[str]) -> Awaitable[Any]:
+        """Execute a tool call; chart calls after the answer's first one are skipped."""
+        if tc["name"] == CHART_TOOL:
+            chart_calls.append(tc["id"])
+            if len(chart_calls) > 1:
+                metrics.increment("chat.extra_charts_skipped")
+                return skip_extra_chart()
+        return self.mcp_client.execute_tool(tc["name"], tc["args"])
+
+    async def _get_cached_response(self, key: str) -> Optional[CachedResponse]:
+        """Look up a cached answer and check the data it was built from is unchanged."""
+        cached = self.response_cache.get(key)
+        if cached is not None and cached.data_versions:
+            versions = await self.mcp_client.get_data_versions(list(cached.data_versions))
+            if not cached.is_fresh(versions):
+                self.response_cache.invalidate(key)
+                metrics.increment("response_cache.stale")
+                cached = None
+        self.response_cache.record(cached is not None)
+        return cached
 
     async def close(self):
         """Clean up resources."""
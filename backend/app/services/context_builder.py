@@ -0,0 +1,158 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import async_sessionmaker
+import asyncio
+
+from app.core.config import settings
+from app.core.database import MySQLSessionLocal, mysql_unit_of_work
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.core.tokens import estimate_tokens, estimate_json_tokens
+from app.repositories.conversation_repo import ConversationRepository
+from app.services.context_cache import ContextCache, context_cache
+from app.services.llm_client import LLMClient
+
+
+# Role/formatting tokens the API adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Characters of each message fed to the summarizer
+SUMMARY_INPUT_CHARS = 2000
+
+# Oldest overflowed messages folded per summary update; the rest wait for the next turn
+SUMMARY_MAX_MESSAGES = 40
+
+SUMMARY_PREFIX = "이전 대화 요약:\n"
+
+SUMMARY_PROMPT = """당신은 반도체 공정 인프라 AI 어시스턴트의 대화 기록을 요약합니다.
+기존 요약과 새로 추가된 대화를 합쳐 하나의 요약으로 갱신하세요.
+- 장비 ID, 센서 종류, 조회 기간, 주요 수치, 이상 징후와 결론을 유지하세요
+- 인사말이나 반복되는 설명은 생략하세요
+- 한국어로, {max_tokens} 토큰 이내로 작성하세요
+"""
+
+
+class ContextBuilder:
+    """
+    Build the LLM message list for a turn within a token budget.
+
+    The system prompt, tool schemas, rolling summary and the new user
+    message are counted first; the remaining budget is filled with history
+    newest-first, up to `max_messages` messages. Everything older, whether
+    it missed the budget or the count window, is returned as overflow, to
+    be folded into the rolling summary.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, max_messages: Optional[int] = None):
+        self.token_budget = token_budget or settings.CONTEXT_TOKEN_BUDGET
+        self.max_messages = max_messages or settings.CHAT_HISTORY_MESSAGES
+
+    def build(
+        self,
+        system_prompt: str,
+        tools: List[Dict[str, Any]],
+        context: Dict[str, Any],
+        user_message: str
+    ) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]]]:
+        """Return (messages for the LLM, overflowed history oldest-first)."""
+        used = (
+            estimate_tokens(system_prompt)
+            + estimate_json_tokens(tools)
+            + estimate_tokens(user_message)
+            + 2 * MESSAGE_OVERHEAD_TOKENS
+        )
+
+        prefix: List[Dict[str, str]] = []
+        if context.get("summary"):
+            prefix.append({"role": "system", "content": SUMMARY_PREFIX + context["summary"]})
+            used += estimate_tokens(prefix[0]["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+        history = context.get("messages", [])
+        start = len(history)
+        while start > 0 and len(history) - start < self.max_messages:
+            cost = estimate_tokens(history[start - 1]["content"]) + MESSAGE_OVERHEAD_TOKENS
+            if used + cost > self.token_budget:
+                break
+            used += cost
+            start -= 1
+
+        metrics.observe("context.prompt_tokens", used)
+        if start:
+            metrics.increment("context.overflowed_messages", start)
+
+        messages = prefix + [
+            {"role": m["role"], "content": m["content"]} for m in history[start:]
+        ] + [{"role": "user", "content": user_message}]
+        return messages, history[:start]
+
+
+class RollingSummarizer:
+    """
+    Fold overflowed history into a per-conversation rolling summary.
+
+    Runs in the background after a turn, at most once at a time per
+    conversation. The summary and the timestamp it covers are stored on the
+    conversation, so later turns only load messages created after it.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = MySQLSessionLocal,
+        cache: Optional[ContextCache] = None
+    ):
+        self.session_factory = session_factory
+        self.context_cache = cache or context_cache
+        self.max_tokens = settings.CONTEXT_SUMMARY_MAX_TOKENS
+        self.llm_client = LLMClient()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def schedule(
+        self,
+        conversation_id: str,
+        summary: Optional[str],
+        overflow: List[Dict[str, Any]]
+    ) -> None:
+        if not overflow or conversation_id in self._tasks:
+            return
+        # summary_until only advances to the last folded message, so nothing is skipped
+        overflow = overflow[:SUMMARY_MAX_MESSAGES]
+        task = asyncio.create_task(self.update(conversation_id, summary, overflow))
+        self._tasks[conversation_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(conversation_id, None))
+
+    async def update(
+        self,
+        conversation_id: str,
+        summary: Optional[str],
+        overflow: List[Dict[str, Any]]
+    ) -> None:
+        transcript = "\n".join(
+            f"{'사용자' if m['role'] == 'user' else '어시스턴트'}: {m['content'][:SUMMARY_INPUT_CHARS]}"
+            for m in overflow
+        )
+        prompt = f"## 기존 요약\n{summary or '(없음)'}\n\n## 새로 추가된 대화\n{transcript}"
+        summary_until: datetime = overflow[-1]["created_at"]
+
+        try:
+            new_summary = await self.llm_client.complete(
+                [{"role": "user", "content": prompt}],
+                system_prompt=SUMMARY_PROMPT.format(max_tokens=self.max_tokens),
+                max_tokens=self.max_tokens
+            )
+            async with mysql_unit_of_work(self.session_factory) as db:
+                await ConversationRepository(db).update_summary(conversation_id, new_summary, summary_until)
+            self.context_cache.set_summary(conversation_id, new_summary, summary_until)
+            metrics.increment("context.summaries")
+        except Exception as e:
+            # The overflow is retried on the next turn
+            metrics.increment("context.summary_failures")
+            logger.error(f"Error summarizing conversation {conversation_id}: {e}")
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks.values()):
+            task.cancel()
+        self._tasks.clear()
+
+
+# Singleton instance
+rolling_summarizer = RollingSummarizer()
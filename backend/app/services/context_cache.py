@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import time
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+# Rough per-message bookkeeping cost on top of the content bytes
+MESSAGE_OVERHEAD_BYTES = 64
+
+
+class ContextCache:
+    """
+    In-process LRU cache of recent conversation context.
+
+    Maps a conversation id to its owner and its context: the rolling
+    summary and every message created after it; messages are only dropped
+    once the summary covers them, so overflow still reaches the summarizer.
+    A turn that follows one served by this process skips the ownership and
+    history queries. Writes go through the cache as turns are saved; deletes
+    and title updates invalidate. Bounded by total bytes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None
+    ):
+        self.max_bytes = max_bytes or settings.CONTEXT_CACHE_MAX_BYTES
+        self.ttl = ttl or settings.CONTEXT_CACHE_TTL_SECONDS
+        # conversation id -> (owner id, context, size in bytes, stored at)
+        self._entries: "OrderedDict[str, Tuple[str, Dict[str, Any], int, float]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, conversation_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return (owner id, context) for a cached conversation."""
+        entry = self._entries.get(conversation_id)
+        if entry is None or time.monotonic() - entry[3] > self.ttl:
+            if entry is not None:
+                self.invalidate(conversation_id)
+            metrics.increment("context_cache.misses")
+            return None
+
+        self._entries.move_to_end(conversation_id)
+        metrics.increment("context_cache.hits")
+        owner, context, _, _ = entry
+        return owner, {**context, "messages": list(context["messages"])}
+
+    def put(self, conversation_id: str, user_id: str, context: Dict[str, Any]) -> None:
+        """Store the conversation's summary and the messages after it."""
+        self.invalidate(conversation_id)
+        context = {**context, "messages": list(context["messages"])}
+        size = len((context.get("summary") or "").encode("utf-8")) + sum(
+            len(m["content"].encode("utf-8")) + MESSAGE_OVERHEAD_BYTES for m in context["messages"]
+        )
+        if size > self.max_bytes:
+            return
+
+        self._entries[conversation_id] = (user_id, context, size, time.monotonic())
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, _, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            metrics.increment("context_cache.evictions")
+        metrics.set_gauge("context_cache.bytes", self._bytes)
+
+    def append(self, conversation_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Write-through for newly saved messages of an already cached conversation."""
+        entry = self._entries.get(conversation_id)
+        if entry is not None:
+            owner, context, _, _ = entry
+            self.put(conversation_id, owner, {**context, "messages": context["messages"] + messages})
+
+    def set_summary(self, conversation_id: str, summary: str, summary_until: datetime) -> None:
+        """Replace summarized messages of a cached conversation with the new summary."""
+        entry = self._entries.get(conversation_id)
+        if entry is not None:
+            owner, context, _, _ = entry
+            self.put(conversation_id, owner, {
+                "summary": summary,
+                "summary_until": summary_until,
+                "messages": [m for m in context["messages"] if m["created_at"] > summary_until],
+            })
+
+    def invalidate(self, conversation_id: str) -> None:
+        entry = self._entries.pop(conversation_id, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+            metrics.set_gauge("context_cache.bytes", self._bytes)
+
+
+# Singleton instance
+context_cache = ContextCache()
@@ -1,69 +1,230 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import binascii
+import json
+import uuid
 
+from app.core.config import settings
+from app.models.conversation import Conversation
 from app.repositories.conversation_repo import ConversationRepository
 from app.repositories.message_repo import MessageRepository
 from app.schemas.conversation import (
     ConversationResponse,
     ConversationListItem,
     ConversationWithMessages,
+    ConversationSearchHit,
+    ConversationSearchResponse,
 )
-from app.schemas.chat import MessageResponse
+from app.schemas.chat import MessageResponse, MessageChartResponse
+from app.services.context_cache import context_cache
+from app.services.turn_writer import TurnWriter, turn_writer
+
+
+def build_snippet(content: str, terms: List[str], width: int) -> Tuple[str, List[List[int]]]:
+    """
+    Cut a window of about `width` characters around the first matched term.
+
+    Returns the snippet and the [start, end) offsets of every term
+    occurrence inside it, so the client can highlight without parsing markup.
+    """
+    lowered = content.lower()
+    terms = [t.lower() for t in terms if t]
+    positions = [p for p in (lowered.find(t) for t in terms) if p >= 0]
+
+    start = max(0, min(positions) - width // 3) if positions else 0
+    end = min(len(content), start + width)
+    start = max(0, end - width)
+    snippet = content[start:end]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(content) else ""
+
+    window = lowered[start:end]
+    highlights = []
+    for term in terms:
+        index = window.find(term)
+        while index >= 0:
+            highlights.append([len(prefix) + index, len(prefix) + index + len(term)])
+            index = window.find(term, index + len(term))
+    highlights.sort()
+
+    return f"{prefix}{snippet}{suffix}", highlights
 
 
 class ConversationService:
-    def __init__(self, db: AsyncSession):
+    """
+    Conversation reads and edits.
+
+    With write-behind enabled, a finished turn may still be queued when the
+    client reads the conversation back; the list and detail views merge in
+    this process's queued turns so the new messages are visible at once.
+    """
+
+    def __init__(self, db: AsyncSession, writer: Optional[TurnWriter] = None):
         self.db = db
         self.conversation_repo = ConversationRepository(db)
         self.message_repo = MessageRepository(db)
+        self.turn_writer = writer or turn_writer
 
     async def get_user_conversations(self, user_id: str) -> List[ConversationListItem]:
-        conversations = await self.conversation_repo.get_user_conversations(user_id)
-
-        result = []
-        for conv in conversations:
-            # Get last message preview
-            messages = await self.message_repo.get_by_conversation(conv.id, limit=1)
-            last_message = messages[0].content[:100] if messages else None
-
-            result.append(ConversationListItem(
-                id=conv.id,
-                title=conv.title,
-                updated_at=conv.updated_at,
-                last_message=last_message
-            ))
+        rows = await self.conversation_repo.get_user_conversations_with_preview(user_id)
 
-        return result
+        items = {
+            row.id: ConversationListItem(
+                id=row.id,
+                title=row.title,
+                updated_at=row.updated_at,
+                last_message=row.last_message
+            )
+            for row in rows
+        }
+        # Conversations created by turns still in the write-behind queue
+        for conversation_id in self.turn_writer.pending_conversations(user_id):
+            if conversation_id not in items:
+                first = self.turn_writer.pending(conversation_id)[0]
+                items[conversation_id] = ConversationListItem(
+                    id=conversation_id,
+                    title=first["conversation"]["title"],
+                    updated_at=first["messages"][0]["created_at"]
+                )
+
+        for item in items.values():
+            pending = self.turn_writer.pending(item.id)
+            if not pending:
+                continue
+            last = pending[-1]["messages"][-1]
+            item.title = self._pending_title(pending) or item.title
+            item.updated_at = max(item.updated_at, last["created_at"])
+            item.last_message = last["content"][:100]
+
+        return sorted(items.values(), key=lambda item: item.updated_at, reverse=True)
 
     async def get_conversation(
         self,
         user_id: str,
-        conversation_id: str
+        conversation_id: str,
+        limit: Optional[int] = None,
+        before: Optional[str] = None
     ) -> ConversationWithMessages:
-        conversation = await self.conversation_repo.get_by_id_with_messages(conversation_id)
+        """Return the conversation with its newest page of messages, without chart data."""
+        conversation = await self._get_owned_conversation(user_id, conversation_id, allow_pending=True)
+        rows, has_more = [], False
+        if conversation is not None:
+            rows, has_more = await self.message_repo.get_page(
+                conversation_id,
+                limit=limit or settings.CONVERSATION_PAGE_SIZE,
+                before=before
+            )
 
-        if not conversation:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found"
+        messages = [
+            MessageResponse(
+                id=m.id,
+                conversation_id=m.conversation_id,
+                role=m.role,
+                content=m.content,
+                has_chart=has_chart,
+                created_at=m.created_at
             )
+            for m, has_chart in rows
+        ]
 
-        if conversation.user_id != user_id:
+        # Read after the page, so a turn flushed meanwhile is either in the page or still pending
+        pending = self.turn_writer.pending(conversation_id)
+        if conversation is None and not pending:
+            # The first turn was flushed while the page was read; it is in MySQL now
+            return await self.get_conversation(user_id, conversation_id, limit=limit, before=before)
+        if conversation is None:
+            first = pending[0]
+            created_at = first["messages"][0]["created_at"]
+            title, updated_at = first["conversation"]["title"], created_at
+        else:
+            created_at, title, updated_at = conversation.created_at, conversation.title, conversation.updated_at
+
+        if pending:
+            title = self._pending_title(pending) or title
+            updated_at = max(updated_at, pending[-1]["messages"][-1]["created_at"])
+        if pending and before is None:
+            # Queued turns are newer than anything written, so they end the newest page
+            seen = {m.id for m in messages}
+            messages += [
+                MessageResponse(
+                    id=m["id"],
+                    conversation_id=conversation_id,
+                    role=m["role"].value,
+                    content=m["content"],
+                    has_chart=m["chart_data"] is not None,
+                    created_at=m["created_at"]
+                )
+                for turn in pending for m in turn["messages"]
+                if m["id"] not in seen
+            ]
+
+        return ConversationWithMessages(
+            id=conversation_id,
+            user_id=user_id,
+            title=title,
+            created_at=created_at,
+            updated_at=updated_at,
+            messages=messages,
+            has_more=has_more,
+            next_cursor=rows[0][0].id if has_more and rows else None
+        )
+
+    async def get_message_chart(
+        self,
+        user_id: str,
+        conversation_id: str,
+        message_id: str
+    ) -> MessageChartResponse:
+        conversation = await self._get_owned_conversation(user_id, conversation_id, allow_pending=True)
+        chart_data = self._pending_chart_data(conversation_id, message_id)
+        if chart_data is None and conversation is not None:
+            chart_data = await self.message_repo.get_chart_data(conversation_id, message_id)
+
+        if chart_data is None:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chart not found"
             )
 
-        return ConversationWithMessages(
-            id=conversation.id,
-            user_id=conversation.user_id,
-            title=conversation.title,
-            created_at=conversation.created_at,
-            updated_at=conversation.updated_at,
-            messages=[MessageResponse.model_validate(m) for m in conversation.messages]
+        return MessageChartResponse(message_id=message_id, chart_data=chart_data)
+
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> ConversationSearchResponse:
+        """Search the user's messages, most relevant first, with highlighted snippets."""
+        rows, has_more = await self.message_repo.search(
+            user_id,
+            query,
+            limit=limit or settings.CONVERSATION_SEARCH_PAGE_SIZE,
+            after=self._decode_search_cursor(cursor) if cursor else None
         )
 
+        terms = query.split()
+        results = []
+        for row in rows:
+            snippet, highlights = build_snippet(row.content, terms, settings.CONVERSATION_SEARCH_SNIPPET_CHARS)
+            results.append(ConversationSearchHit(
+                conversation_id=row.conversation_id,
+                conversation_title=row.title,
+                message_id=row.id,
+                role=row.role,
+                snippet=snippet,
+                highlights=highlights,
+                score=row.score,
+                created_at=row.created_at
+            ))
+
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = self._encode_search_cursor(rows[-1].score, rows[-1].id)
+        return ConversationSearchResponse(results=results, next_cursor=next_cursor)
+
     async def create_conversation(
         self,
         user_id: str,
@@ -81,21 +242,10 @@ class ConversationService:
         conversation_id: str,
         title: str
     ) -> ConversationResponse:
-        conversation = await self.conversation_repo.get_by_id(conversation_id)
-
-        if not conversation:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found"
-            )
-
-        if conversation.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
-            )
+        conversation = await self._get_owned_conversation(user_id, conversation_id)
 
         updated = await self.conversation_repo.update_title(conversation, title)
+        context_cache.invalidate(conversation_id)
         return ConversationResponse.model_validate(updated)
 
     async def delete_conversation(
@@ -103,9 +253,44 @@ class ConversationService:
         user_id: str,
         conversation_id: str
     ) -> None:
+        conversation = await self._get_owned_conversation(user_id, conversation_id)
+
+        await self.conversation_repo.delete(conversation)
+        context_cache.invalidate(conversation_id)
+
+    @staticmethod
+    def _encode_search_cursor(score: float, message_id: str) -> str:
+        payload = json.dumps([score, message_id]).encode("utf-8")
+        return base64.urlsafe_b64encode(payload).decode("ascii")
+
+    @staticmethod
+    def _decode_search_cursor(cursor: str) -> Tuple[float, str]:
+        try:
+            score, message_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return float(score), str(uuid.UUID(str(message_id)))
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid search cursor"
+            )
+
+    async def _get_owned_conversation(
+        self,
+        user_id: str,
+        conversation_id: str,
+        allow_pending: bool = False
+    ) -> Optional[Conversation]:
+        """
+        Load the conversation and check the user owns it.
+
+        With `allow_pending`, a conversation that so far only exists in the
+        write-behind queue is accepted and None is returned.
+        """
         conversation = await self.conversation_repo.get_by_id(conversation_id)
 
         if not conversation:
+            if allow_pending and self.turn_writer.pending_owner(conversation_id) == user_id:
+                return None
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Conversation not found"
@@ -117,4 +302,19 @@ class ConversationService:
                 detail="Access denied"
             )
 
-        await self.conversation_repo.delete(conversation)
+        return conversation
+
+    @staticmethod
+    def _pending_title(pending: List[Dict[str, Any]]) -> Optional[str]:
+        """The newest title set by a queued turn."""
+        for turn in reversed(pending):
+            if turn.get("title"):
+                return turn["title"]
+        return None
+
+    def _pending_chart_data(self, conversation_id: str, message_id: str) -> Optional[dict]:
+        for turn in self.turn_writer.pending(conversation_id):
+            for m in turn["messages"]:
+                if m["id"] == message_id:
+                    return m["chart_data"]
+        return None
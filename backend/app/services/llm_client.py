@@ -1,31 +1,68 @@
+from contextlib import aclosing
 from typing import AsyncGenerator, List, Dict, Any, Optional
-import httpx
 import json
 
 from app.core.config import settings
 from app.core.clients import SharedClients
+from app.core.llm_pool import LLMPool
+from app.core.single_flight import llm_single_flight
+
+
+class JSONCompletenessTracker:
+    """
+    Incrementally detect when streamed tool-call arguments form a complete JSON value.
+
+    Tracks nesting depth and string/escape state across fragments, so each
+    fragment is scanned once instead of re-parsing the whole buffer.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.complete = False
+
+    def feed(self, fragment: str) -> bool:
+        """Consume a fragment and return True once the top-level value has closed."""
+        for ch in fragment:
+            if self.complete:
+                break
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+                self.started = True
+            elif ch in "}]":
+                self.depth -= 1
+                if self.started and self.depth == 0:
+                    self.complete = True
+        return self.complete
 
 
 class LLMClient:
     """OpenAI-compatible LLM client with streaming and tool support."""
 
-    def __init__(self, client: Optional[httpx.AsyncClient] = None):
-        self.base_url = settings.LLM_API_BASE_URL
-        self.api_key = settings.LLM_API_KEY
+    def __init__(self, pool: Optional[LLMPool] = None):
         self.model = settings.LLM_MODEL
-        self._client = client
-        self._owns_client = client is None
+        self._pool = pool
 
     @property
-    def client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            return SharedClients.get_llm_client()
-        return self._client
+    def pool(self) -> LLMPool:
+        if self._pool is None:
+            return SharedClients.get_llm_pool()
+        return self._pool
 
     async def close(self):
-        # Only close if we own the client (not using shared)
-        if self._owns_client and self._client is not None:
-            await self._client.aclose()
+        # Endpoint connections belong to the pool, which outlives this client
+        pass
 
     async def stream_chat(
         self,
@@ -36,9 +73,14 @@ class LLMClient:
         """
         Stream chat completion with optional tool support.
 
+        `tools` must already be in OpenAI format (see `format_tools`).
+
         Yields:
             - {"type": "content", "content": "..."} for text chunks
-            - {"type": "tool_call", "tool_name": "...", "tool_args": {...}} for tool calls
+            - {"type": "tool_call_ready", "tool_call": {...}} as soon as one call's
+              arguments are complete, so it can be dispatched before the stream ends
+            - {"type": "tool_calls", "tool_calls": [{"id": "...", "name": "...",
+              "arguments": "...", "args": {...}}, ...]} once per turn with every tool call
         """
         # Build messages
         formatted_messages = []
@@ -59,25 +101,25 @@ class LLMClient:
         }
 
         if tools:
-            request_body["tools"] = self._format_tools(tools)
-
-        # Stream response
-        async with self.client.stream(
-            "POST",
-            f"{self.base_url}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            },
-            json=request_body,
-        ) as response:
-            if response.status_code != 200:
-                error_text = await response.aread()
-                raise Exception(f"LLM API error: {response.status_code} - {error_text}")
+            request_body["tools"] = tools
+
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            async for chunk in self._stream_request(request_body):
+                yield chunk
+            return
 
+        # Identical concurrent requests share one upstream completion
+        key = llm_single_flight.key(request_body)
+        async with aclosing(llm_single_flight.stream(key, lambda: self._stream_request(request_body))) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    async def _stream_request(self, request_body: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+        """Send one streaming completion request through the pool and parse its events."""
+        async with aclosing(self.pool.stream("/chat/completions", request_body)) as lines:
             tool_call_buffer = {}
 
-            async for line in response.aiter_lines():
+            async for line in lines:
                 if not line.startswith("data: "):
                     continue
 
@@ -96,13 +138,30 @@ class LLMClient:
                         for tc in delta["tool_calls"]:
                             idx = tc.get("index", 0)
                             if idx not in tool_call_buffer:
-                                tool_call_buffer[idx] = {"name": "", "args": ""}
+                                tool_call_buffer[idx] = {
+                                    "id": "",
+                                    "name": "",
+                                    "args": "",
+                                    "tracker": JSONCompletenessTracker(),
+                                    "ready": False,
+                                }
 
+                            buffered = tool_call_buffer[idx]
+                            if tc.get("id"):
+                                buffered["id"] = tc["id"]
                             if "function" in tc:
                                 if "name" in tc["function"]:
-                                    tool_call_buffer[idx]["name"] = tc["function"]["name"]
+                                    buffered["name"] = tc["function"]["name"]
                                 if "arguments" in tc["function"]:
-                                    tool_call_buffer[idx]["args"] += tc["function"]["arguments"]
+                                    buffered["args"] += tc["function"]["arguments"]
+                                    buffered["tracker"].feed(tc["function"]["arguments"])
+
+                            # Dispatch early once this call's arguments parse
+                            if not buffered["ready"] and buffered["name"] and buffered["tracker"].complete:
+                                ready_call = self._build_tool_call(idx, buffered, strict=True)
+                                if ready_call:
+                                    buffered["ready"] = True
+                                    yield {"type": "tool_call_ready", "tool_call": ready_call}
 
                     # Handle content
                     elif "content" in delta and delta["content"]:
@@ -110,53 +169,89 @@ class LLMClient:
 
                     # Check for tool call completion
                     if finish_reason == "tool_calls":
-                        for idx, tc in tool_call_buffer.items():
-                            if tc["name"]:
-                                try:
-                                    args = json.loads(tc["args"]) if tc["args"] else {}
-                                except json.JSONDecodeError:
-                                    args = {}
-                                yield {
-                                    "type": "tool_call",
-                                    "tool_name": tc["name"],
-                                    "tool_args": args
-                                }
+                        tool_calls = [
+                            self._build_tool_call(idx, tc)
+                            for idx, tc in sorted(tool_call_buffer.items())
+                            if tc["name"]
+                        ]
+                        if tool_calls:
+                            yield {"type": "tool_calls", "tool_calls": tool_calls}
 
                 except json.JSONDecodeError:
                     continue
 
-    async def chat_with_tool_result(
+    @staticmethod
+    def _build_tool_call(idx: int, buffered: Dict[str, Any], strict: bool = False) -> Optional[Dict[str, Any]]:
+        """Turn a buffered tool call into an event payload; None if strict and unparsable."""
+        try:
+            args = json.loads(buffered["args"]) if buffered["args"] else {}
+        except json.JSONDecodeError:
+            if strict:
+                return None
+            args = {}
+        return {
+            "id": buffered["id"] or f"call_{idx}",
+            "name": buffered["name"],
+            "arguments": json.dumps(args, ensure_ascii=False),
+            "args": args
+        }
+
+    async def chat_with_tool_results(
         self,
         messages: List[Dict[str, str]],
-        tool_name: str,
-        tool_result: Any,
-        system_prompt: Optional[str] = None
+        tool_calls: List[Dict[str, Any]],
+        tool_results: List[Any],
+        system_prompt: Optional[str] = None,
+        content: Optional[str] = None
     ) -> AsyncGenerator[Dict[str, Any], None]:
-        """Continue conversation after tool execution."""
-        # Add tool result to messages
-        messages_with_result = messages.copy()
-        messages_with_result.append({
+        """Continue conversation after executing every tool call of a turn."""
+        messages_with_results = messages.copy()
+        messages_with_results.append({
             "role": "assistant",
-            "content": None,
-            "tool_calls": [{
-                "id": "call_1",
-                "type": "function",
-                "function": {
-                    "name": tool_name,
-                    "arguments": "{}"
+            "content": content or None,
+            "tool_calls": [
+                {
+                    "id": tc["id"],
+                    "type": "function",
+                    "function": {
+                        "name": tc["name"],
+                        "arguments": tc["arguments"]
+                    }
                 }
-            }]
-        })
-        messages_with_result.append({
-            "role": "tool",
-            "tool_call_id": "call_1",
-            "content": json.dumps(tool_result, ensure_ascii=False, default=str)
+                for tc in tool_calls
+            ]
         })
+        for tc, result in zip(tool_calls, tool_results):
+            messages_with_results.append({
+                "role": "tool",
+                "tool_call_id": tc["id"],
+                "content": json.dumps(result, ensure_ascii=False, default=str)
+            })
 
-        async for chunk in self.stream_chat(messages_with_result, system_prompt=system_prompt):
+        async for chunk in self.stream_chat(messages_with_results, system_prompt=system_prompt):
             yield chunk
 
-    def _format_tools(self, tools: List[Dict]) -> List[Dict]:
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """Non-streaming completion without tools, for background work such as summaries."""
+        formatted_messages = []
+        if system_prompt:
+            formatted_messages.append({"role": "system", "content": system_prompt})
+        formatted_messages.extend(messages)
+
+        request_body = {"model": self.model, "messages": formatted_messages}
+        if max_tokens:
+            request_body["max_tokens"] = max_tokens
+
+        response = await self.pool.post("/chat/completions", request_body)
+        return response["choices"][0]["message"].get("content") or ""
+
+    @staticmethod
+    def format_tools(tools: List[Dict]) -> List[Dict]:
         """Convert MCP tools to OpenAI tool format."""
         return [
             {
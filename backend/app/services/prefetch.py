@@ -0,0 +1,129 @@
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
+import asyncio
+import json
+import re
+import time
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics
+
+
+# Keywords the system prompt tells the model to answer with a chart
+CHART_KEYWORDS = ("그래프", "차트", "시각화", "보여줘", "그려줘", "chart", "graph", "plot")
+STATISTICS_KEYWORDS = ("통계", "평균", "최대", "최소", "표준편차", "statistics")
+
+SENSOR_KEYWORDS = {
+    "temperature": ("온도", "temperature", "temp"),
+    "pressure": ("압력", "pressure"),
+    "vacuum": ("진공", "vacuum"),
+    "gas_flow": ("가스", "유량", "gas"),
+    "rf_power": ("rf", "파워"),
+}
+
+EQUIPMENT_PATTERN = re.compile(
+    r"\b(EQP-[A-Z]+-\d+|(?:CVD Chamber|Plasma Etcher|Etcher|Ion Implanter|Implanter)\s*\d+)",
+    re.IGNORECASE,
+)
+
+# Defaults from the MCP tool schemas; an argument equal to its default is dropped from keys
+ARGUMENT_DEFAULTS = {"chart_type": "line", "limit": 100, "period_hours": 24}
+
+MAX_PREDICTIONS = 3
+
+ToolExecutor = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def tool_call_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Canonical key for a tool call, insensitive to defaults, case and spacing."""
+    normalized = {}
+    for name, value in arguments.items():
+        if value is None or value == "" or ARGUMENT_DEFAULTS.get(name) == value:
+            continue
+        if isinstance(value, str):
+            value = re.sub(r"\s+", "", value.lower())
+        normalized[name] = value
+    return f"{tool_name}:{json.dumps(normalized, sort_keys=True, ensure_ascii=False)}"
+
+
+def predict_tool_calls(message: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """Predict the tool calls the model is likely to make for a user message."""
+    text = message.lower()
+    wants_chart = any(k in text for k in CHART_KEYWORDS)
+    wants_statistics = any(k in text for k in STATISTICS_KEYWORDS)
+    if not wants_chart and not wants_statistics:
+        return []
+
+    sensors = [s for s, keywords in SENSOR_KEYWORDS.items() if any(k in text for k in keywords)]
+    equipment = EQUIPMENT_PATTERN.search(message)
+
+    base_args: Dict[str, Any] = {}
+    if equipment:
+        base_args["equipment_id"] = equipment.group(1)
+
+    predictions: List[Tuple[str, Dict[str, Any]]] = []
+    if wants_chart:
+        # The system prompt defaults charts to temperature over the last 24 hours
+        for sensor in sensors or ["temperature"]:
+            predictions.append(("generate_sensor_chart", {**base_args, "sensor_type": sensor}))
+    elif sensors:
+        for sensor in sensors:
+            predictions.append(("get_sensor_statistics", {**base_args, "sensor_type": sensor}))
+    return predictions[:MAX_PREDICTIONS]
+
+
+class PrefetchCache:
+    """
+    Short-lived, per-request cache of speculatively executed tool calls.
+
+    Predictions start concurrently with the first LLM call; execute_tool
+    consumes a matching entry, and anything unclaimed is discarded.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl or settings.SPECULATIVE_PREFETCH_TTL_SECONDS
+        self._entries: Dict[str, Tuple[float, asyncio.Task]] = {}
+
+    def start(self, message: str, executor: ToolExecutor) -> None:
+        """Warm likely tool results for the message."""
+        for tool_name, arguments in predict_tool_calls(message):
+            key = tool_call_key(tool_name, arguments)
+            if key in self._entries:
+                continue
+            task = asyncio.create_task(executor(tool_name, arguments))
+            self._entries[key] = (time.monotonic(), task)
+            metrics.increment("prefetch.predictions")
+            logger.debug(f"Speculatively prefetching {key}")
+
+    def claim(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[asyncio.Task]:
+        """Take the prefetched result for this call, if one was predicted and is fresh."""
+        metrics.increment("prefetch.lookups")
+        entry = self._entries.pop(tool_call_key(tool_name, arguments), None)
+        if entry is None:
+            metrics.increment("prefetch.misses")
+            return None
+
+        started_at, task = entry
+        if time.monotonic() - started_at > self.ttl:
+            task.cancel()
+            metrics.increment("prefetch.expired")
+            return None
+
+        metrics.increment("prefetch.hits")
+        self._update_rates()
+        return task
+
+    def discard(self) -> None:
+        """Drop mispredictions."""
+        for _, task in self._entries.values():
+            if not task.done():
+                task.cancel()
+        metrics.increment("prefetch.discarded", len(self._entries))
+        self._update_rates()
+        self._entries.clear()
+
+    @staticmethod
+    def _update_rates() -> None:
+        # hit_rate: share of tool calls served from a prefetch; precision: share of predictions used
+        metrics.set_gauge("prefetch.hit_rate", metrics.ratio("prefetch.hits", "prefetch.lookups"))
+        metrics.set_gauge("prefetch.precision", metrics.ratio("prefetch.hits", "prefetch.predictions"))
@@ -0,0 +1,157 @@
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional
+import hashlib
+import json
+import re
+import time
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+# Data source for list_equipment; every other source is a sensor type
+EQUIPMENT_SOURCE = "equipment"
+
+# Rough bookkeeping cost of an entry on top of its events
+ENTRY_OVERHEAD_BYTES = 256
+
+
+class CachedResponse:
+    """A complete answer and the data versions its tool calls read."""
+
+    def __init__(
+        self,
+        events: List[Dict[str, Any]],
+        data_versions: Dict[str, Optional[str]],
+        size: int
+    ):
+        self.events = events
+        self.data_versions = data_versions
+        self.size = size
+        self.stored_at = time.monotonic()
+
+    def is_fresh(self, versions: Optional[Dict[str, Optional[str]]]) -> bool:
+        """Whether every source read by the answer is still at the cached version."""
+        if not self.data_versions:
+            return True
+        return versions is not None and all(
+            versions.get(source) == version for source, version in self.data_versions.items()
+        )
+
+
+class ResponseCache:
+    """
+    In-process exact-match cache of complete chat answers.
+
+    Keyed on the normalized prompt (system prompt and message list), the
+    MCP tool catalog version and the model. Each entry records the data
+    sources its tool calls read with their versions at the time; callers
+    compare them against the current versions before serving a hit, so an
+    answer is never replayed over newer sensor data. Bounded by total
+    bytes, with a TTL.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_bytes = max_bytes or settings.RESPONSE_CACHE_MAX_BYTES
+        self.ttl = ttl or settings.RESPONSE_CACHE_TTL_SECONDS
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def key(
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        catalog_version: Optional[str],
+        model: str
+    ) -> str:
+        """Hash of the prompt, insensitive to surrounding and repeated whitespace."""
+        normalized = [
+            [m["role"], re.sub(r"\s+", " ", m["content"]).strip()]
+            for m in [{"role": "system", "content": system_prompt}] + messages
+        ]
+        payload = json.dumps([model, catalog_version, normalized], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def data_sources(tool_calls: List[Dict[str, Any]]) -> List[str]:
+        """Sensor types (and the equipment table) the tool calls read."""
+        sources = set()
+        for tc in tool_calls:
+            args = tc.get("args") or {}
+            if tc["name"] == "list_equipment":
+                sources.add(EQUIPMENT_SOURCE)
+            if args.get("sensor_type"):
+                sources.add(args["sensor_type"])
+            sources.update(args.get("sensor_types") or [])
+        return sorted(sources)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        metrics.increment("response_cache.lookups")
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.stored_at > self.ttl:
+            self.invalidate(key)
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def record(self, hit: bool) -> None:
+        """Count a lookup outcome once freshness has been checked."""
+        metrics.increment("response_cache.hits" if hit else "response_cache.misses")
+        metrics.set_gauge("response_cache.hit_rate", metrics.ratio("response_cache.hits", "response_cache.lookups"))
+
+    def put(
+        self,
+        key: str,
+        events: List[Dict[str, Any]],
+        data_versions: Dict[str, Optional[str]]
+    ) -> None:
+        self.invalidate(key)
+        events = self._merge_content(events)
+        size = len(json.dumps(events, ensure_ascii=False).encode("utf-8")) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = CachedResponse(events, data_versions, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            metrics.increment("response_cache.evictions")
+        metrics.set_gauge("response_cache.bytes", self._bytes)
+
+    def invalidate(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+            metrics.set_gauge("response_cache.bytes", self._bytes)
+
+    @staticmethod
+    def _merge_content(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Join consecutive content deltas so an entry stores text, not deltas."""
+        merged: List[Dict[str, Any]] = []
+        for event in events:
+            if event["type"] == "content" and merged and merged[-1]["type"] == "content":
+                merged[-1] = {"type": "content", "content": merged[-1]["content"] + event["content"]}
+            else:
+                merged.append(event)
+        return merged
+
+    @staticmethod
+    async def replay(
+        entry: CachedResponse,
+        chunk_chars: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the cached events, content split into deltas the size a live stream produces."""
+        chunk_chars = chunk_chars or settings.RESPONSE_CACHE_REPLAY_CHUNK_CHARS
+        for event in entry.events:
+            if event["type"] != "content":
+                yield event
+                continue
+            content = event["content"]
+            for start in range(0, len(content), chunk_chars):
+                yield {"type": "content", "content": content[start:start + chunk_chars]}
+
+
+# Singleton instance
+response_cache = ResponseCache()
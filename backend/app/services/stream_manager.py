@@ -0,0 +1,196 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.services.stream_store import StreamStore, StreamEvent, create_stream_store
+
+
+SLOW_CONSUMER_POLICIES = ("coalesce", "pause", "abort")
+
+
+class StreamNotFound(Exception):
+    """The stream expired or lives on a store this process cannot reach."""
+
+
+class SlowConsumer(Exception):
+    """Subscribers fell too far behind the generation."""
+
+
+class StreamManager:
+    """
+    Runs chat generations as detached tasks that outlive their HTTP request.
+
+    Each generation writes numbered events into the stream store. Clients
+    subscribe by stream id and resume after their Last-Event-ID, so a
+    reconnect replays the buffer instead of generating the answer again.
+
+    The generation never waits on a client's socket. When subscribers lag
+    more than `max_lag` events behind, the slow-consumer policy applies:
+    "coalesce" keeps generating and sends the backlog as merged frames (or a
+    snapshot once it was evicted), "pause" stops reading the LLM until the
+    client catches up, and "abort" stops the generation; the answer so far
+    is saved either way.
+    """
+
+    def __init__(
+        self,
+        store: Optional[StreamStore] = None,
+        policy: Optional[str] = None,
+        max_lag: Optional[int] = None
+    ):
+        self.store = store or create_stream_store()
+        self.policy = policy or settings.SSE_SLOW_CONSUMER_POLICY
+        if self.policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {self.policy}")
+        self.max_lag = max_lag or settings.SSE_SLOW_CONSUMER_MAX_LAG
+        self.pause_seconds = settings.SSE_SLOW_CONSUMER_PAUSE_SECONDS
+        self.heartbeat_seconds = settings.SSE_HEARTBEAT_SECONDS
+        self.max_seconds = settings.SSE_STREAM_MAX_SECONDS
+        self.shutdown_grace_seconds = settings.SSE_SHUTDOWN_GRACE_SECONDS
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def start(
+        self,
+        stream_id: str,
+        user_id: str,
+        events: AsyncIterator[StreamEvent]
+    ) -> bool:
+        """Start the generation unless the stream already exists; True if started."""
+        if not await self.store.create(stream_id, user_id):
+            await events.aclose()
+            return False
+
+        task = asyncio.create_task(self._run(stream_id, events))
+        self._tasks[stream_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(stream_id, None))
+        metrics.increment("sse.streams_started")
+        return True
+
+    async def subscribe(
+        self,
+        stream_id: str,
+        user_id: str,
+        last_event_id: int = 0
+    ) -> AsyncIterator[Optional[Tuple[int, StreamEvent]]]:
+        """
+        Yield (id, event) after `last_event_id` until the stream finishes.
+
+        Yields None after `heartbeat_seconds` without events, so the caller
+        can keep idle proxies from closing the connection during tool calls.
+        """
+        owner = await self.store.get_owner(stream_id)
+        if owner is None:
+            raise StreamNotFound(stream_id)
+        if owner != user_id:
+            raise PermissionError(stream_id)
+
+        after = last_event_id
+        if after:
+            metrics.increment("sse.resumes")
+
+        while True:
+            events, first_id, finished = await self.store.read(stream_id, after)
+            if first_id > after + 1:
+                # Events the client has not seen were evicted; send the answer so far instead
+                snapshot = await self.store.snapshot(stream_id)
+                yield snapshot["through"], {
+                    "type": "snapshot", "content": snapshot["content"], "chartData": snapshot["chartData"]
+                }
+                after = max(snapshot["through"], first_id - 1)
+                metrics.increment("sse.snapshots")
+                continue
+
+            for event_id, event in self._merge_content(events):
+                after = event_id
+                yield event_id, event
+            if events:
+                await self.store.ack(stream_id, after)
+            elif finished:
+                return
+            elif not await self.store.wait(stream_id, after, timeout=self.heartbeat_seconds):
+                yield None
+
+    async def cancel(self, stream_id: str, user_id: str) -> bool:
+        """Stop a generation running in this process."""
+        if await self.store.get_owner(stream_id) != user_id:
+            return False
+        task = self._tasks.get(stream_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    async def shutdown(self) -> None:
+        """
+        Cancel running generations and wait for them to save the answer so far.
+
+        Each generation persists its partial turn while handling the
+        cancellation, so this must finish before the turn writer and the
+        shared clients shut down.
+        """
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.shutdown_grace_seconds)
+            if pending:
+                logger.warning(f"{len(pending)} chat streams did not finish saving before shutdown")
+        self._tasks.clear()
+
+    @staticmethod
+    def _merge_content(events: List[Tuple[int, StreamEvent]]) -> List[Tuple[int, StreamEvent]]:
+        """Join consecutive content events of a backlog into one frame carrying the last id."""
+        merged: List[Tuple[int, StreamEvent]] = []
+        for event_id, event in events:
+            if event.get("type") == "content" and merged and merged[-1][1].get("type") == "content":
+                content = merged[-1][1]["content"] + event["content"]
+                merged[-1] = (event_id, {"type": "content", "content": content})
+            else:
+                merged.append((event_id, event))
+        if len(merged) < len(events):
+            metrics.increment("sse.backlog_merged_events", len(events) - len(merged))
+        return merged
+
+    async def _throttle(self, stream_id: str, event_id: int) -> None:
+        """Apply the slow-consumer policy once subscribers lag `max_lag` events behind."""
+        behind = event_id - self.max_lag
+        if self.policy == "coalesce" or behind <= 0:
+            return
+        if await self.store.delivered(stream_id) >= behind:
+            return
+
+        if self.policy == "pause":
+            metrics.increment("sse.slow_consumer_pauses")
+            started_at = time.monotonic()
+            caught_up = await self.store.wait_delivered(stream_id, behind, timeout=self.pause_seconds)
+            metrics.observe("sse.slow_consumer_pause_seconds", time.monotonic() - started_at)
+            if caught_up:
+                return
+        raise SlowConsumer(stream_id)
+
+    async def _run(self, stream_id: str, events: AsyncIterator[StreamEvent]) -> None:
+        try:
+            async with asyncio.timeout(self.max_seconds):
+                async for event in events:
+                    event_id = await self.store.append(stream_id, event)
+                    await self._throttle(stream_id, event_id)
+        except SlowConsumer:
+            metrics.increment("sse.slow_consumer_aborts")
+            await self.store.append(stream_id, {"type": "error", "error": "Client too slow, stream stopped"})
+        except asyncio.CancelledError:
+            await self.store.append(stream_id, {"type": "error", "error": "Stream cancelled"})
+        except TimeoutError:
+            await self.store.append(stream_id, {"type": "error", "error": "Stream timed out"})
+        except Exception as e:
+            logger.error(f"Chat stream {stream_id} failed: {e}")
+            await self.store.append(stream_id, {"type": "error", "error": str(e)})
+        finally:
+            await events.aclose()
+            await self.store.finish(stream_id)
+
+
+# Singleton instance
+stream_manager = StreamManager()
@@ -0,0 +1,350 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import asyncio
+import json
+import time
+
+from app.core.config import settings
+
+
+StreamEvent = Dict[str, Any]
+
+
+class StreamStore(ABC):
+    """
+    Replay buffer for chat streams.
+
+    Every stream holds numbered events (ids start at 1) in a bounded buffer,
+    plus a snapshot of the answer so far, so a reconnecting client can
+    resume after its Last-Event-ID even when older events were evicted.
+    """
+
+    def __init__(self, max_events: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_events = max_events or settings.SSE_REPLAY_BUFFER_EVENTS
+        self.ttl = ttl or settings.SSE_STREAM_TTL_SECONDS
+
+    @abstractmethod
+    async def create(self, stream_id: str, owner: str) -> bool:
+        """Register a stream; False if the id is already taken."""
+        ...
+
+    @abstractmethod
+    async def get_owner(self, stream_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def append(self, stream_id: str, event: StreamEvent) -> int:
+        """Add an event and return its id."""
+        ...
+
+    @abstractmethod
+    async def read(self, stream_id: str, after: int) -> Tuple[List[Tuple[int, StreamEvent]], int, bool]:
+        """Return (events with id > after, id of the oldest retained event, finished)."""
+        ...
+
+    @abstractmethod
+    async def snapshot(self, stream_id: str) -> Dict[str, Any]:
+        """The answer so far: {"through": last folded id, "content": ..., "chartData": ...}."""
+        ...
+
+    @abstractmethod
+    async def wait(self, stream_id: str, after: int, timeout: float) -> bool:
+        """Block until an event newer than `after` exists or the stream ends; False on timeout."""
+        ...
+
+    @abstractmethod
+    async def ack(self, stream_id: str, event_id: int) -> None:
+        """Record that a subscriber has written events up to `event_id` to its client."""
+        ...
+
+    @abstractmethod
+    async def delivered(self, stream_id: str) -> int:
+        """Highest event id any subscriber has written to its client."""
+        ...
+
+    @abstractmethod
+    async def wait_delivered(self, stream_id: str, event_id: int, timeout: float) -> bool:
+        """Block until events up to `event_id` are delivered; False on timeout."""
+        ...
+
+    @abstractmethod
+    async def finish(self, stream_id: str) -> None:
+        """Mark the stream complete; it is kept for the TTL so late reconnects can replay."""
+        ...
+
+    @staticmethod
+    def _apply(snapshot: Dict[str, Any], event_id: int, event: StreamEvent) -> Dict[str, Any]:
+        # Only the answer is folded in; done/error are replayed as events
+        if event.get("type") == "content":
+            snapshot["content"] = snapshot.get("content", "") + event.get("content", "")
+            snapshot["through"] = event_id
+        elif event.get("type") == "chart":
+            snapshot["chartData"] = event.get("chartData")
+            snapshot["through"] = event_id
+        return snapshot
+
+
+class _MemoryStream:
+    def __init__(self, owner: str, max_events: int):
+        self.owner = owner
+        self.events: Deque[Tuple[int, StreamEvent]] = deque(maxlen=max_events)
+        self.next_id = 1
+        self.snapshot: Dict[str, Any] = {"through": 0, "content": "", "chartData": None}
+        self.delivered = 0
+        self.finished = False
+        self.expires_at: Optional[float] = None
+        self.changed = asyncio.Condition()
+
+
+class MemoryStreamStore(StreamStore):
+    """Per-process store; reconnects must reach the same replica."""
+
+    def __init__(self, max_events: Optional[int] = None, ttl: Optional[float] = None):
+        super().__init__(max_events, ttl)
+        self._streams: Dict[str, _MemoryStream] = {}
+
+    def _get(self, stream_id: str) -> Optional[_MemoryStream]:
+        self._expire()
+        return self._streams.get(stream_id)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for stream_id in [s for s, st in self._streams.items() if st.expires_at and st.expires_at < now]:
+            del self._streams[stream_id]
+
+    async def create(self, stream_id: str, owner: str) -> bool:
+        if self._get(stream_id) is not None:
+            return False
+        self._streams[stream_id] = _MemoryStream(owner, self.max_events)
+        return True
+
+    async def get_owner(self, stream_id: str) -> Optional[str]:
+        stream = self._get(stream_id)
+        return stream.owner if stream else None
+
+    async def append(self, stream_id: str, event: StreamEvent) -> int:
+        stream = self._streams[stream_id]
+        event_id = stream.next_id
+        stream.next_id += 1
+        stream.events.append((event_id, event))
+        self._apply(stream.snapshot, event_id, event)
+        async with stream.changed:
+            stream.changed.notify_all()
+        return event_id
+
+    async def read(self, stream_id: str, after: int) -> Tuple[List[Tuple[int, StreamEvent]], int, bool]:
+        stream = self._get(stream_id)
+        if stream is None:
+            return [], 0, True
+        first_id = stream.events[0][0] if stream.events else stream.next_id
+        return [(i, e) for i, e in stream.events if i > after], first_id, stream.finished
+
+    async def snapshot(self, stream_id: str) -> Dict[str, Any]:
+        stream = self._get(stream_id)
+        return dict(stream.snapshot) if stream else {"through": 0, "content": "", "chartData": None}
+
+    async def wait(self, stream_id: str, after: int, timeout: float) -> bool:
+        stream = self._get(stream_id)
+        if stream is None:
+            return True
+        return await self._wait_for(stream, lambda: stream.finished or stream.next_id - 1 > after, timeout)
+
+    async def ack(self, stream_id: str, event_id: int) -> None:
+        stream = self._streams.get(stream_id)
+        if stream is not None and event_id > stream.delivered:
+            stream.delivered = event_id
+            async with stream.changed:
+                stream.changed.notify_all()
+
+    async def delivered(self, stream_id: str) -> int:
+        stream = self._streams.get(stream_id)
+        return stream.delivered if stream else 0
+
+    async def wait_delivered(self, stream_id: str, event_id: int, timeout: float) -> bool:
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            return True
+        return await self._wait_for(stream, lambda: stream.delivered >= event_id, timeout)
+
+    @staticmethod
+    async def _wait_for(stream: _MemoryStream, predicate, timeout: float) -> bool:
+        async with stream.changed:
+            try:
+                await asyncio.wait_for(stream.changed.wait_for(predicate), timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+    async def finish(self, stream_id: str) -> None:
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            return
+        stream.finished = True
+        stream.expires_at = time.monotonic() + self.ttl
+        async with stream.changed:
+            stream.changed.notify_all()
+
+
+class LocalRedisStandIn:
+    """
+    In-process stand-in for the subset of Redis used by SharedStreamStore.
+
+    Method names and semantics follow redis.asyncio.Redis (decode_responses=True),
+    so a real client can be passed to SharedStreamStore to share streams
+    across replicas.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+
+    def _live(self, key: str) -> bool:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at < time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    async def set(self, key: str, value: str, nx: bool = False, ex: Optional[int] = None) -> bool:
+        if nx and self._live(key):
+            return False
+        self._data[key] = value
+        if ex:
+            self._expires[key] = time.monotonic() + ex
+        else:
+            self._expires.pop(key, None)
+        return True
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._data.get(key) if self._live(key) else None
+
+    async def incr(self, key: str) -> int:
+        value = int(self._data.get(key, 0)) + 1 if self._live(key) else 1
+        self._data[key] = str(value)
+        return value
+
+    async def rpush(self, key: str, *values: str) -> int:
+        self._live(key)
+        items = self._data.setdefault(key, [])
+        items.extend(values)
+        return len(items)
+
+    async def ltrim(self, key: str, start: int, end: int) -> bool:
+        if self._live(key):
+            items = self._data[key]
+            stop = len(items) if end == -1 else end + 1
+            self._data[key] = items[start:stop]
+        return True
+
+    async def lrange(self, key: str, start: int, end: int) -> List[str]:
+        if not self._live(key):
+            return []
+        items = self._data[key]
+        stop = len(items) if end == -1 else end + 1
+        return list(items[start:stop])
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if not self._live(key):
+            return False
+        self._expires[key] = time.monotonic() + seconds
+        return True
+
+
+class SharedStreamStore(StreamStore):
+    """
+    Store over a Redis-compatible client so any replica can serve a reconnect.
+
+    Waiting polls the client, since a shared store cannot notify this process.
+    """
+
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        max_events: Optional[int] = None,
+        ttl: Optional[float] = None,
+        poll_interval: Optional[float] = None
+    ):
+        super().__init__(max_events, ttl)
+        self.client = client or LocalRedisStandIn()
+        self.poll_interval = poll_interval or settings.SSE_STREAM_POLL_MS / 1000
+        # Keys live this long while a stream is active, then the TTL after it finishes
+        self._active_ttl = int(self.ttl + settings.SSE_STREAM_MAX_SECONDS)
+
+    @staticmethod
+    def _key(stream_id: str, part: str) -> str:
+        return f"chat-stream:{stream_id}:{part}"
+
+    async def create(self, stream_id: str, owner: str) -> bool:
+        return bool(await self.client.set(self._key(stream_id, "owner"), owner, nx=True, ex=self._active_ttl))
+
+    async def get_owner(self, stream_id: str) -> Optional[str]:
+        return await self.client.get(self._key(stream_id, "owner"))
+
+    async def append(self, stream_id: str, event: StreamEvent) -> int:
+        event_id = await self.client.incr(self._key(stream_id, "seq"))
+        events_key = self._key(stream_id, "events")
+        await self.client.rpush(events_key, json.dumps([event_id, event], ensure_ascii=False))
+        await self.client.ltrim(events_key, -self.max_events, -1)
+
+        snapshot = await self.snapshot(stream_id)
+        await self.client.set(
+            self._key(stream_id, "snapshot"),
+            json.dumps(self._apply(snapshot, event_id, event), ensure_ascii=False),
+            ex=self._active_ttl
+        )
+        for part in ("seq", "events"):
+            await self.client.expire(self._key(stream_id, part), self._active_ttl)
+        return event_id
+
+    async def read(self, stream_id: str, after: int) -> Tuple[List[Tuple[int, StreamEvent]], int, bool]:
+        raw = await self.client.lrange(self._key(stream_id, "events"), 0, -1)
+        events = [tuple(json.loads(item)) for item in raw]
+        finished = await self.client.get(self._key(stream_id, "finished")) is not None
+        if events:
+            first_id = events[0][0]
+        else:
+            first_id = int(await self.client.get(self._key(stream_id, "seq")) or 0) + 1
+        return [(i, e) for i, e in events if i > after], first_id, finished
+
+    async def snapshot(self, stream_id: str) -> Dict[str, Any]:
+        raw = await self.client.get(self._key(stream_id, "snapshot"))
+        return json.loads(raw) if raw else {"through": 0, "content": "", "chartData": None}
+
+    async def wait(self, stream_id: str, after: int, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if await self.client.get(self._key(stream_id, "finished")) is not None:
+                return True
+            if int(await self.client.get(self._key(stream_id, "seq")) or 0) > after:
+                return True
+            await asyncio.sleep(self.poll_interval)
+        return False
+
+    async def ack(self, stream_id: str, event_id: int) -> None:
+        # Subscribers on different replicas may race; the position only ever moves forward
+        if event_id > await self.delivered(stream_id):
+            await self.client.set(self._key(stream_id, "delivered"), str(event_id), ex=self._active_ttl)
+
+    async def delivered(self, stream_id: str) -> int:
+        return int(await self.client.get(self._key(stream_id, "delivered")) or 0)
+
+    async def wait_delivered(self, stream_id: str, event_id: int, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if await self.delivered(stream_id) >= event_id:
+                return True
+            await asyncio.sleep(self.poll_interval)
+        return False
+
+    async def finish(self, stream_id: str) -> None:
+        ttl = int(self.ttl)
+        await self.client.set(self._key(stream_id, "finished"), "1", ex=ttl)
+        for part in ("owner", "seq", "events", "snapshot", "delivered"):
+            await self.client.expire(self._key(stream_id, part), ttl)
+
+
+def create_stream_store() -> StreamStore:
+    if settings.SSE_STREAM_STORE == "shared":
+        return SharedStreamStore()
+    return MemoryStreamStore()
@@ -0,0 +1,102 @@
+from typing import Dict, Any, List, Optional
+import asyncio
+import json
+import os
+import time
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.clients import SharedClients
+from app.services.llm_client import LLMClient
+
+
+class ToolCatalog:
+    """
+    In-process cache of the MCP tool catalog.
+
+    The catalog only changes on deploy, so it is served from memory and
+    revalidated in the background with the MCP server's ETag. The last
+    known catalog is persisted to disk so startup is fast and correct even
+    while the MCP server is down.
+    """
+
+    def __init__(self):
+        self.base_url = settings.MCP_SERVER_URL
+        self.ttl = settings.MCP_TOOL_CATALOG_TTL_SECONDS
+        self.cache_path = settings.MCP_TOOL_CATALOG_CACHE_PATH
+        self.tools: List[Dict[str, Any]] = []
+        self.openai_tools: List[Dict[str, Any]] = []
+        self.version: Optional[str] = None
+        self._checked_at: float = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def startup(self) -> None:
+        """Load the persisted catalog and start a background revalidation."""
+        self._load_from_disk()
+        self._schedule_refresh()
+
+    async def shutdown(self) -> None:
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        self._refresh_task = None
+
+    async def get(self) -> "ToolCatalog":
+        """Return the catalog, fetching synchronously only when nothing is cached."""
+        if not self.tools:
+            await self.refresh()
+        elif time.monotonic() - self._checked_at > self.ttl:
+            self._schedule_refresh()
+        return self
+
+    async def refresh(self) -> None:
+        """Revalidate the catalog against the MCP server."""
+        headers = {"If-None-Match": self.version} if self.version and self.tools else {}
+        try:
+            response = await SharedClients.get_mcp_client().get(
+                f"{self.base_url}/tools", headers=headers
+            )
+            self._checked_at = time.monotonic()
+            if response.status_code == 304:
+                return
+            response.raise_for_status()
+            self._set(response.json(), response.headers.get("ETag"))
+            self._save_to_disk()
+            logger.info(f"MCP tool catalog updated (version {self.version})")
+        except (httpx.HTTPError, RuntimeError) as e:
+            # Keep serving the last known catalog
+            logger.error(f"Error fetching MCP tools: {e}")
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+    def _set(self, tools: List[Dict[str, Any]], version: Optional[str]) -> None:
+        self.tools = tools
+        self.openai_tools = LLMClient.format_tools(tools)
+        self.version = version
+
+    def _load_from_disk(self) -> None:
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            self._set(cached["tools"], cached.get("version"))
+            logger.info(f"Loaded persisted MCP tool catalog (version {self.version})")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Ignoring unreadable MCP tool catalog cache: {e}")
+
+    def _save_to_disk(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.version, "tools": self.tools}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.error(f"Error persisting MCP tool catalog: {e}")
+
+
+# Singleton instance
+tool_catalog = ToolCatalog()
@@ -0,0 +1,156 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import json
+
+from app.core.config import settings
+from app.core.tokens import estimate_json_tokens
+
+
+class ToolResultCompactor:
+    """
+    Shrink MCP tool results before they are sent back to the LLM.
+
+    Raw rows and chart points are replaced with summary statistics and a
+    downsampled series so the follow-up prompt stays within a token budget.
+    The full result still goes to the frontend.
+    """
+
+    # Points kept as a preview of a chart series
+    CHART_PREVIEW_POINTS = 24
+
+    def __init__(self, token_budget: Optional[int] = None):
+        self.token_budget = token_budget or settings.LLM_TOOL_RESULT_TOKEN_BUDGET
+
+    def compact(self, tool_name: str, result: Any) -> Any:
+        """Return a version of the tool result that fits the token budget."""
+        if not isinstance(result, dict) or "error" in result:
+            return result
+
+        if "options" in result:
+            compacted = self._compact_chart(result)
+        elif tool_name == "get_sensor_data" and isinstance(result.get("data"), list):
+            compacted = self._compact_sensor_data(result)
+        else:
+            compacted = result
+
+        if estimate_json_tokens(compacted) <= self.token_budget:
+            return compacted
+        return self._truncate(compacted)
+
+    def _compact_sensor_data(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        if not result["data"]:
+            return result
+        rows = sorted(result["data"], key=lambda r: r.get("timestamp") or "")
+
+        compacted: Dict[str, Any] = {
+            "sensor_type": result.get("sensor_type"),
+            "count": result.get("count", len(rows)),
+        }
+
+        # Hoist fields that are identical on every row
+        for field in ("unit", "equipment_id"):
+            distinct = {r.get(field) for r in rows}
+            if len(distinct) == 1:
+                compacted[field] = distinct.pop()
+
+        values = [r["value"] for r in rows if r.get("value") is not None]
+        compacted["summary"] = self._summarize(values)
+        compacted["time_range"] = {
+            "start": min(r["timestamp"] for r in rows),
+            "end": max(r["timestamp"] for r in rows),
+        }
+
+        # Rows keep only what is not already hoisted; ids are never useful to the model
+        keep = [f for f in ("timestamp", "value", "equipment_id", "unit") if f not in compacted]
+        points = [[r.get(f) for f in keep] for r in rows]
+        compacted["columns"] = keep
+        compacted["data"] = self._fit_points(compacted, "data", points)
+        if len(compacted["data"]) < len(points):
+            compacted["downsampled_from"] = len(points)
+        return compacted
+
+    def _compact_chart(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        options = result.get("options") or {}
+        series_list = options.get("series") or []
+
+        compacted: Dict[str, Any] = {
+            "chart_rendered": True,
+            "type": result.get("type"),
+            "title": result.get("title"),
+            "description": "차트가 사용자 화면에 표시되었습니다. 아래는 시리즈별 요약입니다.",
+        }
+
+        # Shrink the per-series preview until the description fits
+        preview_points = self.CHART_PREVIEW_POINTS
+        while True:
+            compacted["series"] = [self._describe_series(s, preview_points) for s in series_list]
+            if preview_points <= 2 or estimate_json_tokens(compacted) <= self.token_budget:
+                return compacted
+            preview_points //= 2
+
+    def _describe_series(self, series: Dict[str, Any], preview_points: int) -> Dict[str, Any]:
+        data = series.get("data") or []
+        entry: Dict[str, Any] = {"name": series.get("name"), "points": len(data)}
+
+        pairs = [p for p in data if isinstance(p, (list, tuple)) and len(p) >= 2]
+        if pairs:
+            entry["time_range"] = {
+                "start": self._format_time(pairs[0][0]),
+                "end": self._format_time(pairs[-1][0]),
+            }
+            entry["summary"] = self._summarize([p[1] for p in pairs])
+            entry["preview"] = [
+                [self._format_time(p[0]), p[1]]
+                for p in self._downsample(pairs, preview_points)
+            ]
+        elif data:
+            # Gauge-style series carry a single {"value": ...} item
+            entry["data"] = data
+        return entry
+
+    def _fit_points(self, container: Dict[str, Any], key: str, points: List[Any]) -> List[Any]:
+        """Halve the number of points until the container fits the budget."""
+        target = len(points)
+        while target > 1:
+            container[key] = self._downsample(points, target)
+            if estimate_json_tokens(container) <= self.token_budget:
+                return container[key]
+            target //= 2
+        return self._downsample(points, 1) if points else []
+
+    def _truncate(self, value: Any) -> Dict[str, Any]:
+        """Last resort: cut the serialized result to the budget."""
+        text = json.dumps(value, ensure_ascii=False, default=str)
+        # Estimates are conservative for ASCII JSON, so scale by characters per token
+        max_chars = max(self.token_budget * 3, 200)
+        return {"truncated": True, "content": text[:max_chars]}
+
+    @staticmethod
+    def _downsample(points: List[Any], max_points: int) -> List[Any]:
+        """Evenly spaced subset that always keeps the first and last point."""
+        if len(points) <= max_points:
+            return list(points)
+        if max_points == 1:
+            return [points[-1]]
+        step = (len(points) - 1) / (max_points - 1)
+        return [points[round(i * step)] for i in range(max_points)]
+
+    @staticmethod
+    def _summarize(values: List[Any]) -> Dict[str, Any]:
+        numbers = [v for v in values if isinstance(v, (int, float))]
+        if not numbers:
+            return {"count": 0}
+        return {
+            "count": len(numbers),
+            "min": round(min(numbers), 2),
+            "max": round(max(numbers), 2),
+            "mean": round(sum(numbers) / len(numbers), 2),
+            "latest": round(numbers[-1], 2),
+        }
+
+    @staticmethod
+    def _format_time(value: Any) -> Any:
+        """Render epoch-millisecond timestamps as ISO 8601 for readability."""
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value / 1000, tz=timezone.utc).isoformat()
+        return value
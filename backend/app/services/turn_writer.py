@@ -0,0 +1,201 @@
+from typing import Any, Dict, List, Optional
+from sqlalchemy.ext.asyncio import async_sessionmaker
+import asyncio
+import json
+import time
+
+from app.core.config import settings
+from app.core.database import MySQLSessionLocal, mysql_unit_of_work
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.repositories.conversation_repo import ConversationRepository
+from app.repositories.message_repo import MessageRepository
+from app.services.context_cache import context_cache
+
+
+class TurnWriter:
+    """
+    Persists completed chat turns.
+
+    A turn is a dict with the conversation id, an optional new conversation
+    row, the message rows (ids generated client-side) and an optional title.
+    Turns are written with bulk INSERTs and one UPDATE per conversation in a
+    single transaction, so nothing needs a refresh round trip.
+
+    With write-behind enabled, turns are queued and flushed in batches by a
+    background task. Durability lag is bounded by the flush delay; when the
+    queue is full the caller waits for room, for at most the enqueue
+    timeout, so turns of a conversation are always written in order. A
+    failed batch is retried with backoff, then turn by turn, so one bad
+    turn does not take the rest of the batch with it; turns that still
+    fail are logged in full as dead letters.
+
+    Queued turns are not in MySQL yet, so readers in this process merge
+    them in through `pending`, `pending_owner` and `pending_conversations`.
+    Other workers see them only after the flush.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = MySQLSessionLocal):
+        self.session_factory = session_factory
+        self.write_behind = settings.MESSAGE_WRITE_BEHIND_ENABLED
+        self.max_delay = settings.MESSAGE_WRITE_BEHIND_MAX_DELAY_MS / 1000
+        self.batch_size = settings.MESSAGE_WRITE_BEHIND_BATCH_SIZE
+        self.enqueue_timeout = settings.MESSAGE_WRITE_BEHIND_ENQUEUE_TIMEOUT_MS / 1000
+        self.retries = settings.MESSAGE_WRITE_BEHIND_RETRIES
+        self.retry_backoff = settings.MESSAGE_WRITE_BEHIND_RETRY_BACKOFF_MS / 1000
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.MESSAGE_WRITE_BEHIND_QUEUE_SIZE)
+        self._worker: Optional[asyncio.Task] = None
+        # Queued turns by conversation id, so reads can see writes that are not yet durable
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+
+    async def startup(self) -> None:
+        if self.write_behind and self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        """Flush whatever is still queued, then stop the worker."""
+        if self._worker is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def pending(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """Turns of the conversation that are queued but not yet written."""
+        return list(self._pending.get(conversation_id, ()))
+
+    def pending_owner(self, conversation_id: str) -> Optional[str]:
+        """Owner of a conversation that only exists in the queue."""
+        for turn in self._pending.get(conversation_id, ()):
+            if turn.get("conversation"):
+                return turn["conversation"]["user_id"]
+        return None
+
+    def pending_conversations(self, user_id: str) -> List[str]:
+        """Ids of the user's conversations that only exist in the queue."""
+        return [
+            conversation_id for conversation_id in self._pending
+            if self.pending_owner(conversation_id) == user_id
+        ]
+
+    async def write(self, turn: Dict[str, Any]) -> None:
+        """Persist a turn now, or hand it to the write-behind queue."""
+        if self._worker is None:
+            await self.persist([turn])
+            return
+
+        turn["enqueued_at"] = time.monotonic()
+        # Registered before waiting, so reads see the turn while it waits for room
+        self._pending.setdefault(turn["conversation_id"], []).append(turn)
+        try:
+            if self._queue.full():
+                # Backpressure keeps the durability lag bounded
+                metrics.increment("turn_writer.queue_full")
+            await asyncio.wait_for(self._queue.put(turn), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self._forget(turn)
+            if self.pending(turn["conversation_id"]):
+                # Writing now would overtake this conversation's queued turns
+                self._dead_letter(turn, TimeoutError("write-behind queue stayed full"))
+                raise RuntimeError("Chat history could not be saved, please retry")
+            await self.persist([turn])
+        except asyncio.CancelledError:
+            self._forget(turn)
+            raise
+        metrics.set_gauge("turn_writer.queue_depth", self._queue.qsize())
+
+    async def persist(self, turns: List[Dict[str, Any]]) -> None:
+        """Write a batch of turns in one transaction."""
+        conversations = [t["conversation"] for t in turns if t.get("conversation")]
+        messages = [m for t in turns for m in t["messages"]]
+
+        async with mysql_unit_of_work(self.session_factory) as db:
+            conversation_repo = ConversationRepository(db)
+            if conversations:
+                await conversation_repo.insert_many(conversations)
+            if messages:
+                await MessageRepository(db).insert_many(messages)
+            for turn in turns:
+                # New conversations were inserted with their title and timestamps
+                if not turn.get("conversation"):
+                    await conversation_repo.touch(turn["conversation_id"], turn.get("title"))
+
+        metrics.increment("turn_writer.turns", len(turns))
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._persist_with_retry(batch)
+            finally:
+                for turn in batch:
+                    self._forget(turn)
+                    self._queue.task_done()
+            metrics.set_gauge("turn_writer.queue_depth", self._queue.qsize())
+
+    async def _persist_with_retry(self, batch: List[Dict[str, Any]]) -> None:
+        """Write a batch, retrying with backoff, then isolating failing turns."""
+        delay = self.retry_backoff
+        for attempt in range(self.retries + 1):
+            try:
+                await self.persist(batch)
+                self._observe_lag(batch)
+                return
+            except Exception as e:
+                error = e
+            if attempt < self.retries:
+                metrics.increment("turn_writer.retries")
+                await asyncio.sleep(delay)
+                delay *= 2
+
+        if len(batch) > 1:
+            logger.warning(f"Batch of {len(batch)} chat turns failed ({error}); writing them one by one")
+        # In queue order, so a conversation's insert still precedes its later turns
+        for turn in batch:
+            try:
+                await self.persist([turn])
+                self._observe_lag([turn])
+            except Exception as e:
+                self._dead_letter(turn, e)
+
+    def _dead_letter(self, turn: Dict[str, Any], error: Exception) -> None:
+        """Drop a turn that cannot be written, logging it in full so it can be replayed."""
+        metrics.increment("turn_writer.failed")
+        record = {k: v for k, v in turn.items() if k != "enqueued_at"}
+        logger.error(
+            f"Dead-lettered chat turn for conversation {turn['conversation_id']}: {error} "
+            f"turn={json.dumps(record, ensure_ascii=False, default=str)}"
+        )
+        # Cached context must not outlive the write that was lost
+        context_cache.invalidate(turn["conversation_id"])
+
+    @staticmethod
+    def _observe_lag(turns: List[Dict[str, Any]]) -> None:
+        now = time.monotonic()
+        for turn in turns:
+            metrics.observe("turn_writer.lag_ms", (now - turn["enqueued_at"]) * 1000)
+
+    def _forget(self, turn: Dict[str, Any]) -> None:
+        remaining = [t for t in self._pending.get(turn["conversation_id"], ()) if t is not turn]
+        if remaining:
+            self._pending[turn["conversation_id"]] = remaining
+        else:
+            self._pending.pop(turn["conversation_id"], None)
+
+
+# Singleton instance
+turn_writer = TurnWriter()
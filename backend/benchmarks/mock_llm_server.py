@@ -0,0 +1,71 @@
+"""
+Mock OpenAI-compatible LLM server for exercising the LLM endpoint pool.
+
+Streams chat completions with a configurable time to first token, token
+interval and failure rate, so routing, failover and hedging can be tested
+locally by pointing LLM_ENDPOINTS at several instances.
+
+Usage:
+    python -m benchmarks.mock_llm_server --port 9001 --ttft-ms 200
+    python -m benchmarks.mock_llm_server --port 9002 --ttft-ms 800 --jitter-ms 400 --error-rate 0.1
+
+    LLM_ENDPOINTS='[{"base_url": "http://localhost:9001/v1", "name": "fast", "http2": false},
+                    {"base_url": "http://localhost:9002/v1", "name": "slow", "http2": false}]'
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def create_app(ttft_ms: int, token_ms: int, jitter_ms: int, tokens: int, error_rate: float) -> FastAPI:
+    app = FastAPI(title="Mock LLM")
+
+    def first_token_delay() -> float:
+        return (ttft_ms + random.uniform(0, jitter_ms)) / 1000
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if random.random() < error_rate:
+            return JSONResponse(status_code=503, content={"error": "mock overload"})
+
+        words = [f"토큰{i}" for i in range(tokens)]
+        if not body.get("stream"):
+            await asyncio.sleep(first_token_delay())
+            return {"choices": [{"message": {"role": "assistant", "content": " ".join(words)}}]}
+
+        async def events():
+            await asyncio.sleep(first_token_delay())
+            for word in words:
+                chunk = {"created": int(time.time()), "choices": [{"delta": {"content": word + " "}}]}
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                await asyncio.sleep(token_ms / 1000)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--ttft-ms", type=int, default=200, help="Delay before the first token")
+    parser.add_argument("--jitter-ms", type=int, default=0, help="Random extra first-token delay")
+    parser.add_argument("--token-ms", type=int, default=20, help="Delay between tokens")
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    args = parser.parse_args()
+
+    app = create_app(args.ttft_ms, args.token_ms, args.jitter_ms, args.tokens, args.error_rate)
+    uvicorn.run(app, host="0.0.0.0", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Event loop responsiveness during a burst of sign-ins.
+
+Runs a ticker that should wake every few milliseconds, like an SSE stream
+forwarding tokens, while a burst of concurrent bcrypt verifications runs
+either inline (the old behaviour) or on the PasswordHasher worker pool,
+and reports how late the ticker woke up.
+
+Usage:
+    python -m benchmarks.password_hashing --logins 20
+    python -m benchmarks.password_hashing --logins 50 --workers 8 --executor process
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.security import PasswordHasher, get_password_hash, verify_password
+
+
+async def measure_lag(stop: asyncio.Event, interval: float) -> list:
+    """Collect how late each tick fires while the burst runs."""
+    lags = []
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+    return lags
+
+
+async def run_burst(name: str, verify, logins: int, interval: float) -> dict:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop, interval))
+    await asyncio.sleep(interval * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    lags = sorted(await ticker)
+    return {
+        "mode": name,
+        "burst_seconds": elapsed,
+        "lag_p50_ms": statistics.median(lags) * 1000,
+        "lag_p99_ms": lags[min(int(0.99 * len(lags)), len(lags) - 1)] * 1000,
+        "lag_max_ms": lags[-1] * 1000,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    password = "benchmark-password"
+    hashed = get_password_hash(password)
+    hasher = PasswordHasher(workers=args.workers, max_queue=args.logins, executor=args.executor)
+    interval = args.tick_ms / 1000
+
+    async def inline():
+        return verify_password(password, hashed)
+
+    async def pooled():
+        return await hasher.verify(password, hashed)
+
+    try:
+        results = [
+            await run_burst("inline", inline, args.logins, interval),
+            await run_burst(f"{args.executor} pool x{args.workers}", pooled, args.logins, interval),
+        ]
+    finally:
+        hasher.shutdown()
+
+    print(f"{args.logins} concurrent logins, ticker every {args.tick_ms} ms")
+    print(f"{'mode':<20} {'burst s':>8} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11}")
+    for r in results:
+        print(
+            f"{r['mode']:<20} {r['burst_seconds']:>8.2f} {r['lag_p50_ms']:>11.1f} "
+            f"{r['lag_p99_ms']:>11.1f} {r['lag_max_ms']:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--tick-ms", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected
+
+
+def make_controller(**kwargs) -> AdmissionController:
+    kwargs.setdefault("max_active", 1)
+    kwargs.setdefault("max_queue", 10)
+    kwargs.setdefault("max_queued_per_user", 3)
+    return AdmissionController(**kwargs)
+
+
+def test_admits_immediately_while_slots_are_free():
+    controller = make_controller(max_active=2)
+
+    first = controller.enter("a")
+    second = controller.enter("b")
+
+    assert first.admitted and second.admitted
+    assert first.position == 0
+    assert controller.active == 2
+
+
+def test_positions_follow_round_robin_order():
+    controller = make_controller()
+    controller.enter("a")
+    a2 = controller.enter("a")
+    a3 = controller.enter("a")
+    b1 = controller.enter("b")
+    c1 = controller.enter("c")
+
+    assert [a2.position, b1.position, c1.position, a3.position] == [1, 2, 3, 4]
+
+
+def test_release_admits_round_robin_across_users():
+    controller = make_controller()
+    running = controller.enter("a")
+    a2 = controller.enter("a")
+    a3 = controller.enter("a")
+    b1 = controller.enter("b")
+    c1 = controller.enter("c")
+
+    admitted = []
+    for _ in range(4):
+        running.release()
+        running = next(t for t in (a2, a3, b1, c1) if t.admitted and t not in admitted)
+        admitted.append(running)
+
+    assert admitted == [a2, b1, c1, a3]
+
+
+def test_rejects_with_429_when_user_queue_is_full():
+    controller = make_controller(max_queued_per_user=2)
+    controller.enter("a")
+    controller.enter("a")
+    controller.enter("a")
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        controller.enter("a")
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.retry_after > 0
+    # Other users can still queue, and are served before the user's second request
+    assert controller.enter("b").position == 2
+
+
+def test_rejects_with_503_when_queue_is_full():
+    controller = make_controller(max_queue=2)
+    controller.enter("a")
+    controller.enter("a")
+    controller.enter("b")
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        controller.enter("c")
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.retry_after > 0
+
+
+def test_abandoned_ticket_leaves_the_queue():
+    controller = make_controller()
+    running = controller.enter("a")
+    b1 = controller.enter("b")
+    c1 = controller.enter("c")
+
+    b1.release()
+    b1.release()
+
+    assert c1.position == 1
+    running.release()
+    assert c1.admitted
+    assert controller.active == 1
+
+
+def test_release_is_idempotent_for_admitted_tickets():
+    controller = make_controller(max_active=2)
+    ticket = controller.enter("a")
+
+    ticket.release()
+    ticket.release()
+
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_positions_yields_changes_until_admitted():
+    controller = make_controller()
+    running = controller.enter("a")
+    b1 = controller.enter("b")
+    ticket = controller.enter("c")
+    seen = []
+
+    async def follow():
+        async for position in ticket.positions(timeout=5):
+            seen.append(position)
+
+    async def wait_seen(count):
+        while len(seen) < count:
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(follow())
+    await asyncio.wait_for(wait_seen(1), 1)
+    running.release()
+    await asyncio.wait_for(wait_seen(2), 1)
+    b1.release()
+    await asyncio.wait_for(task, 1)
+
+    assert seen == [2, 1]
+    assert ticket.admitted
+
+
+@pytest.mark.asyncio
+async def test_positions_times_out_while_queued():
+    controller = make_controller()
+    controller.enter("a")
+    ticket = controller.enter("b")
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        async for _ in ticket.positions(timeout=0.05):
+            pass
+
+    assert exc_info.value.status_code == 503
+    assert ticket.position == 1
@@ -0,0 +1,29 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import get_current_user_id
+from app.main import app
+from app.models.types import uuid7
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_user_id] = lambda: uuid7()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/conversations/not-a-uuid",
+    f"/api/v1/conversations/{uuid7()}?before=not-a-uuid",
+    f"/api/v1/conversations/{uuid7()}/messages/not-a-uuid/chart",
+    "/api/v1/conversations/not-a-uuid/messages/{}/chart".format(uuid7()),
+])
+def test_malformed_ids_are_rejected_before_querying(client, path):
+    assert client.get(path).status_code == 422
+
+
+def test_malformed_conversation_id_is_rejected_on_send(client):
+    response = client.post("/api/v1/chat/send", json={"conversation_id": "u1", "message": "hello"})
+
+    assert response.status_code == 422
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.message import MessageRole
+from app.models.types import uuid7
+from app.services.conversation_service import ConversationService
+from app.services.turn_writer import TurnWriter
+
+USER_ID = uuid7()
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class FakeConversationRepo:
+    def __init__(self, conversations=()):
+        self.conversations = {c.id: c for c in conversations}
+
+    async def get_by_id(self, conversation_id):
+        return self.conversations.get(conversation_id)
+
+    async def get_user_conversations_with_preview(self, user_id):
+        return [
+            SimpleNamespace(id=c.id, title=c.title, updated_at=c.updated_at, last_message="older")
+            for c in self.conversations.values() if c.user_id == user_id
+        ]
+
+
+class FakeMessageRepo:
+    async def get_page(self, conversation_id, limit, before=None):
+        return [], False
+
+    async def get_chart_data(self, conversation_id, message_id):
+        return None
+
+
+def make_turn(conversation_id, content, created_at, new=False, chart_data=None):
+    return {
+        "conversation_id": conversation_id,
+        "conversation": {"id": conversation_id, "user_id": USER_ID, "title": "첫 질문"} if new else None,
+        "messages": [
+            {"id": uuid7(), "conversation_id": conversation_id, "role": MessageRole.USER,
+             "content": "질문", "chart_data": None, "created_at": created_at},
+            {"id": uuid7(), "conversation_id": conversation_id, "role": MessageRole.ASSISTANT,
+             "content": content, "chart_data": chart_data, "created_at": created_at},
+        ],
+        "title": "첫 질문" if new else None,
+    }
+
+
+def make_service(conversations=(), turns=()):
+    writer = TurnWriter()
+    for turn in turns:
+        writer._pending.setdefault(turn["conversation_id"], []).append(turn)
+    service = ConversationService(db=None, writer=writer)
+    service.conversation_repo = FakeConversationRepo(conversations)
+    service.message_repo = FakeMessageRepo()
+    return service
+
+
+@pytest.mark.asyncio
+async def test_list_includes_conversations_still_in_write_behind_queue():
+    stored = SimpleNamespace(id=uuid7(), user_id=USER_ID, title="저장됨", updated_at=NOW - timedelta(hours=1))
+    queued_id = uuid7()
+    service = make_service([stored], [make_turn(queued_id, "대기 중 답변", NOW, new=True)])
+
+    items = await service.get_user_conversations(USER_ID)
+
+    assert [item.id for item in items] == [queued_id, stored.id]
+    assert items[0].title == "첫 질문"
+    assert items[0].last_message == "대기 중 답변"
+
+
+@pytest.mark.asyncio
+async def test_list_shows_latest_queued_turn_of_stored_conversation():
+    stored = SimpleNamespace(id=uuid7(), user_id=USER_ID, title="저장됨", updated_at=NOW - timedelta(hours=1))
+    service = make_service([stored], [make_turn(stored.id, "새 답변", NOW)])
+
+    items = await service.get_user_conversations(USER_ID)
+
+    assert items[0].last_message == "새 답변"
+    assert items[0].updated_at == NOW
+
+
+@pytest.mark.asyncio
+async def test_detail_of_queued_conversation_returns_its_messages():
+    queued_id = uuid7()
+    turn = make_turn(queued_id, "대기 중 답변", NOW, new=True, chart_data={"type": "line"})
+    service = make_service(turns=[turn])
+
+    conversation = await service.get_conversation(USER_ID, queued_id)
+    chart = await service.get_message_chart(USER_ID, queued_id, turn["messages"][1]["id"])
+
+    assert [m.content for m in conversation.messages] == ["질문", "대기 중 답변"]
+    assert conversation.messages[1].has_chart
+    assert chart.chart_data == {"type": "line"}
+
+
+@pytest.mark.asyncio
+async def test_queued_conversation_of_another_user_is_not_found():
+    queued_id = uuid7()
+    service = make_service(turns=[make_turn(queued_id, "답변", NOW, new=True)])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.get_conversation(uuid7(), queued_id)
+
+    assert exc_info.value.status_code == 404
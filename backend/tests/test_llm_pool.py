@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from app.core.llm_pool import LLMEndpoint, LLMPool
+
+
+class FakeResponse:
+    def __init__(self):
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_hedge_finishing_with_primary_is_closed():
+    endpoints = [LLMEndpoint({"base_url": f"http://llm-{i}", "name": f"llm-{i}", "http2": False}) for i in range(2)]
+    pool = LLMPool(endpoints)
+    pool.hedge_enabled = True
+    pool.hedge_min_delay = 0.01
+    gate = asyncio.Event()
+    responses = {}
+
+    async def fake_open(endpoint, path, body):
+        await gate.wait()
+        responses[endpoint.name] = FakeResponse()
+        return endpoint, responses[endpoint.name], None
+
+    pool._open = fake_open
+
+    opener = asyncio.create_task(pool._open_first("/chat/completions", {}))
+    # Let the hedge launch, then finish both attempts in the same round
+    await asyncio.sleep(0.05)
+    gate.set()
+    endpoint, response, _ = await asyncio.wait_for(opener, 1)
+
+    assert len(responses) == 2
+    assert not response.closed
+    other = next(r for name, r in responses.items() if name != endpoint.name)
+    assert other.closed
+    await pool.close()
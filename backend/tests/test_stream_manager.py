@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from app.services.stream_manager import StreamManager
+from app.services.stream_store import MemoryStreamStore
+
+
+@pytest.mark.asyncio
+async def test_shutdown_waits_for_cancelled_generations_to_save():
+    manager = StreamManager(store=MemoryStreamStore())
+    started = asyncio.Event()
+    saved = []
+
+    async def save():
+        await asyncio.sleep(0.05)
+        saved.append("partial answer")
+
+    async def generate():
+        try:
+            yield {"type": "content", "content": "partial"}
+            started.set()
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            await asyncio.shield(save())
+            raise
+
+    assert await manager.start("s1", "u1", generate())
+    await asyncio.wait_for(started.wait(), 1)
+
+    await manager.shutdown()
+
+    assert saved == ["partial answer"]
+    assert not manager._tasks
@@ -0,0 +1,86 @@
+import time
+import uuid
+
+import pytest
+from sqlalchemy import Column, MetaData, Table, create_engine, insert, select
+from sqlalchemy.exc import StatementError
+
+from app.models import types
+from app.models.types import BinaryUUID, uuid7
+
+
+def test_uuid7_sets_version_and_variant():
+    value = uuid.UUID(uuid7())
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def frozen_clock_ns() -> int:
+    """A whole millisecond ahead of any id generated so far."""
+    return (time.time_ns() // 1_000_000 + 60_000) * 1_000_000
+
+
+def test_uuid7_is_monotonic_within_one_millisecond(monkeypatch):
+    now = frozen_clock_ns()
+    monkeypatch.setattr(types.time, "time_ns", lambda: now)
+
+    # More ids than the 12-bit counter holds, so it also borrows the next millisecond
+    ids = [uuid7() for _ in range(5000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert uuid.UUID(ids[0]).int >> 80 == now // 1_000_000
+
+
+def test_uuid7_is_monotonic_when_clock_goes_back(monkeypatch):
+    now = [frozen_clock_ns()]
+    monkeypatch.setattr(types.time, "time_ns", lambda: now[0])
+
+    first = uuid7()
+    now[0] -= 5_000_000
+
+    assert uuid7() > first
+
+
+@pytest.fixture
+def ids_table():
+    engine = create_engine("sqlite://")
+    table = Table("items", MetaData(), Column("id", BinaryUUID, primary_key=True))
+    table.metadata.create_all(engine)
+    with engine.connect() as conn:
+        yield conn, table
+    engine.dispose()
+
+
+def test_binary_uuid_round_trip(ids_table):
+    conn, table = ids_table
+    value = uuid7()
+
+    conn.execute(insert(table).values(id=value))
+
+    stored = conn.execute(select(table.c.id)).scalar_one()
+    assert stored == value
+    raw = conn.exec_driver_sql("SELECT id FROM items").scalar_one()
+    assert raw == uuid.UUID(value).bytes
+
+
+@pytest.mark.parametrize("form", [str.upper, uuid.UUID, lambda v: uuid.UUID(v).bytes])
+def test_binary_uuid_binds_equivalent_forms(ids_table, form):
+    conn, table = ids_table
+    value = uuid7()
+    conn.execute(insert(table).values(id=value))
+
+    found = conn.execute(select(table.c.id).where(table.c.id == form(value))).scalar_one_or_none()
+
+    assert found == value
+
+
+@pytest.mark.parametrize("malformed", ["not-a-uuid", "u1", b"short"])
+def test_binary_uuid_rejects_malformed_ids(ids_table, malformed):
+    conn, table = ids_table
+
+    with pytest.raises(StatementError) as exc_info:
+        conn.execute(select(table.c.id).where(table.c.id == malformed))
+
+    assert isinstance(exc_info.value.orig, ValueError)
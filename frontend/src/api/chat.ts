@@ -1,5 +1,5 @@
 import api from './index';
-import type { ConversationListItem, ConversationWithMessages, Conversation } from '../types/chat';
+import type { ConversationListItem, ConversationWithMessages, Conversation, MessageChart } from '../types/chat';
 
 export const chatApi = {
   getConversations: async (): Promise<ConversationListItem[]> => {
@@ -7,8 +7,17 @@ export const chatApi = {
     return response.data;
   },
 
-  getConversation: async (id: string): Promise<ConversationWithMessages> => {
-    const response = await api.get<ConversationWithMessages>(`/conversations/${id}`);
+  getConversation: async (id: string, before?: string): Promise<ConversationWithMessages> => {
+    const response = await api.get<ConversationWithMessages>(`/conversations/${id}`, {
+      params: before ? { before } : undefined,
+    });
+    return response.data;
+  },
+
+  getMessageChart: async (conversationId: string, messageId: string): Promise<MessageChart> => {
+    const response = await api.get<MessageChart>(
+      `/conversations/${conversationId}/messages/${messageId}/chart`
+    );
     return response.data;
   },
 
@@ -25,4 +34,8 @@ export const chatApi = {
   deleteConversation: async (id: string): Promise<void> => {
     await api.delete(`/conversations/${id}`);
   },
+
+  cancelStream: async (streamId: string): Promise<void> => {
+    await api.delete(`/chat/stream/${streamId}`);
+  },
 };
@@ -13,6 +13,8 @@ export const ChatContainer: React.FC = () => {
   const [messages, setMessages] = useState<Message[]>([]);
   const [isLoadingConversations, setIsLoadingConversations] = useState(true);
   const [isLoadingMessages, setIsLoadingMessages] = useState(false);
+  const [olderCursor, setOlderCursor] = useState<string | null>(null);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
   const [isDeletingId, setIsDeletingId] = useState<string | null>(null);
   const [isSidebarOpen, setIsSidebarOpen] = useState(true);
 
@@ -20,6 +22,7 @@ export const ChatContainer: React.FC = () => {
     streamingContent,
     chartData,
     isStreaming,
+    queueStatus,
     startStream,
     stopStream,
     resetStream,
@@ -57,14 +60,32 @@ export const ChatContainer: React.FC = () => {
     try {
       const data = await chatApi.getConversation(conversationId);
       setMessages(data.messages);
+      setOlderCursor(data.has_more ? data.next_cursor ?? null : null);
     } catch (error) {
       console.error('Failed to load messages:', error);
       setMessages([]);
+      setOlderCursor(null);
     } finally {
       setIsLoadingMessages(false);
     }
   }, []);
 
+  // Load the previous page of messages
+  const loadOlderMessages = useCallback(async () => {
+    if (!currentConversationId || !olderCursor) return;
+
+    setIsLoadingOlder(true);
+    try {
+      const data = await chatApi.getConversation(currentConversationId, olderCursor);
+      setMessages((prev) => [...data.messages, ...prev]);
+      setOlderCursor(data.has_more ? data.next_cursor ?? null : null);
+    } catch (error) {
+      console.error('Failed to load older messages:', error);
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  }, [currentConversationId, olderCursor]);
+
   // Initial load
   useEffect(() => {
     loadConversations();
@@ -76,6 +97,7 @@ export const ChatContainer: React.FC = () => {
       loadMessages(currentConversationId);
     } else {
       setMessages([]);
+      setOlderCursor(null);
     }
   }, [currentConversationId, loadMessages]);
 
@@ -169,6 +191,10 @@ export const ChatContainer: React.FC = () => {
             streamingContent={streamingContent}
             streamingChartData={chartData as ChartData | null}
             isStreaming={isStreaming}
+            queueStatus={queueStatus}
+            hasOlder={olderCursor !== null}
+            isLoadingOlder={isLoadingOlder}
+            onLoadOlder={loadOlderMessages}
           />
         </div>
       </div>
@@ -193,6 +219,9 @@ export const ChatContainer: React.FC = () => {
             onStop={stopStream}
             disabled={isLoadingMessages}
             isStreaming={isStreaming}
+            hasOlder={olderCursor !== null}
+            isLoadingOlder={isLoadingOlder}
+            onLoadOlder={loadOlderMessages}
           />
         </div>
       </div>
@@ -1,8 +1,9 @@
-import { memo } from 'react';
+import { memo, useEffect, useState } from 'react';
 import ReactMarkdown from 'react-markdown';
 import { User, Bot } from 'lucide-react';
 import type { Message, ChartData } from '../../types/chat';
 import { ChartRenderer } from '../chart/ChartRenderer';
+import { chatApi } from '../../api/chat';
 
 interface MessageBubbleProps {
   content: string;
@@ -93,11 +94,29 @@ interface MessageItemProps {
 }
 
 export const MessageItem = memo<MessageItemProps>(function MessageItem({ message }) {
+  const [chartData, setChartData] = useState<ChartData | null>(message.chart_data ?? null);
+
+  // Conversation pages omit chart_data; fetch it only for messages that have one
+  useEffect(() => {
+    if (!message.has_chart || message.chart_data) return;
+
+    let cancelled = false;
+    chatApi
+      .getMessageChart(message.conversation_id, message.id)
+      .then((data) => {
+        if (!cancelled) setChartData(data.chart_data);
+      })
+      .catch((error) => console.error('Failed to load chart:', error));
+    return () => {
+      cancelled = true;
+    };
+  }, [message.conversation_id, message.id, message.has_chart, message.chart_data]);
+
   return (
     <MessageBubble
       content={message.content}
       isUser={message.role === 'user'}
-      chartData={message.chart_data}
+      chartData={chartData}
       timestamp={message.created_at}
     />
   );
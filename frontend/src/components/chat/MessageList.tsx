@@ -1,5 +1,5 @@
 import { useRef, useEffect, memo } from 'react';
-import type { Message, ChartData } from '../../types/chat';
+import type { Message, ChartData, QueueStatus } from '../../types/chat';
 import { MessageItem, StreamingMessage } from './MessageItem';
 import { TypingIndicator } from '../common/Loading';
 
@@ -8,6 +8,10 @@ interface MessageListProps {
   streamingContent?: string;
   streamingChartData?: ChartData | null;
   isStreaming?: boolean;
+  queueStatus?: QueueStatus | null;
+  hasOlder?: boolean;
+  isLoadingOlder?: boolean;
+  onLoadOlder?: () => void;
 }
 
 export const MessageList = memo<MessageListProps>(function MessageList({
@@ -15,14 +19,19 @@ export const MessageList = memo<MessageListProps>(function MessageList({
   streamingContent = '',
   streamingChartData = null,
   isStreaming = false,
+  queueStatus = null,
+  hasOlder = false,
+  isLoadingOlder = false,
+  onLoadOlder,
 }) {
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const hasContent = messages.length > 0 || isStreaming;
+  const lastMessageId = messages[messages.length - 1]?.id;
 
-  // Auto scroll to bottom
+  // Auto scroll to bottom for new messages, not when older ones are prepended
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [messages, streamingContent]);
+  }, [lastMessageId, streamingContent]);
 
   return (
     <div className={`flex-1 min-h-0 p-4 space-y-6 bg-gray-50 dark:bg-gray-900 transition-colors ${hasContent ? 'overflow-y-auto' : 'overflow-hidden'}`}>
@@ -42,6 +51,18 @@ export const MessageList = memo<MessageListProps>(function MessageList({
         </div>
       )}
 
+      {hasOlder && onLoadOlder && (
+        <div className="flex justify-center">
+          <button
+            onClick={onLoadOlder}
+            disabled={isLoadingOlder}
+            className="px-3 py-1 text-sm text-gray-600 dark:text-gray-300 rounded-lg hover:bg-gray-100 dark:hover:bg-gray-800 disabled:opacity-50 transition-colors"
+          >
+            {isLoadingOlder ? '불러오는 중...' : '이전 메시지 불러오기'}
+          </button>
+        </div>
+      )}
+
       {messages.map((message) => (
         <MessageItem key={message.id} message={message} />
       ))}
@@ -62,6 +83,11 @@ export const MessageList = memo<MessageListProps>(function MessageList({
           <div className="bg-white dark:bg-gray-800 border border-gray-200 dark:border-gray-700 rounded-2xl rounded-bl-md">
             <TypingIndicator />
           </div>
+          {queueStatus && (
+            <span className="text-sm text-gray-500 dark:text-gray-400">
+              대기 중 · {queueStatus.position}번째 (약 {queueStatus.estimatedWaitSeconds}초)
+            </span>
+          )}
         </div>
       )}
 
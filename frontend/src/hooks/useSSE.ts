@@ -1,6 +1,7 @@
 import { useState, useCallback, useRef, useEffect } from 'react';
-import type { StreamChunk, ChartData } from '../types/chat';
+import type { StreamChunk, ChartData, QueueStatus } from '../types/chat';
 import { getAccessToken } from '../utils/token';
+import { chatApi } from '../api/chat';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || '/api/v1';
 
@@ -15,8 +16,10 @@ export const useSSE = (options: UseSSEOptions = {}) => {
   const [streamingContent, setStreamingContent] = useState('');
   const [chartData, setChartData] = useState<ChartData | null>(null);
   const [isStreaming, setIsStreaming] = useState(false);
+  const [queueStatus, setQueueStatus] = useState<QueueStatus | null>(null);
   const [conversationId, setConversationId] = useState<string | null>(null);
   const eventSourceRef = useRef<EventSource | null>(null);
+  const streamIdRef = useRef<string | null>(null);
 
   // Store options in ref to avoid dependency issues
   const optionsRef = useRef(options);
@@ -33,6 +36,7 @@ export const useSSE = (options: UseSSEOptions = {}) => {
     // Reset state
     setStreamingContent('');
     setChartData(null);
+    setQueueStatus(null);
     setIsStreaming(true);
 
     const token = getAccessToken();
@@ -42,10 +46,15 @@ export const useSSE = (options: UseSSEOptions = {}) => {
       return;
     }
 
+    // The stream id lets a reconnect resume the same generation via Last-Event-ID
+    const streamId = crypto.randomUUID();
+    streamIdRef.current = streamId;
+
     // Build URL with query parameters
     const params = new URLSearchParams({
       message,
       token,
+      stream_id: streamId,
     });
     if (existingConversationId) {
       params.append('conversation_id', existingConversationId);
@@ -59,7 +68,19 @@ export const useSSE = (options: UseSSEOptions = {}) => {
       try {
         const chunk: StreamChunk = JSON.parse(event.data);
 
+        // Any event other than a queue update means generation has started or ended
+        if (chunk.type !== 'queued') {
+          setQueueStatus(null);
+        }
+
         switch (chunk.type) {
+          case 'queued':
+            setQueueStatus({
+              position: chunk.position ?? 0,
+              estimatedWaitSeconds: chunk.estimatedWaitSeconds ?? 0,
+            });
+            break;
+
           case 'content':
             if (chunk.content) {
               setStreamingContent(prev => prev + chunk.content);
@@ -74,18 +95,28 @@ export const useSSE = (options: UseSSEOptions = {}) => {
             }
             break;
 
+          case 'snapshot':
+            // Sent on resume when missed events were evicted: the answer so far
+            setStreamingContent(chunk.content || '');
+            if (chunk.chartData) {
+              setChartData(chunk.chartData);
+            }
+            break;
+
           case 'done':
             if (chunk.conversationId) {
               setConversationId(chunk.conversationId);
               optionsRef.current.onDone?.(chunk.conversationId);
             }
             eventSource.close();
+            streamIdRef.current = null;
             setIsStreaming(false);
             break;
 
           case 'error':
             optionsRef.current.onError?.(chunk.error || 'Unknown error');
             eventSource.close();
+            streamIdRef.current = null;
             setIsStreaming(false);
             break;
         }
@@ -95,7 +126,12 @@ export const useSSE = (options: UseSSEOptions = {}) => {
     };
 
     eventSource.onerror = () => {
-      eventSource.close();
+      // While CONNECTING the browser retries and resumes after the last event id
+      if (eventSource.readyState !== EventSource.CLOSED) {
+        return;
+      }
+      streamIdRef.current = null;
+      setQueueStatus(null);
       setIsStreaming(false);
       optionsRef.current.onError?.('Connection lost');
     };
@@ -106,6 +142,12 @@ export const useSSE = (options: UseSSEOptions = {}) => {
       eventSourceRef.current.close();
       eventSourceRef.current = null;
     }
+    // Generation runs detached on the server, so stop it explicitly
+    if (streamIdRef.current) {
+      chatApi.cancelStream(streamIdRef.current).catch(() => undefined);
+      streamIdRef.current = null;
+    }
+    setQueueStatus(null);
     setIsStreaming(false);
   }, []);
 
@@ -119,6 +161,7 @@ export const useSSE = (options: UseSSEOptions = {}) => {
     streamingContent,
     chartData,
     isStreaming,
+    queueStatus,
     conversationId,
     startStream,
     stopStream,
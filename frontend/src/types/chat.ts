@@ -4,6 +4,7 @@ export interface Message {
   role: 'user' | 'assistant' | 'system';
   content: string;
   chart_data?: ChartData | null;
+  has_chart?: boolean;
   created_at: string;
 }
 
@@ -24,6 +25,13 @@ export interface ConversationListItem {
 
 export interface ConversationWithMessages extends Conversation {
   messages: Message[];
+  has_more: boolean;
+  next_cursor?: string | null;
+}
+
+export interface MessageChart {
+  message_id: string;
+  chart_data: ChartData | null;
 }
 
 export interface ChartData {
@@ -33,13 +41,20 @@ export interface ChartData {
 }
 
 export interface StreamChunk {
-  type: 'content' | 'chart' | 'done' | 'error';
+  type: 'content' | 'chart' | 'snapshot' | 'queued' | 'done' | 'error';
   content?: string;
+  position?: number;
+  estimatedWaitSeconds?: number;
   chartData?: ChartData;
   conversationId?: string;
   error?: string;
 }
 
+export interface QueueStatus {
+  position: number;
+  estimatedWaitSeconds: number;
+}
+
 export interface ChatState {
   conversations: ConversationListItem[];
   currentConversation: ConversationWithMessages | null;
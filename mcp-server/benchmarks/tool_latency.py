@@ -0,0 +1,291 @@
+"""
+MCP tool latency benchmark.
+
+Loads sensor_readings to a configurable size and drives every tool endpoint
+in src.server at a fixed concurrency, reporting latency percentiles,
+throughput, rows scanned (from EXPLAIN ANALYZE) and response bytes.
+
+Usage:
+    python -m benchmarks.tool_latency --load --rows 1000000
+    python -m benchmarks.tool_latency --rows 1000000 --concurrency 16 --requests 500 \
+        --output bench-results/1m.json
+
+Results are written as JSON so runs can be compared across commits.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from src.db.postgres_client import db
+from src.server import app
+
+
+# Sensor base values, matching scripts/init_sensor_db.sql
+SENSORS = [
+    ("temperature", 350, "°C"),
+    ("pressure", 500, "mTorr"),
+    ("vacuum", 50, "Pa"),
+    ("gas_flow", 200, "sccm"),
+    ("rf_power", 2000, "W"),
+]
+
+# Request payload per tool endpoint
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "get_sensor_data": {"sensor_type": "temperature", "equipment_id": "EQP-CVD-001", "limit": 100},
+    "get_sensor_statistics": {"sensor_type": "pressure", "equipment_id": "EQP-ETCH-001", "period_hours": 24},
+    "generate_sensor_chart": {"sensor_type": "temperature", "equipment_id": "CVD Chamber 1"},
+    "generate_multi_sensor_chart": {
+        "sensor_types": ["temperature", "pressure", "rf_power"],
+        "equipment_id": "EQP-CVD-001",
+    },
+    "list_equipment": {},
+}
+
+SCAN_NODES = {"Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+
+LOAD_BATCH_POINTS = 20_000
+
+
+async def load_readings(rows: int, interval_seconds: int) -> None:
+    """Replace sensor_readings with `rows` synthetic readings ending now."""
+    equipment = await db.fetch("SELECT id FROM equipment ORDER BY id")
+    if not equipment:
+        raise RuntimeError("equipment table is empty; run scripts/init_sensor_db.sql first")
+
+    series_count = len(equipment) * len(SENSORS)
+    points_per_series = max(rows // series_count, 1)
+
+    await db.execute("TRUNCATE sensor_readings")
+
+    query = """
+        INSERT INTO sensor_readings (sensor_type, value, unit, equipment_id, timestamp)
+        SELECT s.sensor_type,
+               s.base_value + (random() * 20 - 10),
+               s.unit,
+               e.id,
+               NOW() - (g * make_interval(secs => $3))
+        FROM equipment e
+        CROSS JOIN unnest($4::text[], $5::float8[], $6::text[]) AS s(sensor_type, base_value, unit)
+        CROSS JOIN generate_series($1::int, $2::int) AS g
+    """
+    names = [s[0] for s in SENSORS]
+    bases = [float(s[1]) for s in SENSORS]
+    units = [s[2] for s in SENSORS]
+
+    started = time.perf_counter()
+    for offset in range(0, points_per_series, LOAD_BATCH_POINTS):
+        last = min(offset + LOAD_BATCH_POINTS, points_per_series) - 1
+        await db.execute(query, offset, last, float(interval_seconds), names, bases, units)
+        print(f"  loaded {(last + 1) * series_count:,} / {points_per_series * series_count:,} rows")
+
+    await db.execute("ANALYZE sensor_readings")
+    print(f"Loaded {points_per_series * series_count:,} rows in {time.perf_counter() - started:.1f}s")
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+@contextmanager
+def capture_queries(captured: List[Tuple[str, tuple]]):
+    """Record every query the tools issue through the shared db client."""
+    originals = {name: getattr(db, name) for name in ("fetch", "fetchrow", "fetch_series")}
+
+    def recorder(original):
+        async def wrapper(query, *args):
+            captured.append((query, args))
+            return await original(query, *args)
+        return wrapper
+
+    for name, original in originals.items():
+        setattr(db, name, recorder(original))
+    try:
+        yield
+    finally:
+        for name in originals:
+            delattr(db, name)
+
+
+def _rows_scanned(plan: Dict[str, Any]) -> int:
+    """Sum rows read by scan nodes in an EXPLAIN (ANALYZE, FORMAT JSON) plan."""
+    total = 0
+    if plan.get("Node Type") in SCAN_NODES:
+        loops = plan.get("Actual Loops", 1)
+        total += (plan.get("Actual Rows", 0) + plan.get("Rows Removed by Filter", 0)) * loops
+    for child in plan.get("Plans", []):
+        total += _rows_scanned(child)
+    return total
+
+
+async def explain_rows_scanned(client: httpx.AsyncClient, tool: str, payload: Dict[str, Any]) -> int:
+    """Run the tool once and EXPLAIN ANALYZE every query it issued."""
+    captured: List[Tuple[str, tuple]] = []
+    with capture_queries(captured):
+        response = await client.post(f"/tools/{tool}", json=payload)
+        response.raise_for_status()
+
+    total = 0
+    for query, args in captured:
+        row = await db.fetchrow(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}", *args)
+        plan = row[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        total += _rows_scanned(plan[0]["Plan"])
+    return total
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    tool: str,
+    payload: Dict[str, Any],
+    concurrency: int,
+    requests: int,
+    explain: bool = True,
+) -> Dict[str, Any]:
+    """Drive one tool endpoint at fixed concurrency."""
+    latencies: List[float] = []
+    response_bytes: List[int] = []
+    errors = 0
+    remaining = requests
+    lock = asyncio.Lock()
+
+    async def worker():
+        nonlocal remaining, errors
+        while True:
+            async with lock:
+                if remaining <= 0:
+                    return
+                remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await client.post(f"/tools/{tool}", json=payload)
+                elapsed = time.perf_counter() - started
+                if response.status_code != 200:
+                    errors += 1
+                    continue
+                latencies.append(elapsed * 1000)
+                response_bytes.append(len(response.content))
+            except httpx.HTTPError:
+                errors += 1
+
+    # Warm up the pool and plan cache before measuring
+    await client.post(f"/tools/{tool}", json=payload)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall_time = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "concurrency": concurrency,
+        "wall_time_s": round(wall_time, 3),
+        "throughput_rps": round(len(latencies) / wall_time, 2) if wall_time else None,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "mean": sum(latencies) / len(latencies) if latencies else None,
+            "max": latencies[-1] if latencies else None,
+        },
+        "response_bytes": {
+            "mean": sum(response_bytes) / len(response_bytes) if response_bytes else None,
+            "max": max(response_bytes) if response_bytes else None,
+        },
+        "rows_scanned": await explain_rows_scanned(client, tool, payload) if explain else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.load:
+        await load_readings(args.rows, args.interval_seconds)
+
+    row = await db.fetchrow("SELECT COUNT(*) AS count FROM sensor_readings")
+    actual_rows = row["count"]
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+    else:
+        # Drive the FastAPI app in-process so no server needs to be running
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://mcp-bench",
+            timeout=args.timeout,
+        )
+
+    tools = args.tools or list(SCENARIOS)
+    results: Dict[str, Any] = {}
+    async with client:
+        for tool in tools:
+            print(f"Running {tool} (concurrency={args.concurrency}, requests={args.requests})...")
+            results[tool] = await run_scenario(
+                client, tool, SCENARIOS[tool], args.concurrency, args.requests,
+                # Queries can only be captured when the app runs in-process
+                explain=not args.base_url,
+            )
+            latency = results[tool]["latency_ms"]
+            print(
+                f"  p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms "
+                f"rps={results[tool]['throughput_rps']} errors={results[tool]['errors']}"
+            )
+
+    await db.close()
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "dataset": {"requested_rows": args.rows, "actual_rows": actual_rows},
+        "results": results,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="MCP tool latency benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="dataset size (e.g. 1000000, 10000000, 100000000)")
+    parser.add_argument("--load", action="store_true", help="truncate and reload sensor_readings before running")
+    parser.add_argument("--interval-seconds", type=int, default=10, help="spacing between synthetic readings")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="requests per tool")
+    parser.add_argument("--tools", nargs="*", choices=list(SCENARIOS), help="subset of tools to run")
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="path of the JSON result file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(main(args))
+
+    output = args.output or os.path.join(
+        "bench-results", f"tool_latency_{args.rows}_{int(time.time())}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Results written to {output}")
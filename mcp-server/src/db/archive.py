@@ -0,0 +1,215 @@
+"""
+Archive closed months of sensor_readings to the Parquet cold tier.
+
+Months that end before the hot retention window are exported to
+COLD_STORAGE_DIR sorted by (equipment_id, sensor_type, timestamp), recorded
+in the manifest and then deleted from Postgres in the same snapshot.
+Readings written later into an archived month are archived as an extra
+file of that month on the next run.
+
+Usage:
+    python -m src.db.archive                  # archive everything past HOT_RETENTION_DAYS
+    python -m src.db.archive --retention-days 30 --keep-hot
+"""
+import argparse
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import asyncpg
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.db.postgres_client import db
+from src.db.cold_storage import cold_storage, READINGS_SCHEMA, to_utc
+
+FETCH_BATCH_SIZE = 100_000
+ROW_GROUP_SIZE = 128 * 1024
+
+
+def month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(dt: datetime) -> datetime:
+    return month_start(month_start(dt) + timedelta(days=32))
+
+
+async def export_range(
+    conn: asyncpg.Connection,
+    start_dt: datetime,
+    end_dt: datetime,
+    path: str,
+    skip_ids: Optional[pa.Array] = None
+) -> Tuple[int, int]:
+    """
+    Stream readings in [start, end) to a Parquet file on `conn`'s transaction.
+
+    Readings whose id is in `skip_ids` are already archived and are not
+    written again. Returns (rows written, rows read).
+    """
+    query = """
+        SELECT equipment_id, sensor_type, timestamp, value, unit, id::text AS id
+        FROM sensor_readings
+        WHERE timestamp >= $1 AND timestamp < $2
+        ORDER BY equipment_id, sensor_type, timestamp
+    """
+    tmp_path = f"{path}.tmp"
+    written = read = 0
+    cursor = await conn.cursor(query, start_dt, end_dt)
+    with pq.ParquetWriter(tmp_path, READINGS_SCHEMA, compression="zstd") as writer:
+        while True:
+            records = await cursor.fetch(FETCH_BATCH_SIZE)
+            if not records:
+                break
+            batch = pa.table(
+                {name: [r[name] for r in records] for name in READINGS_SCHEMA.names},
+                schema=READINGS_SCHEMA,
+            )
+            if skip_ids is not None and len(skip_ids):
+                batch = batch.filter(pc.invert(pc.is_in(batch.column("id"), value_set=skip_ids)))
+            if batch.num_rows:
+                writer.write_table(batch, row_group_size=ROW_GROUP_SIZE)
+            written += batch.num_rows
+            read += len(records)
+
+    if written:
+        os.replace(tmp_path, path)
+    else:
+        os.remove(tmp_path)
+    return written, read
+
+
+def archived_ids(start_dt: datetime, end_dt: datetime) -> pa.Array:
+    """Ids of the readings in [start, end) that are already in Parquet files."""
+    tables = [
+        pq.read_table(path, columns=["id"], filters=[("timestamp", ">=", start_dt), ("timestamp", "<", end_dt)])
+        for path in cold_storage.files_for_range(start_dt, end_dt)
+    ]
+    if not tables:
+        return pa.array([], type=pa.string())
+    return pa.concat_tables(tables).column("id").combine_chunks()
+
+
+async def archive_range(
+    start_dt: datetime,
+    end_dt: datetime,
+    filename: str,
+    manifest: Dict[str, Any],
+    delete: bool,
+    skip_ids: Optional[pa.Array] = None
+) -> int:
+    """
+    Export [start, end) and delete exactly the exported rows from Postgres.
+
+    The export, the manifest update and the delete share one REPEATABLE READ
+    snapshot, so readings written into the range meanwhile are neither
+    deleted nor lost; they stay in Postgres for the next run to sweep up.
+    Returns the number of rows written.
+    """
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read"):
+            written, read = await export_range(
+                conn, start_dt, end_dt, os.path.join(cold_storage.directory, filename), skip_ids
+            )
+            if written:
+                manifest.setdefault("files", []).append({
+                    "path": filename,
+                    "start": start_dt.isoformat(),
+                    "end": end_dt.isoformat(),
+                    "rows": written,
+                })
+
+            # Publish before deleting so readers switch to the cold tier first
+            cold_storage.save_manifest(manifest)
+
+            if delete and read:
+                result = await conn.execute(
+                    "DELETE FROM sensor_readings WHERE timestamp >= $1 AND timestamp < $2",
+                    start_dt, end_dt
+                )
+                deleted = int(result.split()[-1])
+                if deleted != read:
+                    # Rolls back the delete; the exported rows stay in both tiers until the next run
+                    raise RuntimeError(
+                        f"Deleted {deleted} rows from {start_dt:%Y-%m} but exported {read}; aborting"
+                    )
+    return written
+
+
+async def sweep_late_rows(manifest: Dict[str, Any], archived_until: datetime) -> None:
+    """
+    Archive readings left in Postgres for months already in the cold tier.
+
+    These are backfilled or late readings written after their month was
+    exported, and rows kept by --keep-hot or an interrupted run. Rows whose
+    id is already archived are only deleted.
+    """
+    months = await db.fetch(
+        """
+        SELECT DISTINCT date_trunc('month', timestamp, 'UTC') AS month
+        FROM sensor_readings
+        WHERE timestamp < $1
+        ORDER BY month
+        """,
+        archived_until
+    )
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    for record in months:
+        start = month_start(to_utc(record["month"]))
+        end = next_month(start)
+        skip_ids = await asyncio.to_thread(archived_ids, start, end)
+        rows = await archive_range(
+            start, end, f"sensor_readings_{start:%Y-%m}_{stamp}.parquet", manifest,
+            delete=True, skip_ids=skip_ids
+        )
+        print(f"Swept {start:%Y-%m}: {rows:,} late rows archived")
+
+
+async def archive(retention_days: int, keep_hot: bool = False) -> None:
+    cutoff = month_start(datetime.now(timezone.utc) - timedelta(days=retention_days))
+    manifest = cold_storage.load_manifest()
+    archived_until: Optional[datetime] = cold_storage.archived_until
+
+    os.makedirs(cold_storage.directory, exist_ok=True)
+
+    if archived_until is None:
+        row = await db.fetchrow("SELECT MIN(timestamp) AS oldest FROM sensor_readings")
+        if not row or row["oldest"] is None:
+            print("sensor_readings is empty; nothing to archive")
+            return
+        archived_until = month_start(to_utc(row["oldest"]))
+    elif not keep_hot:
+        await sweep_late_rows(manifest, archived_until)
+
+    current = archived_until
+    while current < cutoff:
+        end = next_month(current)
+        manifest["archived_until"] = end.isoformat()
+        rows = await archive_range(
+            current, end, f"sensor_readings_{current:%Y-%m}.parquet", manifest, delete=not keep_hot
+        )
+        print(f"Archived {current:%Y-%m}: {rows:,} rows")
+        current = end
+
+    await db.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Archive old sensor readings to Parquet")
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=cold_storage.hot_retention_days,
+        help="keep at least this many days in Postgres",
+    )
+    parser.add_argument("--keep-hot", action="store_true", help="do not delete archived rows from Postgres")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(archive(args.retention_days, args.keep_hot))
@@ -0,0 +1,199 @@
+import json
+import os
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# Parquet schema for archived sensor_readings, sorted by (equipment, sensor, timestamp)
+READINGS_SCHEMA = pa.schema([
+    ("equipment_id", pa.string()),
+    ("sensor_type", pa.string()),
+    ("timestamp", pa.timestamp("us", tz="UTC")),
+    ("value", pa.float64()),
+    ("unit", pa.string()),
+    ("id", pa.string()),
+])
+
+MANIFEST_NAME = "manifest.json"
+
+
+def to_utc(dt: datetime) -> datetime:
+    """Normalize a datetime to aware UTC (naive values are treated as UTC)."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+class ColdStorage:
+    """Parquet cold tier for sensor readings older than the hot retention window."""
+
+    def __init__(self):
+        self.directory = os.getenv("COLD_STORAGE_DIR", "./cold_data")
+        self.hot_retention_days = int(os.getenv("HOT_RETENTION_DAYS", 90))
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._manifest_mtime: Optional[float] = None
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """Load the manifest, re-reading it only when the archive job has rewritten it."""
+        try:
+            mtime = os.path.getmtime(self.manifest_path)
+        except OSError:
+            return {"archived_until": None, "files": []}
+
+        if self._manifest is None or mtime != self._manifest_mtime:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self._manifest = json.load(f)
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def save_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Atomically replace the manifest."""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    @property
+    def archived_until(self) -> Optional[datetime]:
+        """Readings strictly before this instant live in Parquet, not Postgres."""
+        value = self.load_manifest().get("archived_until")
+        return datetime.fromisoformat(value) if value else None
+
+    def split_range(
+        self,
+        start_dt: datetime,
+        end_dt: datetime
+    ) -> Tuple[Optional[Tuple[datetime, datetime]], Optional[Tuple[datetime, datetime]]]:
+        """
+        Split [start, end] into a cold range and a hot range.
+
+        Returns (cold_range, hot_range); either may be None.
+        """
+        start_dt, end_dt = to_utc(start_dt), to_utc(end_dt)
+        boundary = self.archived_until
+        if boundary is None or start_dt >= boundary:
+            return None, (start_dt, end_dt)
+        if end_dt < boundary:
+            return (start_dt, end_dt), None
+        return (start_dt, boundary), (boundary, end_dt)
+
+    def files_for_range(self, start_dt: datetime, end_dt: datetime) -> List[str]:
+        """Prune archive files by their recorded time range."""
+        paths = []
+        for entry in self.load_manifest().get("files", []):
+            file_start = datetime.fromisoformat(entry["start"])
+            file_end = datetime.fromisoformat(entry["end"])
+            if file_start <= end_dt and file_end > start_dt:
+                paths.append(os.path.join(self.directory, entry["path"]))
+        return paths
+
+    def _read(
+        self,
+        columns: List[str],
+        sensor_type: str,
+        start_dt: datetime,
+        end_dt: datetime,
+        equipment_id: Optional[str] = None
+    ) -> pa.Table:
+        """Read matching rows with column projection and row-group pruning."""
+        filters = [
+            ("sensor_type", "=", sensor_type),
+            ("timestamp", ">=", start_dt),
+            ("timestamp", "<", end_dt),
+        ]
+        if equipment_id:
+            filters.append(("equipment_id", "=", equipment_id))
+
+        tables = [
+            pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+            for path in self.files_for_range(start_dt, end_dt)
+        ]
+        if not tables:
+            return READINGS_SCHEMA.empty_table().select(columns)
+        return pa.concat_tables(tables)
+
+    def read_series(
+        self,
+        sensor_type: str,
+        start_dt: datetime,
+        end_dt: datetime,
+        equipment_id: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Read a time series as (epoch ms, value) arrays in time order."""
+        table = self._read(["timestamp", "value"], sensor_type, start_dt, end_dt, equipment_id)
+        if equipment_id is None:
+            # Files are sorted per equipment, so interleave all equipment by time
+            table = table.sort_by("timestamp")
+
+        timestamps = table.column("timestamp").cast(pa.int64()).to_numpy() // 1000
+        values = table.column("value").to_numpy()
+        return timestamps.astype(np.int64), values.astype(np.float64)
+
+    def read_latest(
+        self,
+        sensor_type: str,
+        start_dt: datetime,
+        end_dt: datetime,
+        limit: int,
+        equipment_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Read the newest `limit` readings in the range, newest first."""
+        table = self._read(
+            ["id", "value", "unit", "equipment_id", "timestamp"],
+            sensor_type, start_dt, end_dt, equipment_id
+        )
+        table = table.sort_by([("timestamp", "descending")]).slice(0, limit)
+        return table.to_pylist()
+
+    def read_unit(self, sensor_type: str, equipment_id: Optional[str] = None) -> Optional[str]:
+        """Unit of the newest archived readings of a sensor type."""
+        filters = [("sensor_type", "=", sensor_type)]
+        if equipment_id:
+            filters.append(("equipment_id", "=", equipment_id))
+
+        entries = sorted(self.load_manifest().get("files", []), key=lambda e: e["end"], reverse=True)
+        for entry in entries:
+            path = os.path.join(self.directory, entry["path"])
+            table = pq.read_table(path, columns=["unit"], filters=filters, memory_map=True)
+            if table.num_rows:
+                return table.column("unit")[table.num_rows - 1].as_py()
+        return None
+
+    def read_aggregates(
+        self,
+        sensor_type: str,
+        start_dt: datetime,
+        end_dt: datetime,
+        equipment_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Partial aggregates (count, sum, sum of squares, min, max) for merging with hot data."""
+        table = self._read(["value", "unit"], sensor_type, start_dt, end_dt, equipment_id)
+        values = table.column("value").to_numpy()
+        if not len(values):
+            return {"count": 0, "sum": 0.0, "sum_sq": 0.0, "min": None, "max": None, "unit": None}
+        units = pc.unique(table.column("unit")).to_pylist()
+        return {
+            "count": int(len(values)),
+            "sum": float(values.sum()),
+            "sum_sq": float(np.square(values).sum()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "unit": max(units) if units else None,
+        }
+
+
+# Singleton instance
+cold_storage = ColdStorage()
@@ -1,11 +1,57 @@
 import asyncpg
-from typing import Optional, List, Any
+import numpy as np
+from typing import Optional, List, Any, Tuple
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+# Binary COPY layout: 11-byte signature, int32 flags, int32 header extension length
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+COPY_HEADER_SIZE = 19
+COPY_TRAILER_SIZE = 2
+
+# One (timestamptz, float8) tuple: int16 field count, then int32 length + 8 bytes per field
+SERIES_ROW_DTYPE = np.dtype([
+    ("field_count", ">i2"),
+    ("ts_len", ">i4"),
+    ("ts", ">i8"),
+    ("value_len", ">i4"),
+    ("value", ">f8"),
+])
+
+# Postgres stores timestamps as microseconds since 2000-01-01 UTC
+PG_EPOCH_OFFSET_US = 946_684_800_000_000
+
+
+def parse_series_copy(buffer: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse a binary COPY of (timestamptz, float8) rows into NumPy arrays.
+
+    Returns int64 epoch milliseconds and float64 values.
+    """
+    if not buffer.startswith(COPY_SIGNATURE):
+        raise ValueError("Invalid binary COPY signature")
+
+    extension_length = int.from_bytes(buffer[15:19], "big")
+    body = memoryview(buffer)[COPY_HEADER_SIZE + extension_length:len(buffer) - COPY_TRAILER_SIZE]
+    if len(body) % SERIES_ROW_DTYPE.itemsize:
+        raise ValueError("Unexpected row layout in binary COPY (NULL values or wrong columns)")
+
+    rows = np.frombuffer(body, dtype=SERIES_ROW_DTYPE)
+    if len(rows) and not (
+        (rows["field_count"] == 2).all()
+        and (rows["ts_len"] == 8).all()
+        and (rows["value_len"] == 8).all()
+    ):
+        raise ValueError("Unexpected row layout in binary COPY (NULL values or wrong columns)")
+
+    timestamps = (rows["ts"].astype(np.int64) + PG_EPOCH_OFFSET_US) // 1000
+    values = rows["value"].astype(np.float64)
+    return timestamps, values
+
+
 class PostgresClient:
     """PostgreSQL async client for sensor data."""
 
@@ -49,6 +95,23 @@ class PostgresClient:
         async with pool.acquire() as conn:
             return await conn.execute(query, *args)
 
+    async def fetch_series(self, query: str, *args) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stream a (timestamp, value) query via binary COPY into NumPy arrays.
+
+        The query must select exactly a non-null timestamptz column followed
+        by a non-null double precision column.
+        """
+        chunks: List[bytes] = []
+
+        async def sink(data: bytes) -> None:
+            chunks.append(data)
+
+        pool = await self.get_pool()
+        async with pool.acquire() as conn:
+            await conn.copy_from_query(query, *args, output=sink, format="binary")
+        return parse_series_copy(b"".join(chunks))
+
     async def close(self):
         """Close the connection pool."""
         if self._pool:
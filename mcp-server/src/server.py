@@ -3,15 +3,18 @@ MCP Server for Semiconductor Infra AI Agent.
 
 Provides tools for querying sensor data and generating charts.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional, List, Any, Dict
+import hashlib
+import json
 import uvicorn
 import os
 from dotenv import load_dotenv
 
-from src.tools.sensor_tools import get_sensor_data, get_sensor_statistics, list_equipment
+from src.tools.sensor_tools import get_sensor_data, get_sensor_statistics, list_equipment, get_data_versions
 from src.tools.chart_tools import generate_sensor_chart, generate_multi_sensor_chart
 from src.db.postgres_client import db
 
@@ -170,6 +173,13 @@ TOOLS = [
 ]
 
 
+# Catalog version, served as an ETag so clients can revalidate cheaply
+TOOLS_VERSION = hashlib.sha256(
+    json.dumps(TOOLS, sort_keys=True, ensure_ascii=False).encode("utf-8")
+).hexdigest()[:16]
+TOOLS_ETAG = f'"{TOOLS_VERSION}"'
+
+
 # Request models
 class SensorDataRequest(BaseModel):
     sensor_type: str
@@ -202,6 +212,10 @@ class MultiChartRequest(BaseModel):
     title: Optional[str] = None
 
 
+class DataVersionsRequest(BaseModel):
+    sources: List[str]
+
+
 @app.get("/")
 async def root():
     return {"name": "Semiconductor Infra MCP Server", "version": "1.0.0"}
@@ -213,9 +227,20 @@ async def health():
 
 
 @app.get("/tools")
-async def get_tools():
-    """Return available MCP tools."""
-    return TOOLS
+async def get_tools(request: Request):
+    """Return available MCP tools, or 304 if the client's catalog is current."""
+    if request.headers.get("if-none-match") == TOOLS_ETAG:
+        return Response(status_code=304, headers={"ETag": TOOLS_ETAG})
+    return JSONResponse(content=TOOLS, headers={"ETag": TOOLS_ETAG})
+
+
+@app.post("/data-versions")
+async def data_versions(request: DataVersionsRequest):
+    """Latest change per data source, so clients can invalidate cached answers."""
+    try:
+        return {"versions": await get_data_versions(request.sources)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/tools/get_sensor_data")
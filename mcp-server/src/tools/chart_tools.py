@@ -1,9 +1,14 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from dateutil import parser as date_parser
+import asyncio
+import os
+import numpy as np
 
 from src.db.postgres_client import db
+from src.db.cold_storage import cold_storage
 from src.utils.chart_generator import chart_generator
+from src.utils.series import downsample_minmax, to_chart_data
 from src.tools.sensor_tools import resolve_equipment_id
 
 
@@ -17,6 +22,85 @@ def parse_datetime(dt_str: Optional[str]) -> Optional[datetime]:
         return None
 
 
+# Maximum points per chart series; larger ranges are min/max downsampled
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", 2000))
+
+
+async def fetch_series(
+    sensor_type: str,
+    start_dt: datetime,
+    end_dt: datetime,
+    equipment_id: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fetch a sensor time series as (epoch ms, value) arrays, downsampled for charting."""
+    cold_range, hot_range = cold_storage.split_range(start_dt, end_dt)
+
+    parts = []
+    if cold_range:
+        parts.append(asyncio.to_thread(cold_storage.read_series, sensor_type, *cold_range, equipment_id))
+    if hot_range:
+        parts.append(fetch_hot_series(sensor_type, *hot_range, equipment_id))
+
+    results = await asyncio.gather(*parts)
+    timestamps = np.concatenate([r[0] for r in results])
+    values = np.concatenate([r[1] for r in results])
+
+    return downsample_minmax(timestamps, values, CHART_MAX_POINTS)
+
+
+async def fetch_hot_series(
+    sensor_type: str,
+    start_dt: datetime,
+    end_dt: datetime,
+    equipment_id: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fetch a sensor time series from Postgres as (epoch ms, value) arrays."""
+    if equipment_id:
+        query = """
+            SELECT timestamp, value
+            FROM sensor_readings
+            WHERE sensor_type = $1
+              AND timestamp >= $2
+              AND timestamp <= $3
+              AND equipment_id = $4
+            ORDER BY timestamp ASC
+        """
+        return await db.fetch_series(query, sensor_type, start_dt, end_dt, equipment_id)
+    else:
+        query = """
+            SELECT timestamp, value
+            FROM sensor_readings
+            WHERE sensor_type = $1
+              AND timestamp >= $2
+              AND timestamp <= $3
+            ORDER BY timestamp ASC
+        """
+        return await db.fetch_series(query, sensor_type, start_dt, end_dt)
+
+
+async def fetch_unit(sensor_type: str, equipment_id: Optional[str] = None) -> str:
+    """Look up the unit recorded for a sensor type, from the cold tier if nothing is hot."""
+    if equipment_id:
+        query = """
+            SELECT unit FROM sensor_readings
+            WHERE sensor_type = $1 AND equipment_id = $2
+            LIMIT 1
+        """
+        result = await db.fetchrow(query, sensor_type, equipment_id)
+    else:
+        query = """
+            SELECT unit FROM sensor_readings
+            WHERE sensor_type = $1
+            LIMIT 1
+        """
+        result = await db.fetchrow(query, sensor_type)
+    if result:
+        return result["unit"]
+
+    unit = await asyncio.to_thread(cold_storage.read_unit, sensor_type, equipment_id)
+    return unit or ""
+
+
 # Sensor type Korean names
 SENSOR_NAMES = {
     "temperature": "온도",
@@ -57,30 +141,13 @@ async def generate_sensor_chart(
     end_dt = parse_datetime(end_time) or datetime.utcnow()
 
     # Fetch data
-    if resolved_equipment_id:
-        query = """
-            SELECT value, unit, timestamp
-            FROM sensor_readings
-            WHERE sensor_type = $1
-              AND timestamp >= $2
-              AND timestamp <= $3
-              AND equipment_id = $4
-            ORDER BY timestamp ASC
-        """
-        results = await db.fetch(query, sensor_type, start_dt, end_dt, resolved_equipment_id)
-    else:
-        query = """
-            SELECT value, unit, timestamp
-            FROM sensor_readings
-            WHERE sensor_type = $1
-              AND timestamp >= $2
-              AND timestamp <= $3
-            ORDER BY timestamp ASC
-        """
-        results = await db.fetch(query, sensor_type, start_dt, end_dt)
+    (timestamps, values), unit = await asyncio.gather(
+        fetch_series(sensor_type, start_dt, end_dt, resolved_equipment_id),
+        fetch_unit(sensor_type, resolved_equipment_id),
+    )
 
     # Handle no data case
-    if not results:
+    if not len(values):
         sensor_name = SENSOR_NAMES.get(sensor_type, sensor_type)
         return {
             "type": chart_type,
@@ -93,14 +160,8 @@ async def generate_sensor_chart(
             }
         }
 
-    # Get unit from first result
-    unit = results[0]["unit"] if results else ""
-
     # Format data for chart
-    data = [
-        [r["timestamp"].isoformat(), round(r["value"], 2)]
-        for r in results
-    ]
+    data = to_chart_data(timestamps, values)
 
     # Generate chart title
     sensor_name = SENSOR_NAMES.get(sensor_type, sensor_type)
@@ -152,38 +213,21 @@ async def generate_multi_sensor_chart(
     series = []
     colors = ["#ef4444", "#3b82f6", "#22c55e", "#f59e0b", "#8b5cf6"]
 
-    for idx, sensor_type in enumerate(sensor_types):
-        if resolved_equipment_id:
-            query = """
-                SELECT value, timestamp
-                FROM sensor_readings
-                WHERE sensor_type = $1
-                  AND timestamp >= $2
-                  AND timestamp <= $3
-                  AND equipment_id = $4
-                ORDER BY timestamp ASC
-            """
-            results = await db.fetch(query, sensor_type, start_dt, end_dt, resolved_equipment_id)
-        else:
-            query = """
-                SELECT value, timestamp
-                FROM sensor_readings
-                WHERE sensor_type = $1
-                  AND timestamp >= $2
-                  AND timestamp <= $3
-                ORDER BY timestamp ASC
-            """
-            results = await db.fetch(query, sensor_type, start_dt, end_dt)
-
-        if results:
+    # Fetch all series concurrently
+    all_series = await asyncio.gather(*(
+        fetch_series(sensor_type, start_dt, end_dt, resolved_equipment_id)
+        for sensor_type in sensor_types
+    ))
+
+    for idx, (sensor_type, (timestamps, values)) in enumerate(zip(sensor_types, all_series)):
+        if len(values):
             sensor_name = SENSOR_NAMES.get(sensor_type, sensor_type)
-            data = [[r["timestamp"].isoformat(), round(r["value"], 2)] for r in results]
             color = colors[idx % len(colors)]
 
             series.append({
                 "name": sensor_name,
                 "type": "line",
-                "data": data,
+                "data": to_chart_data(timestamps, values),
                 "smooth": True,
                 "symbol": "none",
                 "lineStyle": {"color": color, "width": 2}
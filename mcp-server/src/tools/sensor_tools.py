@@ -1,8 +1,11 @@
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 from dateutil import parser as date_parser
+import asyncio
+import math
 
 from src.db.postgres_client import db
+from src.db.cold_storage import cold_storage
 
 
 def parse_datetime(dt_str: Optional[str]) -> Optional[datetime]:
@@ -77,8 +80,39 @@ async def get_sensor_data(
     start_dt = parse_datetime(start_time) or (datetime.utcnow() - timedelta(hours=24))
     end_dt = parse_datetime(end_time) or datetime.utcnow()
 
-    # Build query
-    if resolved_equipment_id:
+    cold_range, hot_range = cold_storage.split_range(start_dt, end_dt)
+
+    data = []
+    if hot_range:
+        data = await fetch_hot_readings(sensor_type, *hot_range, limit, resolved_equipment_id)
+
+    # Fill from the cold tier when the range reaches past hot retention
+    if cold_range and len(data) < limit:
+        cold_rows = await asyncio.to_thread(
+            cold_storage.read_latest,
+            sensor_type, *cold_range, limit - len(data), resolved_equipment_id
+        )
+        data.extend(
+            {**r, "timestamp": r["timestamp"].isoformat()}
+            for r in cold_rows
+        )
+
+    return {
+        "sensor_type": sensor_type,
+        "count": len(data),
+        "data": data
+    }
+
+
+async def fetch_hot_readings(
+    sensor_type: str,
+    start_dt: datetime,
+    end_dt: datetime,
+    limit: int,
+    equipment_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Fetch the newest readings in a range from Postgres, newest first."""
+    if equipment_id:
         query = """
             SELECT id, sensor_type, value, unit, equipment_id, timestamp
             FROM sensor_readings
@@ -89,7 +123,7 @@ async def get_sensor_data(
             ORDER BY timestamp DESC
             LIMIT $5
         """
-        results = await db.fetch(query, sensor_type, start_dt, end_dt, resolved_equipment_id, limit)
+        results = await db.fetch(query, sensor_type, start_dt, end_dt, equipment_id, limit)
     else:
         query = """
             SELECT id, sensor_type, value, unit, equipment_id, timestamp
@@ -102,20 +136,16 @@ async def get_sensor_data(
         """
         results = await db.fetch(query, sensor_type, start_dt, end_dt, limit)
 
-    return {
-        "sensor_type": sensor_type,
-        "count": len(results),
-        "data": [
-            {
-                "id": str(r["id"]),
-                "value": r["value"],
-                "unit": r["unit"],
-                "equipment_id": r["equipment_id"],
-                "timestamp": r["timestamp"].isoformat()
-            }
-            for r in results
-        ]
-    }
+    return [
+        {
+            "id": str(r["id"]),
+            "value": r["value"],
+            "unit": r["unit"],
+            "equipment_id": r["equipment_id"],
+            "timestamp": r["timestamp"].isoformat()
+        }
+        for r in results
+    ]
 
 
 async def get_sensor_statistics(
@@ -138,8 +168,17 @@ async def get_sensor_statistics(
     resolved_equipment_id = await resolve_equipment_id(equipment_id)
 
     start_time = datetime.utcnow() - timedelta(hours=period_hours)
+    cold_range, hot_range = cold_storage.split_range(start_time, datetime.utcnow())
 
-    if resolved_equipment_id:
+    if cold_range:
+        # Merge partial aggregates from the cold tier and Postgres
+        partials = [asyncio.to_thread(
+            cold_storage.read_aggregates, sensor_type, *cold_range, resolved_equipment_id
+        )]
+        if hot_range:
+            partials.append(fetch_hot_aggregates(sensor_type, hot_range[0], resolved_equipment_id))
+        result = merge_aggregates(await asyncio.gather(*partials))
+    elif resolved_equipment_id:
         query = """
             SELECT
                 AVG(value) as avg_value,
@@ -197,6 +236,53 @@ async def get_sensor_statistics(
     }
 
 
+async def fetch_hot_aggregates(
+    sensor_type: str,
+    start_time: datetime,
+    equipment_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Partial aggregates from Postgres that can be merged with the cold tier."""
+    query = """
+        SELECT
+            COUNT(*) as count,
+            COALESCE(SUM(value), 0) as sum,
+            COALESCE(SUM(value * value), 0) as sum_sq,
+            MIN(value) as min,
+            MAX(value) as max,
+            MAX(unit) as unit
+        FROM sensor_readings
+        WHERE sensor_type = $1
+          AND timestamp >= $2
+    """
+    if equipment_id:
+        result = await db.fetchrow(query + " AND equipment_id = $3", sensor_type, start_time, equipment_id)
+    else:
+        result = await db.fetchrow(query, sensor_type, start_time)
+    return dict(result)
+
+
+def merge_aggregates(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine partial aggregates into the same shape as the statistics query."""
+    count = sum(p["count"] for p in partials)
+    if count == 0:
+        return {"count": 0}
+
+    total = sum(p["sum"] for p in partials)
+    total_sq = sum(p["sum_sq"] for p in partials)
+    average = total / count
+    # Sample standard deviation, matching Postgres STDDEV
+    std_dev = math.sqrt(max(total_sq - count * average * average, 0) / (count - 1)) if count > 1 else None
+
+    return {
+        "avg_value": average,
+        "min_value": min(p["min"] for p in partials if p["min"] is not None),
+        "max_value": max(p["max"] for p in partials if p["max"] is not None),
+        "std_dev": std_dev,
+        "count": count,
+        "unit": max((p["unit"] for p in partials if p["unit"]), default=None),
+    }
+
+
 async def list_equipment() -> Dict[str, Any]:
     """
     등록된 장비 목록을 조회합니다.
@@ -224,3 +310,32 @@ async def list_equipment() -> Dict[str, Any]:
             for r in results
         ]
     }
+
+
+# Data source for the equipment table; every other source is a sensor type
+EQUIPMENT_SOURCE = "equipment"
+
+
+async def get_data_versions(sources: List[str]) -> Dict[str, Optional[str]]:
+    """
+    데이터 소스별 변경 버전을 조회합니다. (응답 캐시 무효화용)
+
+    버전은 sensor_readings/equipment 트리거가 기록 시점에 올리는 슬롯 카운터의
+    합이므로 과거 측정값의 백필·보정·삭제도 반영됩니다.
+    (scripts/sensor_data_versions.sql 적용 필요)
+
+    Args:
+        sources: 센서 종류 또는 "equipment"
+
+    Returns:
+        소스별 버전 (버전 테이블에 없는 소스는 None)
+    """
+    query = """
+        SELECT source, SUM(version)::bigint AS version
+        FROM data_versions
+        WHERE source = ANY($1::text[])
+        GROUP BY source
+    """
+    rows = await db.fetch(query, sources)
+    found = {r["source"]: str(r["version"]) for r in rows}
+    return {source: found.get(source) for source in sources}
@@ -0,0 +1,38 @@
+from typing import List, Tuple
+import numpy as np
+
+
+def downsample_minmax(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    max_points: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a time series to at most max_points, keeping each bucket's min and max.
+
+    Spikes survive downsampling, which matters for anomaly inspection.
+    """
+    size = len(values)
+    if max_points <= 0 or size <= max_points:
+        return timestamps, values
+
+    bucket_count = max((max_points - 2) // 2, 1)
+    bucket_size = -(-size // bucket_count)  # ceil division
+    padded = bucket_count * bucket_size
+
+    # Pad the last bucket with its own edge values so argmin/argmax stay in range
+    padded_values = np.pad(values, (0, padded - size), mode="edge").reshape(bucket_count, bucket_size)
+    offsets = np.arange(bucket_count) * bucket_size
+
+    min_idx = np.minimum(offsets + padded_values.argmin(axis=1), size - 1)
+    max_idx = np.minimum(offsets + padded_values.argmax(axis=1), size - 1)
+
+    # Keep both extremes plus the endpoints, in time order, without duplicates
+    indices = np.unique(np.concatenate(([0, size - 1], min_idx, max_idx)))
+    return timestamps[indices], values[indices]
+
+
+def to_chart_data(timestamps: np.ndarray, values: np.ndarray, decimals: int = 2) -> List[List]:
+    """Convert columnar arrays to ECharts [epoch_ms, value] pairs."""
+    rounded = np.round(values, decimals)
+    return list(map(list, zip(timestamps.tolist(), rounded.tolist())))
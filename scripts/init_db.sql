@@ -4,9 +4,11 @@
 SET NAMES utf8mb4;
 SET CHARACTER SET utf8mb4;
 
+-- ID는 시간순 UUIDv7을 BINARY(16)으로 저장 (애플리케이션에서는 문자열 UUID로 사용)
+
 -- 사용자 테이블
 CREATE TABLE IF NOT EXISTS users (
-    id VARCHAR(36) PRIMARY KEY,
+    id BINARY(16) PRIMARY KEY,
     email VARCHAR(255) NOT NULL UNIQUE,
     password_hash VARCHAR(255) NOT NULL,
     name VARCHAR(100) NOT NULL,
@@ -20,11 +22,14 @@ CREATE TABLE IF NOT EXISTS users (
 
 -- 대화 테이블
 CREATE TABLE IF NOT EXISTS conversations (
-    id VARCHAR(36) PRIMARY KEY,
-    user_id VARCHAR(36) NOT NULL,
+    id BINARY(16) PRIMARY KEY,
+    user_id BINARY(16) NOT NULL,
     title VARCHAR(255) DEFAULT '새 대화',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    summary TEXT NULL,
+    -- 메시지 created_at과 비교하므로 마이크로초 정밀도
+    summary_until TIMESTAMP(6) NULL,
 
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     INDEX idx_user_id (user_id),
@@ -33,22 +38,24 @@ CREATE TABLE IF NOT EXISTS conversations (
 
 -- 메시지 테이블
 CREATE TABLE IF NOT EXISTS messages (
-    id VARCHAR(36) PRIMARY KEY,
-    conversation_id VARCHAR(36) NOT NULL,
+    id BINARY(16) PRIMARY KEY,
+    conversation_id BINARY(16) NOT NULL,
     role ENUM('user', 'assistant', 'system') NOT NULL,
     content TEXT NOT NULL,
     chart_data JSON,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6),
 
     FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE,
-    INDEX idx_conversation_id (conversation_id),
-    INDEX idx_created_at (created_at)
+    INDEX idx_conversation_created (conversation_id, created_at),
+    INDEX idx_created_at (created_at),
+    -- 대화 검색용 (한국어는 띄어쓰기로 단어를 구분할 수 없어 ngram 파서 사용)
+    FULLTEXT INDEX ft_content (content) WITH PARSER ngram
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- 리프레시 토큰 테이블
 CREATE TABLE IF NOT EXISTS refresh_tokens (
-    id VARCHAR(36) PRIMARY KEY,
-    user_id VARCHAR(36) NOT NULL,
+    id BINARY(16) PRIMARY KEY,
+    user_id BINARY(16) NOT NULL,
     token_hash VARCHAR(255) NOT NULL,
     expires_at TIMESTAMP NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
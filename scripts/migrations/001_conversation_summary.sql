@@ -0,0 +1,6 @@
+-- 기존 MySQL 데이터베이스 마이그레이션: 대화별 롤링 요약
+-- 새로 생성하는 경우 init_db.sql에 이미 포함되어 있음
+
+ALTER TABLE conversations
+    ADD COLUMN summary TEXT NULL,
+    ADD COLUMN summary_until TIMESTAMP NULL;
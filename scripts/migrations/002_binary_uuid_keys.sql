@@ -0,0 +1,89 @@
+-- 기존 MySQL 데이터베이스 마이그레이션: VARCHAR(36) UUID 키를 BINARY(16)으로 변환
+-- 새로 생성하는 경우 init_db.sql에 이미 포함되어 있음
+--
+-- 기존 ID 값은 그대로 유지되고(UUID_TO_BIN) 이후 생성되는 ID만 시간순 UUIDv7이 됨.
+-- 새 테이블에 기본 키 순서로 복사한 뒤 이름을 교체하므로 클러스터형 인덱스도 다시 정렬됨.
+-- 복사하는 동안 쓰기가 반영되지 않도록 백엔드를 중지한 상태에서 실행할 것. (MySQL 8.0 이상)
+
+SET NAMES utf8mb4;
+
+CREATE TABLE users_v2 (
+    id BINARY(16) PRIMARY KEY,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    password_hash VARCHAR(255) NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    INDEX idx_email (email),
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE conversations_v2 (
+    id BINARY(16) PRIMARY KEY,
+    user_id BINARY(16) NOT NULL,
+    title VARCHAR(255) DEFAULT '새 대화',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    summary TEXT NULL,
+    summary_until TIMESTAMP NULL,
+
+    FOREIGN KEY (user_id) REFERENCES users_v2(id) ON DELETE CASCADE,
+    INDEX idx_user_id (user_id),
+    INDEX idx_updated_at (updated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE messages_v2 (
+    id BINARY(16) PRIMARY KEY,
+    conversation_id BINARY(16) NOT NULL,
+    role ENUM('user', 'assistant', 'system') NOT NULL,
+    content TEXT NOT NULL,
+    chart_data JSON,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (conversation_id) REFERENCES conversations_v2(id) ON DELETE CASCADE,
+    INDEX idx_conversation_created (conversation_id, created_at),
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE refresh_tokens_v2 (
+    id BINARY(16) PRIMARY KEY,
+    user_id BINARY(16) NOT NULL,
+    token_hash VARCHAR(255) NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    revoked BOOLEAN DEFAULT FALSE,
+
+    FOREIGN KEY (user_id) REFERENCES users_v2(id) ON DELETE CASCADE,
+    INDEX idx_user_id (user_id),
+    INDEX idx_token_hash (token_hash),
+    INDEX idx_expires_at (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 데이터 복사 (부모 테이블부터)
+INSERT INTO users_v2 (id, email, password_hash, name, is_active, created_at, updated_at)
+SELECT UUID_TO_BIN(id), email, password_hash, name, is_active, created_at, updated_at
+FROM users ORDER BY UUID_TO_BIN(id);
+
+INSERT INTO conversations_v2 (id, user_id, title, created_at, updated_at, summary, summary_until)
+SELECT UUID_TO_BIN(id), UUID_TO_BIN(user_id), title, created_at, updated_at, summary, summary_until
+FROM conversations ORDER BY UUID_TO_BIN(id);
+
+INSERT INTO messages_v2 (id, conversation_id, role, content, chart_data, created_at)
+SELECT UUID_TO_BIN(id), UUID_TO_BIN(conversation_id), role, content, chart_data, created_at
+FROM messages ORDER BY UUID_TO_BIN(id);
+
+INSERT INTO refresh_tokens_v2 (id, user_id, token_hash, expires_at, created_at, revoked)
+SELECT UUID_TO_BIN(id), UUID_TO_BIN(user_id), token_hash, expires_at, created_at, revoked
+FROM refresh_tokens ORDER BY UUID_TO_BIN(id);
+
+-- 원자적으로 이름 교체 (외래 키는 이름이 바뀐 테이블을 그대로 따라감)
+RENAME TABLE
+    users TO users_old, users_v2 TO users,
+    conversations TO conversations_old, conversations_v2 TO conversations,
+    messages TO messages_old, messages_v2 TO messages,
+    refresh_tokens TO refresh_tokens_old, refresh_tokens_v2 TO refresh_tokens;
+
+-- 이전 테이블 삭제 (자식 테이블부터)
+DROP TABLE refresh_tokens_old, messages_old, conversations_old, users_old;
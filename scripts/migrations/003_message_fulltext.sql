@@ -0,0 +1,10 @@
+-- 기존 MySQL 데이터베이스 마이그레이션: 대화 검색용 FULLTEXT 인덱스
+-- 새로 생성하는 경우 init_db.sql에 이미 포함되어 있음
+--
+-- ngram 파서는 ngram_token_size(기본 2) 단위로 토큰을 나누므로 한국어 검색이 가능함.
+-- 첫 FULLTEXT 인덱스 추가 시 FTS_DOC_ID 컬럼 생성을 위해 테이블이 재구성되므로 사용량이 적을 때 실행할 것.
+-- 이후 INSERT는 커밋 시점에 InnoDB FULLTEXT 캐시(innodb_ft_cache_size)에 반영되고
+-- 보조 테이블로는 나중에 일괄 기록되므로 채팅 저장 경로에 주는 부담이 작음.
+
+ALTER TABLE messages
+    ADD FULLTEXT INDEX ft_content (content) WITH PARSER ngram;
@@ -0,0 +1,12 @@
+-- 기존 MySQL 데이터베이스 마이그레이션: 메시지 시각과 요약 경계를 마이크로초 정밀도로 변경
+-- 새로 생성하는 경우 init_db.sql에 이미 포함되어 있음
+--
+-- 애플리케이션은 마이크로초 단위 시각으로 메시지를 저장하고 캐시하므로,
+-- 초 단위 TIMESTAMP는 반올림되어 같은 초의 메시지가 요약 경계(created_at > summary_until)에서
+-- 누락되거나 중복될 수 있음. 기존 값은 소수부 0으로 그대로 유지됨.
+
+ALTER TABLE messages
+    MODIFY created_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6);
+
+ALTER TABLE conversations
+    MODIFY summary_until TIMESTAMP(6) NULL;
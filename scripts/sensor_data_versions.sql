@@ -0,0 +1,95 @@
+-- 응답 캐시(RESPONSE_CACHE_ENABLED=true)를 사용할 때만 적용하는 데이터 소스별 변경 버전
+-- 측정 시각이 아닌 기록 시점 기준이므로 과거 데이터 보정·백필·삭제도 버전을 올림
+-- 버전은 소스별 슬롯 카운터의 합이며, 쓰기 세션마다 다른 슬롯을 갱신하므로
+-- 같은 센서 종류를 동시에 적재하는 세션들이 한 행의 잠금에서 직렬화되지 않음
+-- 여러 번 적용해도 안전함
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    source VARCHAR(50) NOT NULL,  -- 센서 종류 또는 'equipment'
+    slot SMALLINT NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (source, slot)
+);
+
+-- 모든 소스를 0에서 시작해 첫 변경 전에도 버전이 비어 있지 않도록 함
+INSERT INTO data_versions (source, slot)
+SELECT source, 0
+FROM unnest(ARRAY['temperature', 'pressure', 'vacuum', 'gas_flow', 'rf_power', 'equipment']) AS source
+ON CONFLICT (source, slot) DO NOTHING;
+
+-- 현재 세션의 슬롯에서 소스별 카운터를 1 올림 (정렬해서 잠금 순서 고정)
+CREATE OR REPLACE FUNCTION bump_data_versions(sources TEXT[])
+RETURNS void AS $$
+BEGIN
+    INSERT INTO data_versions (source, slot, version)
+    SELECT source, pg_backend_pid() % 16, 1
+    FROM (SELECT DISTINCT unnest(sources) AS source ORDER BY 1) s
+    ON CONFLICT (source, slot) DO UPDATE
+        SET version = data_versions.version + 1, updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+-- 문장 단위 트리거: 변경된 행의 센서 종류마다 한 번만 갱신
+CREATE OR REPLACE FUNCTION bump_sensor_data_versions()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_data_versions(ARRAY(SELECT sensor_type FROM changed_rows));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM bump_data_versions(ARRAY(
+            SELECT sensor_type FROM changed_rows UNION SELECT sensor_type FROM old_rows
+        ));
+    ELSE
+        PERFORM bump_data_versions(ARRAY(SELECT sensor_type FROM old_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- TRUNCATE에는 전이 테이블이 없으므로 모든 센서 종류의 버전을 올림 (위에서 모두 시드됨)
+CREATE OR REPLACE FUNCTION bump_all_sensor_data_versions()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM bump_data_versions(ARRAY(
+        SELECT DISTINCT source FROM data_versions WHERE source <> 'equipment'
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_equipment_data_version()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM bump_data_versions(ARRAY['equipment']);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS sensor_readings_version_insert ON sensor_readings;
+CREATE TRIGGER sensor_readings_version_insert
+    AFTER INSERT ON sensor_readings
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_sensor_data_versions();
+
+DROP TRIGGER IF EXISTS sensor_readings_version_update ON sensor_readings;
+CREATE TRIGGER sensor_readings_version_update
+    AFTER UPDATE ON sensor_readings
+    REFERENCING NEW TABLE AS changed_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_sensor_data_versions();
+
+DROP TRIGGER IF EXISTS sensor_readings_version_delete ON sensor_readings;
+CREATE TRIGGER sensor_readings_version_delete
+    AFTER DELETE ON sensor_readings
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_sensor_data_versions();
+
+DROP TRIGGER IF EXISTS sensor_readings_version_truncate ON sensor_readings;
+CREATE TRIGGER sensor_readings_version_truncate
+    AFTER TRUNCATE ON sensor_readings
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_all_sensor_data_versions();
+
+DROP TRIGGER IF EXISTS equipment_version ON equipment;
+CREATE TRIGGER equipment_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON equipment
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_equipment_data_version();